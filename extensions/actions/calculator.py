@@ -12,12 +12,14 @@ calculator("2 ** 10")
 calculator("sqrt(144)")
 '''
 
-import os
 import re
 import math
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+# Runs in a worker process, so a runaway expression like 9**9**9 is stopped at the deadline
+EXECUTOR = "process"
+DEADLINE = 5
 
 # Safe math functions allowed in expressions
 SAFE_FUNCTIONS = {
@@ -14,9 +14,16 @@ file_search("notes.txt", path="C:/Users/karti/Documents")
 
 import os
 import subprocess
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+import extensions.essentials.executor as executor
+
+# Walking a whole drive can take minutes; "cancel that" stops it between folders
+EXECUTOR = "thread"
+DEADLINE = 180
+# A repeated search is answered from memory; "open" always runs
+CACHE = {"ttl": 120, "when": {"action": ["search"]}}
 
 # Folders to skip — speeds up search massively
 SKIP_DIRS = {
@@ -33,6 +40,7 @@ def _search(query: str, root: str) -> list:
     results = []
 
     for dirpath, dirnames, filenames in os.walk(root):
+        executor.check()
         # Skip unwanted folders in-place (fast pruning)
         dirnames[:] = [
             d for d in dirnames
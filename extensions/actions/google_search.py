@@ -9,11 +9,9 @@ google_search("python tutorials")
 google_search("weather today")
 '''
 
-import os
 import webbrowser
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 def google_search(query: str) -> str:
     url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
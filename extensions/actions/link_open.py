@@ -8,10 +8,8 @@ arguments:
 Example usage:
 link_open("https://www.example.com")
 '''
-import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG:bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG:bool = settings.debug
 
 
 
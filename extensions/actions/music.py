@@ -14,9 +14,8 @@ import os
 import glob
 import threading
 import pygame
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 from pathlib import Path
 MUSIC_FOLDER = str(Path(__file__).resolve().parent.parent.parent / "music")
@@ -56,12 +55,16 @@ def _ensure_event_loop():
         t = threading.Thread(target=_event_loop, daemon=False)
         t.start()
 
-def music(action: str) -> str:
+def warm():
+    """Initialise pygame and the mixer ahead of the first call."""
     if not pygame.get_init():
         pygame.init()
     if not pygame.mixer.get_init():
         pygame.mixer.init()
 
+def music(action: str) -> str:
+    warm()
+
     # Register end-of-song event
     pygame.mixer.music.set_endevent(MUSIC_END)
 
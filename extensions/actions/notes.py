@@ -20,9 +20,8 @@ import json
 import tempfile
 import subprocess
 from datetime import datetime
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 BASE_DIR   = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 NOTES_FILE = os.path.join(BASE_DIR, "notes.json")
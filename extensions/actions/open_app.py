@@ -15,9 +15,8 @@ open_app("spotify")
 import os
 import subprocess
 import webbrowser
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 # Map of app aliases -> possible executable paths/commands
 APP_MAP = {
@@ -12,9 +12,8 @@ open_folder("projects")
 
 import os
 import subprocess
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 USER = os.path.expanduser("~")
 
@@ -1,45 +1,196 @@
 import importlib
 import sys
+import time
+import threading
 
 import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG:bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG:bool = settings.debug
 
+import extensions.essentials.manifest as manifest
+import extensions.essentials.result_cache as result_cache
 
-def import_all_from_current_directory() -> dict:
+ACTIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+import_ms = {}  # action name -> time its module took to import on first call
+
+
+def _add_to_path() -> None:
+    # Action modules are imported by their bare names
+    if ACTIONS_DIR not in sys.path:
+        sys.path.insert(0, ACTIONS_DIR)
+
+
+def _entry(function_name: str, module):
+    """The module's entry function, wrapped by the result cache if needed."""
+    func = getattr(module, function_name, None)
+    if not callable(func):
+        raise ValueError(f"No callable '{function_name}' in: {function_name}")
+    if result_cache.involved(function_name):
+        func = result_cache.wrap(function_name, func)
+    return func
+
+
+def _load(function_name: str):
+    """Imports an action module and returns its entry function."""
+    _add_to_path()
+    start = time.perf_counter()
+    module = importlib.import_module(function_name)   # Function name matches module name
+    import_ms[function_name] = (time.perf_counter() - start) * 1000
+    if DEBUG: print(f"Loaded '{function_name}' in {import_ms[function_name]:.1f} ms")
+    return _entry(function_name, module)
+
+
+class LazyAction:
     """
-    Imports all Python files from the current directory.
-    Each module is expected to have a function with the same name as the file.
-    Returns a list of those functions.
+    Stands in for an action function until its first call, so startup does not import
+    every action module and the libraries behind them (PIL, psutil, pygetwindow, ...).
+    Pickles by name: a process-pool worker imports the action itself.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
 
-    if current_dir not in sys.path:
-        sys.path.insert(0, current_dir)
+    def __init__(self, function_name: str):
+        self.__name__ = function_name
+        self._func = None
+        self._lock = threading.Lock()
 
-    collected_functions = dict()
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def load(self):
+        if self._func is None:
+            with self._lock:
+                if self._func is None:
+                    self._func = _load(self.__name__)
+        return self._func
+
+    def replace(self, func) -> None:
+        with self._lock:
+            self._func = func
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __reduce__(self):
+        return (LazyAction, (self.__name__,))
+
+    def __repr__(self) -> str:
+        return f"<LazyAction {self.__name__} {'loaded' if self.loaded else 'not loaded'}>"
+
+
+def warm(function_name: str, functions: dict) -> bool:
+    """
+    Imports a registered action ahead of its call and runs its module's optional warm()
+    hook. Names that are not in the register are ignored.
 
-    for filename in os.listdir(current_dir):
-        if filename.endswith(".py") and filename != os.path.basename(__file__):
-            module_name = filename[:-3]  # Strip .py extension
-            function_name = module_name   # Function name matches module name
+    Returns:
+        bool: True if the action is registered.
+    """
+    func = functions.get(function_name)
+    if func is None:
+        return False
+    if isinstance(func, LazyAction):
+        func.load()
+    hook = getattr(sys.modules.get(function_name), "warm", None)
+    if callable(hook):
+        hook()
+    return True
 
-            try:
-                module = importlib.import_module(module_name)
-                func = getattr(module, function_name, None)
 
-                if callable(func):
-                    collected_functions[function_name] = func
-                    if DEBUG: print(f"Found '{function_name}' in: {module_name}")
-                else:
-                    if DEBUG: print(f"No callable '{function_name}' in: {module_name}")
+def import_all_from_current_directory(tool_manifest: dict = None, lazy: bool = True) -> dict:
+    """
+    Registers every action listed in the tool manifest (built from the current
+    directory when not given). Each module is expected to have a function with
+    the same name as the file. Actions that declare a CACHE, or invalidate one,
+    are wrapped by the result cache.
 
-            except Exception as e:
-                if DEBUG: print(f"Failed to import {module_name}: {e}")
+    Args:
+        tool_manifest (dict): The manifest to register.
+        lazy (bool): Register LazyAction proxies that import their module on first call,
+            instead of importing every module now.
+
+    Returns:
+        dict: The functions (or proxies) keyed by name.
+    """
+    if tool_manifest is None:
+        tool_manifest = manifest.build(ACTIONS_DIR)
+    result_cache.configure(tool_manifest)
+    _add_to_path()
+
+    collected_functions = dict()
+
+    for function_name, entry in tool_manifest.items():
+        if not entry["function"]:
+            if DEBUG: print(f"No callable '{function_name}' in: {function_name}")
+            continue
+
+        if lazy:
+            collected_functions[function_name] = LazyAction(function_name)
+            continue
+        try:
+            collected_functions[function_name] = _load(function_name)
+        except Exception as e:
+            if DEBUG: print(f"Failed to import {function_name}: {e}")
 
     return collected_functions
 
+def reload(function_name: str, functions: dict, filepath: str = None) -> bool:
+    """
+    Imports the current version of an action file into a fresh module and swaps it into
+    the register. When the file fails to import, the previous module and function stay
+    in place. Other action modules and their state are not touched.
+
+    Args:
+        function_name (str): Action name, the file name without ".py".
+        functions (dict): The register to patch in place.
+        filepath (str): The action file, by default in the actions directory.
+
+    Returns:
+        bool: True when the new version is registered.
+    """
+    import importlib.util
+
+    filepath = filepath or os.path.join(ACTIONS_DIR, f"{function_name}.py")
+    previous = sys.modules.get(function_name)
+    spec = importlib.util.spec_from_file_location(function_name, filepath)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before it runs, like a regular import, so the module can find itself
+    sys.modules[function_name] = module
+    start = time.perf_counter()
+    try:
+        spec.loader.exec_module(module)
+        func = _entry(function_name, module)
+    except Exception as e:
+        if previous is not None:
+            sys.modules[function_name] = previous
+        else:
+            sys.modules.pop(function_name, None)
+        print(f"Warning: Keeping the last good version of '{function_name}': {e!r}")
+        return False
+    import_ms[function_name] = (time.perf_counter() - start) * 1000
+
+    # Answers of the old code may not match the new one
+    result_cache.invalidate(function_name)
+    proxy = functions.get(function_name)
+    if isinstance(proxy, LazyAction):
+        proxy.replace(func)
+    else:
+        functions[function_name] = LazyAction(function_name)
+        functions[function_name].replace(func)
+    if DEBUG: print(f"Reloaded '{function_name}' in {import_ms[function_name]:.1f} ms")
+    return True
+
+
+def forget(function_name: str, functions: dict) -> None:
+    """Removes an action whose file was deleted from the register."""
+    functions.pop(function_name, None)
+    sys.modules.pop(function_name, None)
+    import_ms.pop(function_name, None)
+    result_cache.invalidate(function_name)
+
+
 if __name__ == "__main__":
-    functions = import_all_from_current_directory()
-    if DEBUG: print(f"Collected functions: {[func.__name__ for func in functions.values()]}")
\ No newline at end of file
+    functions = import_all_from_current_directory(lazy=False)
+    print(f"Collected functions: {[func.__name__ for func in functions.values()]}")
+    for name, ms in sorted(import_ms.items(), key=lambda item: -item[1]):
+        print(f"{name:16} {ms:7.1f} ms")
\ No newline at end of file
@@ -21,12 +21,20 @@ import subprocess
 import threading
 import time
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 REMINDER_FILE = os.path.join(BASE_DIR, "reminders.json")
+
+# The list is answered from memory until a reminder is set or cleared, or one fires
+# and rewrites the file
+CACHE = {
+    "ttl": 300,
+    "when": {"action": ["list"]},
+    "invalidated_by": {"reminder": {"action": ["set", "clear"]}},
+    "files": ["reminders.json"],
+}
 SCRIPTS_DIR   = os.path.join(BASE_DIR, "reminder_scripts")
 os.makedirs(SCRIPTS_DIR, exist_ok=True)
 
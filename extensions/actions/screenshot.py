@@ -11,9 +11,8 @@ screenshot("C:/Users/karti/Pictures/myshot.png")
 
 import os
 from datetime import datetime
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 from PIL import ImageGrab
 
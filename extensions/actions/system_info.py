@@ -11,11 +11,15 @@ system_info("battery")
 system_info("all")
 '''
 
-import os
 import psutil
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+# cpu_percent() waits a full second, off the voice loop
+EXECUTOR = "thread"
+DEADLINE = 10
+# Readings stay useful for a few seconds; asking again right away is answered instantly
+CACHE = {"ttl": 10}
 
 def system_info(query: str) -> str:
     query = query.lower().strip()
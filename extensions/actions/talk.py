@@ -7,12 +7,10 @@ confirm an action, or communicate anything back to the user verbally.
 example usage: talk("I have opened YouTube for you.")
 '''
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
-from extensions.essentials.mouth import say
+from extensions.essentials.mouth import say, wait_idle
 
 def talk(text: str) -> None:
     if DEBUG:
@@ -20,4 +18,5 @@ def talk(text: str) -> None:
     say(text)
 
 if __name__ == "__main__":
-    talk("Hello! I am your voice assistant. How can I help you today?")
\ No newline at end of file
+    talk("Hello! I am your voice assistant. How can I help you today?")
+    wait_idle()
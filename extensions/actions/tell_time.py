@@ -4,14 +4,12 @@ arguements : None
 description : This function retrieves the current system time, formats it into a natural language sentence, and uses the say() function to vocalize the time. It handles both hours and minutes, converting them into words for a more human-like output   
 '''
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG:bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG:bool = settings.debug
 
 
 from datetime import datetime
-from extensions.essentials.mouth import say
+from extensions.essentials.mouth import say, wait_idle
 
 def tell_time() -> None:
     now = datetime.now()
@@ -39,4 +37,5 @@ def tell_time() -> None:
     say(time_message)
 
 if __name__ == "__main__":
-    tell_time()
\ No newline at end of file
+    tell_time()
+    wait_idle()
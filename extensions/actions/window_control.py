@@ -11,10 +11,8 @@ window_control("close")
 window_control("restore")
 '''
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
 
 import pygetwindow as gw
 
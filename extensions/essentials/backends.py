@@ -0,0 +1,287 @@
+import json
+import time
+import queue
+import threading
+from abc import ABC, abstractmethod
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+from extensions.essentials.health import Monitored
+
+# Comma separated, in order of preference: "gemini", "local"
+BACKENDS = settings.llm_backends
+GEMINI_MODEL = "gemini-2.5-flash"
+LOCAL_LLM_URL = settings.local_llm_url
+LOCAL_LLM_MODEL = settings.local_llm_model
+
+DEADLINE = settings.llm_deadline                                 # seconds for a whole reply
+HEDGE_PERCENTILE = settings.llm_hedge_percentile
+HEDGE_DEFAULT = 1.5                                              # hedge delay before enough samples
+HEDGE_MIN_SAMPLES = 5
+BREAKER_THRESHOLD = 3                                            # consecutive failures to open
+BREAKER_COOLDOWN = 30.0                                          # seconds before a retry
+
+
+class Backend(Monitored, ABC):
+    """
+    A provider that streams the text of a reply. Keeps its own latency samples
+    (time to first chunk) and circuit-breaker state.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name, BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+    @abstractmethod
+    def stream(self, prompt: str, response_schema: dict, timeout: float):
+        """Iterator of reply text chunks."""
+
+    def warm(self) -> None:
+        """Builds the client and opens its connection ahead of the first prompt."""
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT
+        return self.percentile(HEDGE_PERCENTILE)
+
+
+class GeminiBackend(Backend):
+    def __init__(self, model: str = GEMINI_MODEL, client=None, name: str = "gemini"):
+        super().__init__(name)
+        self.model = model
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=settings.gemini_api_key or None)
+        return self._client
+
+    def warm(self) -> None:
+        # A metadata request leaves a TLS connection in the client's pool for the first prompt
+        self.client.models.get(model=self.model)
+
+    def stream(self, prompt: str, response_schema: dict, timeout: float):
+        config = {"http_options": {"timeout": int(timeout * 1000)}}
+        if response_schema is not None:
+            config.update({"response_mime_type": "application/json", "response_json_schema": response_schema})
+
+        for chunk in self.client.models.generate_content_stream(model=self.model, contents=prompt, config=config):
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAICompatibleBackend(Backend):
+    """Any endpoint that speaks the OpenAI chat-completions API, e.g. a local llama.cpp or Ollama server."""
+
+    def __init__(self, base_url: str = LOCAL_LLM_URL, model: str = LOCAL_LLM_MODEL, api_key: str = None, name: str = "local"):
+        super().__init__(name)
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key or settings.local_llm_api_key
+        self._session = None
+
+    @property
+    def session(self):
+        """One pooled HTTP session, so requests after the first skip the connection setup."""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            if self.api_key:
+                self._session.headers["Authorization"] = f"Bearer {self.api_key}"
+        return self._session
+
+    def warm(self) -> None:
+        self.session.get(f"{self.base_url}/models", timeout=2)
+
+    def stream(self, prompt: str, response_schema: dict, timeout: float):
+        body = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+        }
+        if response_schema is not None:
+            body["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "decision", "schema": response_schema},
+            }
+        with self.session.post(f"{self.base_url}/chat/completions", json=body,
+                               stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+
+_backends = []
+
+
+def configure(backends: list) -> None:
+    """Sets the backends used by stream(), in order of preference."""
+    _backends[:] = backends
+
+
+def configure_from_env() -> None:
+    backends = []
+    for name in (n.strip() for n in BACKENDS.split(",")):
+        if name == "gemini":
+            backends.append(GeminiBackend())
+        elif name == "local":
+            backends.append(OpenAICompatibleBackend())
+        elif name:
+            print(f"Warning: Unknown LLM backend '{name}'")
+    configure(backends)
+
+
+_settle_lock = threading.Lock()
+
+
+def _settle(backend: Backend, cancel: threading.Event, error: Exception = None, seconds: float = None) -> bool:
+    """
+    Marks an attempt as finished and records its outcome: a failure if error is given,
+    otherwise a success with seconds to the first chunk. An attempt is settled exactly
+    once, by its worker or by stream(), whichever is first.
+
+    Returns:
+        bool: True if the attempt was still pending.
+    """
+    with _settle_lock:
+        if cancel.is_set():
+            return False
+        cancel.set()
+        if error is not None:
+            backend.record_failure(error, seconds)
+        elif seconds is not None:
+            backend.record_success(seconds)
+        return True
+
+
+def _worker(backend: Backend, prompt: str, response_schema: dict, end: float, results: queue.Queue, cancel: threading.Event):
+    start = time.monotonic()
+    first_chunk = None
+    try:
+        for text in backend.stream(prompt, response_schema, timeout=max(end - start, 0.1)):
+            if cancel.is_set():
+                return
+            if first_chunk is None:
+                first_chunk = time.monotonic() - start
+            results.put((backend, "chunk", text))
+        # The outcome is only known once the reply is complete, so it is recorded here
+        if _settle(backend, cancel, seconds=first_chunk if first_chunk is not None else time.monotonic() - start):
+            results.put((backend, "done", None))
+    except Exception as e:
+        if _settle(backend, cancel, e, first_chunk):
+            results.put((backend, "error", e))
+
+
+def stream(prompt: str, response_schema: dict = None, deadline: float = DEADLINE):
+    """
+    Streams the reply text from the first backend that answers.
+
+    The preferred backend is tried first. If it has not produced its first chunk
+    within its hedge delay (the HEDGE_PERCENTILE of its own first-chunk latency),
+    the next backend is fired as well and whichever answers first wins. Backends
+    with an open circuit are skipped.
+
+    Raises:
+        TimeoutError: If no backend completes the reply within the deadline.
+        RuntimeError: If every backend failed.
+    """
+    if not _backends:
+        configure_from_env()
+
+    candidates = [b for b in _backends if b.available()] or list(_backends)
+    end = time.monotonic() + deadline
+    results = queue.Queue()
+    attempts = {}  # backend -> event set once the attempt is settled or cancelled
+    launched = {}  # backend -> monotonic time of its launch
+    state = {"next": 0, "hedge_at": None}
+
+    def launch():
+        backend = candidates[state["next"]]
+        state["next"] += 1
+        state["hedge_at"] = time.monotonic() + backend.hedge_delay()
+        cancel = threading.Event()
+        attempts[backend] = cancel
+        launched[backend] = time.monotonic()
+        threading.Thread(target=_worker, args=(backend, prompt, response_schema, end, results, cancel), daemon=True).start()
+        if DEBUG and len(attempts) > 1: print(f"[backends] Hedging with '{backend.name}'")
+
+    launch()
+    winner = None
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                error = TimeoutError(f"No LLM backend answered within {deadline:.1f}s")
+                for backend, cancel in attempts.items():
+                    _settle(backend, cancel, error)
+                raise error
+
+            can_hedge = winner is None and state["next"] < len(candidates)
+            wait = end - now
+            if can_hedge:
+                wait = min(wait, max(state["hedge_at"] - now, 0))
+
+            try:
+                backend, kind, payload = results.get(timeout=wait)
+            except queue.Empty:
+                if can_hedge and time.monotonic() >= state["hedge_at"]:
+                    launch()
+                continue
+
+            if winner is not None and backend is not winner:
+                continue
+
+            if kind == "chunk":
+                if winner is None:
+                    winner = backend
+                    first_chunk = time.monotonic() - launched[winner]
+                    for other, cancel in attempts.items():
+                        if other is not winner:
+                            # A hedge loser was too slow this time, which the breaker has to see
+                            _settle(other, cancel, TimeoutError(f"Lost the hedge to '{winner.name}'"))
+                yield payload
+            elif kind == "done":
+                return
+            elif kind == "error":
+                if backend is winner:
+                    raise payload
+                attempts.pop(backend).set()
+                if DEBUG: print(f"[backends] '{backend.name}' failed: {payload}")
+                if state["next"] < len(candidates):
+                    launch()
+                elif not attempts:
+                    raise RuntimeError(f"All LLM backends failed, last error: {payload}")
+    finally:
+        # Also runs when the consumer stops early (brain's early dispatch), which is no failure
+        for backend, cancel in attempts.items():
+            if backend is winner:
+                _settle(backend, cancel, seconds=first_chunk)
+            else:
+                cancel.set()
+
+
+def warm() -> None:
+    """Prepares every available backend in turn. Meant for a background thread at startup."""
+    if not _backends:
+        configure_from_env()
+    for backend in _backends:
+        if not backend.available():
+            continue
+        try:
+            backend.warm()
+        except Exception as e:
+            if DEBUG: print(f"[backends] Could not warm '{backend.name}': {e}")
+
+
+def summary() -> dict:
+    """Per-backend latency and failure stats."""
+    return {backend.name: backend.summary() for backend in _backends}
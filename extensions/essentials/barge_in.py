@@ -0,0 +1,254 @@
+import os
+import time
+import threading
+from collections import deque
+
+import extensions.essentials.capture as capture
+import extensions.essentials.ears as ears
+import extensions.essentials.mouth as mouth
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+ENABLED: bool = settings.barge_in
+
+# Echo gating: a frame only counts as the user when it is clearly louder than what the
+# speaker output alone would put into the microphone
+ECHO_DELAY_SECONDS = 0.25   # mixer buffering plus room acoustics: how late an echo may arrive
+ECHO_MARGIN = 2.0           # user speech must exceed the expected echo by this factor
+INITIAL_COUPLING = 1.0      # speaker-to-microphone gain before any echo has been measured
+COUPLING_ADAPT = 0.2        # weight of each echo-only frame in the coupling estimate
+ECHO_BAND = 1.25            # a gated frame is taken as echo-only within this factor of the estimate
+MAX_COUPLING = 4.0
+ENVELOPE_HOP = 0.01         # resolution of the playback envelope in seconds
+
+# The gate already rejects the echo, so the onset can be quicker than the endpointer's
+ONSET_WINDOW = 3
+ONSET_FRAMES = 2
+
+_state = {"running": False, "thread": None, "onset": None}
+_envelopes = {}             # id(Sound) -> (Sound, envelope array)
+stats = {"barge_ins": 0, "stop_latency_ms": 0.0, "interrupt_ms": 0.0, "gated_frames": 0}
+
+
+def _envelope(sound):
+    """RMS of the sound on an ENVELOPE_HOP grid, in 16-bit sample units."""
+    import numpy as np
+    import pygame
+
+    cached = _envelopes.get(id(sound))
+    if cached is not None and cached[0] is sound:
+        return cached[1]
+    samples = pygame.sndarray.array(sound).astype(np.float32)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    hop = max(1, int(pygame.mixer.get_init()[0] * ENVELOPE_HOP))
+    count = max(1, len(samples) // hop)
+    frames = samples[:count * hop].reshape(count, hop) if len(samples) >= hop else samples[None, :]
+    envelope = np.sqrt(np.mean(frames * frames, axis=1))
+    _envelopes[id(sound)] = (sound, envelope)
+    return envelope
+
+
+def expected_echo(start: float, end: float) -> float:
+    """
+    Loudest playback level in [start - ECHO_DELAY_SECONDS, end] (monotonic seconds),
+    the reference for what the microphone may be hearing of the assistant itself.
+    """
+    timeline = mouth.playback_timeline()
+    # Forget envelopes of sounds that are no longer part of the output
+    for key in set(_envelopes) - {id(sound) for _, sound in timeline}:
+        del _envelopes[key]
+
+    level = 0.0
+    for played_at, sound in timeline:
+        envelope = _envelope(sound)
+        first = int((start - ECHO_DELAY_SECONDS - played_at) / ENVELOPE_HOP)
+        last = int((end - played_at) / ENVELOPE_HOP) + 1
+        first, last = max(0, first), min(len(envelope), last)
+        if first < last:
+            level = max(level, float(envelope[first:last].max()))
+    return level
+
+
+class EchoGate:
+    """
+    Voice activity detection for the microphone while the assistant is talking.
+    A frame is user speech when the usual VAD accepts it and its energy is more than
+    ECHO_MARGIN times the echo expected from the playback reference. Gated frames close
+    to the expected echo teach the gate how strongly the speaker couples into the
+    microphone; louder ones may be the user speaking softly and are left out. Each gate
+    lives for one reply and starts from INITIAL_COUPLING.
+
+    Args:
+        noise_floor (float): Background RMS energy of the microphone.
+        gated (bool): Compare against the playback reference. False gives plain VAD.
+    """
+
+    def __init__(self, noise_floor: float, gated: bool = True):
+        floor = max(noise_floor or 0.0, ears.MIN_NOISE_FLOOR)
+        self.loud = floor * ears.LOUD_RATIO
+        self.voiced = floor * ears.VOICED_RATIO
+        self.gated = gated
+        self.coupling = INITIAL_COUPLING
+
+    def is_speech(self, frame: bytes, start: float, end: float) -> bool:
+        energy, zcr = ears.frame_features(frame)
+        vad = energy >= self.loud or (energy >= self.voiced and zcr <= ears.VOICED_ZCR)
+        reference = expected_echo(start, end) if self.gated else 0.0
+        if reference <= 0:
+            return vad
+
+        if vad and energy > ECHO_MARGIN * self.coupling * reference:
+            return True
+        stats["gated_frames"] += vad
+        ratio = energy / reference
+        if ratio <= ECHO_BAND * self.coupling:
+            self.coupling += COUPLING_ADAPT * (min(MAX_COUPLING, ratio) - self.coupling)
+        return False
+
+
+def _run(service, gated: bool) -> None:
+    gate, window = None, deque(maxlen=ONSET_WINDOW)
+    pad = round(ears.PAD_SECONDS / service.frame_seconds)
+    for index, frame, _ in service.follow(service.next_index):
+        if not _state["running"]:
+            return
+        if not mouth.is_speaking():
+            gate = None
+            continue
+        if gate is None:
+            gate = EchoGate(service.noise_floor, gated)
+            window.clear()
+
+        end = service.timestamp(index) or time.monotonic()
+        window.append((index, gate.is_speech(frame, end - service.frame_seconds, end)))
+        if sum(speech for _, speech in window) < ONSET_FRAMES:
+            continue
+
+        onset = next(i for i, speech in window if speech)
+        # Hand the onset to the next turn before the output stops, so waiters find it
+        _state["onset"] = max(0, onset - pad)
+        start = time.monotonic()
+        mouth.interrupt()
+        stopped = time.monotonic()
+        onset_time = service.timestamp(onset)
+        stats["barge_ins"] += 1
+        stats["interrupt_ms"] = (stopped - start) * 1000
+        stats["stop_latency_ms"] = (stopped - (onset_time - service.frame_seconds)) * 1000 if onset_time else 0.0
+        stats["stopped_at"] = stopped
+        if DEBUG: print(f"[barge_in] User spoke, output stopped {stats['stop_latency_ms']:.0f} ms after onset")
+        gate = None
+
+
+def start(service, gated: bool = True) -> None:
+    """Watches the capture service on a background thread and interrupts the assistant when the user talks."""
+    if _state["running"]:
+        return
+    _state.update(running=True, onset=None)
+    _state["thread"] = threading.Thread(target=_run, args=(service, gated), name="barge_in", daemon=True)
+    _state["thread"].start()
+
+
+def stop() -> None:
+    _state["running"] = False
+    if _state["thread"] is not None:
+        _state["thread"].join(timeout=1)
+        _state["thread"] = None
+
+
+def take():
+    """
+    Returns the capture index where the user started talking over the assistant, or None.
+    The caller seeks the capture service there so the interrupting speech becomes the next turn.
+    """
+    onset, _state["onset"] = _state["onset"], None
+    return onset
+
+
+# ── Measurements ──────────────────────────────────────────────────────────────
+
+USER_AT = 2.0           # seconds into the reply at which the fixture user starts talking
+REPLY_SECONDS = 5.0
+ECHO_COUPLING = 0.4     # speaker-to-microphone gain of the fixture room
+ECHO_LAG = 0.08
+
+
+def _fixture(path: str, barge: bool, seed: int) -> tuple:
+    """
+    Writes the microphone side of one trial and returns the reply as a pygame Sound.
+    The microphone hears one second of room noise (calibration), then the reply's echo,
+    and, when barge is set, the user talking over it from USER_AT seconds.
+    """
+    import numpy as np
+    import pygame
+    from extensions.fakes.fake_audio import SAMPLE_RATE, noise, voiced, write_wav
+
+    mouth._channel()
+    frequency, _, channels = pygame.mixer.get_init()
+    reply = voiced(REPLY_SECONDS, pitch=110, level=6000, sample_rate=frequency, seed=seed)
+    wave = np.clip(reply, -32768, 32767).astype(np.int16)
+    if channels > 1:
+        wave = np.repeat(wave[:, None], channels, axis=1)
+    sound = pygame.sndarray.make_sound(np.ascontiguousarray(wave))
+
+    calibration = int(capture.CALIBRATION_SECONDS * SAMPLE_RATE)
+    lag = int(ECHO_LAG * SAMPLE_RATE)
+    mic = noise(1.0 + ECHO_LAG + REPLY_SECONDS + 2.0, seed=seed)
+    echo = voiced(REPLY_SECONDS, pitch=110, level=6000, sample_rate=SAMPLE_RATE, seed=seed) * ECHO_COUPLING
+    mic[calibration + lag:calibration + lag + len(echo)] += echo
+    if barge:
+        user = voiced(1.5, pitch=190, level=6000, seed=seed + 50)
+        offset = calibration + int(USER_AT * SAMPLE_RATE)
+        mic[offset:offset + len(user)] += user
+    write_wav(path, np.clip(mic, -32768, 32767).astype(np.int16))
+    return sound
+
+
+def benchmark(trials: int = 3) -> dict:
+    """
+    Plays a reply while a fixture microphone hears its echo, with and without the user
+    talking over it. Reports how fast the output stops after the user starts, and how
+    often the echo alone stops it, with the playback reference gate and with plain VAD.
+    """
+    import tempfile
+    from extensions.fakes.fake_audio import WavSource
+
+    results = {}
+    for gated in (True, False):
+        latencies, missed, false_stops = [], 0, 0
+        for trial in range(trials):
+            for barge in (True, False):
+                path = os.path.join(tempfile.gettempdir(), f"barge_in_{trial}_{int(barge)}.wav")
+                sound = _fixture(path, barge, seed=20 + trial)
+                service = capture.CaptureService(WavSource(path)).start()
+                stats.pop("stopped_at", None)
+                start(service, gated)
+                played_at = time.monotonic()
+                finished = mouth.play_sound(sound).result(timeout=REPLY_SECONDS + 2)
+                stop()
+                service.stop()
+                take()
+
+                stopped_at = stats.get("stopped_at")
+                if not barge:
+                    false_stops += not finished
+                elif finished or stopped_at is None:
+                    missed += 1
+                elif stopped_at < played_at + USER_AT:
+                    false_stops += 1
+                else:
+                    latencies.append((stopped_at - played_at - USER_AT) * 1000)
+        latencies.sort()
+        results["echo_gate" if gated else "plain_vad"] = {
+            "trials": trials,
+            "p50_stop_ms": round(latencies[len(latencies) // 2]) if latencies else None,
+            "max_stop_ms": round(latencies[-1]) if latencies else None,
+            "missed": missed,
+            "false_stops": false_stops,
+        }
+    results["interrupt_ms"] = round(stats["interrupt_ms"], 2)
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
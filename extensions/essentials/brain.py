@@ -1,15 +1,133 @@
 import re
 import json
-import os
-from google import genai
-from dotenv import load_dotenv
+import threading
+
+import extensions.essentials.backends as backends
 
 # Load environment variables
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+STREAM: bool = settings.brain_stream
+
+class StreamParser:
+    """
+    Incremental parser for the top-level members of the brain's JSON reply.
+    Each member is decoded as soon as its value is syntactically complete, so
+    the caller does not have to wait for the closing brace or trailing tokens.
+    Anything before the first '{' (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.members = {}
+        self.text = ""
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._mode = "key"  # "key" -> "value" -> "after" -> "key" ...
+        self._key = None
+        self._buf = []
+
+    def feed(self, chunk: str) -> None:
+        self.text += chunk
+        for ch in chunk:
+            if self.done:
+                return
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._mode == "value":
+                        self._end_member()
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._buf.append(ch)
+            elif ch in "{[":
+                self._depth += 1
+                self._buf.append(ch)
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._mode == "value":
+                        self._end_member()
+                    self.done = True
+                else:
+                    self._buf.append(ch)
+                    if self._depth == 1 and self._mode == "value":
+                        self._end_member()
+            elif self._depth == 1 and ch == ":" and self._mode == "key":
+                self._key = json.loads("".join(self._buf))
+                self._mode = "value"
+                self._buf = []
+            elif self._depth == 1 and ch == ",":
+                if self._mode == "value":
+                    self._end_member()
+                self._mode = "key"
+                self._buf = []
+            elif self._mode != "after":
+                self._buf.append(ch)
+
+    def _end_member(self):
+        raw = "".join(self._buf).strip()
+        try:
+            self.members[self._key] = json.loads(raw)
+        except json.JSONDecodeError:
+            if DEBUG: print(f"[brain] Could not decode member '{self._key}': {raw}")
+        self._mode = "after"
+        self._buf = []
+
+    def decision(self) -> dict:
+        """
+        Returns the decision once function_name and a complete args object have arrived,
+        or once the complete calls list of a compound request has arrived.
+        """
+        if isinstance(self.members.get("calls"), list):
+            return {"calls": self.members["calls"]}
+        if isinstance(self.members.get("function_name"), str) and isinstance(self.members.get("args"), dict):
+            return {"function_name": self.members["function_name"], "args": self.members["args"]}
+        return None
+
+_warmer = {"callback": None}
+
+def set_warmer(callback) -> None:
+    """
+    Registers callback(function_name), called on a background thread as soon as a streamed
+    decision names its function. The callback decides what a valid name is: the model's
+    output is never imported by the brain itself.
+    """
+    _warmer["callback"] = callback
+
+def _warm_action(function_name: str) -> None:
+    try:
+        _warmer["callback"](function_name)
+    except Exception as e:
+        if DEBUG: print(f"[brain] Could not warm '{function_name}': {e}")
 
-# Initialize the Gemini Client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+_sinks = []
+
+def add_sink(callback) -> None:
+    """Registers callback(user_input, decision), called after every successful decision."""
+    _sinks.append(callback)
+
+def _notify(user_input: str, decision: dict) -> None:
+    if decision.get("function_name") == "error":
+        return
+    for callback in _sinks:
+        try:
+            callback(user_input, decision)
+        except Exception as e:
+            if DEBUG: print(f"[brain] Sink failed: {e}")
 
 def clean_json_response(response_text: str) -> dict:
     """
@@ -28,16 +146,44 @@ def clean_json_response(response_text: str) -> dict:
         # Return a safe error structure if parsing fails
         return {"function_name": "error", "args": {"message": "Invalid JSON from AI"}}
 
-def think(user_input: str, tools_definations: str) -> dict:
+def _think_stream(prompt: str, response_schema: dict = None) -> dict:
+    """
+    Consumes the model response incrementally and returns as soon as the decision
+    is complete. The target action is warmed while the arguments are still streaming.
+    """
+    parser = StreamParser()
+    warming = False
+
+    for text in backends.stream(prompt, response_schema):
+        parser.feed(text)
+
+        function_name = parser.members.get("function_name")
+        if function_name and not warming and _warmer["callback"] is not None:
+            warming = True
+            threading.Thread(target=_warm_action, args=(function_name,), daemon=True).start()
+
+        decision = parser.decision()
+        if decision:
+            # Leaving the loop closes the stream without waiting for trailing tokens
+            return decision
+
+    return clean_json_response(parser.text)
+
+def think(user_input: str, tools_definations: str, stream: bool = STREAM, response_schema: dict = None,
+          alternatives: list = None) -> dict:
     """
     Decodes the natural-language user command into a structured Python dictionary.
     
     Args:
         user_input (str): The text spoken by the user.
         tools_definations (str): A large string containing the definations of all available functions.
+        stream (bool): Parse the response while it streams in and return early.
+        response_schema (dict): JSON schema the reply must follow (see schema.response_schema).
+        alternatives (list): Less likely transcriptions of the same utterance from the speech recognizer.
     
     Returns:
-        dict: A dictionary containing 'function_name' and 'args'.
+        dict: A dictionary containing 'function_name' and 'args', or 'calls' (a list
+            of such dictionaries with 'depends_on' hints) for compound requests.
     """
     
     # We construct a strict prompt that acts as the "System Instruction"
@@ -54,6 +200,9 @@ def think(user_input: str, tools_definations: str) -> dict:
     2. Select the most appropriate function from the AVAILABLE TOOLS.
     3. Extract the necessary arguments from the request.
     4. Return ONLY a raw JSON object. Do not include markdown formatting or explanations.
+    5. If the request asks for several things, return them all as "calls" in the order asked.
+       List in "depends_on" the indexes of earlier calls that must finish first; leave it empty
+       when the call is independent.
     
     ### OUTPUT SCHEMA
     {{
@@ -63,21 +212,42 @@ def think(user_input: str, tools_definations: str) -> dict:
         }}
     }}
     
+    ### OUTPUT SCHEMA FOR SEVERAL REQUESTS
+    {{
+        "calls": [
+            {{"function_name": "first_function", "args": {{}}, "depends_on": []}},
+            {{"function_name": "second_function", "args": {{}}, "depends_on": [0]}}
+        ]
+    }}
+    
     ### USER REQUEST
     "{user_input}"
     """
 
+    if alternatives:
+        # Let the model recover from a misheard word instead of re-prompting the user
+        listed = "\n    ".join(f'"{text}"' for text in alternatives)
+        prompt += f"""
+    ### OTHER POSSIBLE TRANSCRIPTIONS
+    The speech recognizer was not certain. If the USER REQUEST does not map to a tool,
+    use the first of these that does:
+    {listed}
+    """
+
     if DEBUG:
         print(f"--- Sending Prompt to AI ---\nLength: {len(prompt)} chars")
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
-        
-        # Extract text and parse it into a real Python dictionary
-        return clean_json_response(response.text)
+        if stream:
+            decision = _think_stream(prompt, response_schema)
+        else:
+            response_text = "".join(backends.stream(prompt, response_schema))
+
+            # Extract text and parse it into a real Python dictionary
+            decision = clean_json_response(response_text)
+
+        _notify(user_input, decision)
+        return decision
 
     except Exception as e:
         if DEBUG:
@@ -0,0 +1,221 @@
+import os
+import time
+import threading
+from collections import deque
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2                    # 16-bit mono PCM
+FRAME_SAMPLES = 480                 # 30 ms frames
+BUFFER_SECONDS = settings.capture_buffer_seconds
+
+CALIBRATION_SECONDS = 1.0
+NOISE_ADAPT = 0.05                  # weight of each new non-speech frame in the noise floor
+SPEECH_RATIO = 3.0                  # a frame is speech when its energy exceeds noise floor * ratio
+MIN_THRESHOLD = 100.0
+
+
+def frame_energy(frame: bytes) -> float:
+    """RMS energy of a 16-bit PCM frame."""
+    import numpy as np
+
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+
+
+class MicrophoneSource:
+    """Keeps one microphone input stream open for the lifetime of the process."""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_samples: int = FRAME_SAMPLES):
+        import speech_recognition as sr
+
+        self.sample_rate = sample_rate
+        self.sample_width = SAMPLE_WIDTH
+        self.frame_samples = frame_samples
+        self._microphone = sr.Microphone(sample_rate=sample_rate, chunk_size=frame_samples)
+        self._microphone.__enter__()
+
+    def read(self) -> bytes:
+        return self._microphone.stream.read(self.frame_samples)
+
+    def close(self) -> None:
+        self._microphone.__exit__(None, None, None)
+
+
+class CaptureService:
+    """
+    Reads frames from an audio source on a background thread into a fixed-size ring
+    buffer. The noise floor is calibrated once at startup and then follows the
+    non-speech frames, so a turn never has to stop and re-measure the room.
+
+    Args:
+        source: Object with read() -> bytes of one frame, sample_rate, sample_width
+            and frame_samples, e.g. MicrophoneSource or fakes.fake_audio.WavSource.
+        buffer_seconds (float): How much audio the ring buffer keeps.
+    """
+
+    def __init__(self, source, buffer_seconds: float = BUFFER_SECONDS):
+        self.source = source
+        self.frame_seconds = source.frame_samples / source.sample_rate
+        self._frames = deque(maxlen=max(1, int(buffer_seconds / self.frame_seconds)))  # (index, frame, energy)
+        self._times = deque(maxlen=self._frames.maxlen)  # monotonic time each frame finished arriving
+        self._next_index = 0
+        self._cursor = 0  # first frame not yet handed out by frames()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.noise_floor = None
+        self.stats = {"frames": 0, "dropped": 0, "calibration_ms": 0.0}
+
+    @property
+    def threshold(self) -> float:
+        return max(MIN_THRESHOLD, (self.noise_floor or 0.0) * SPEECH_RATIO)
+
+    def start(self) -> "CaptureService":
+        if self._running:
+            return self
+        self._running = True
+        self._calibrate()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self.source.close()
+
+    def _calibrate(self) -> None:
+        start = time.perf_counter()
+        energies = []
+        for _ in range(max(1, int(CALIBRATION_SECONDS / self.frame_seconds))):
+            frame = self.source.read()
+            if not frame:
+                break
+            energies.append(frame_energy(frame))
+        self.noise_floor = sum(energies) / len(energies) if energies else 0.0
+        self.stats["calibration_ms"] = (time.perf_counter() - start) * 1000
+        if DEBUG: print(f"[capture] Noise floor {self.noise_floor:.0f} after {self.stats['calibration_ms']:.0f} ms")
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                frame = self.source.read()
+            except Exception as e:
+                if DEBUG: print(f"[capture] Read failed: {e}")
+                frame = b""
+            if not frame:
+                # Source exhausted (fakes) or the device hiccuped
+                time.sleep(self.frame_seconds)
+                continue
+
+            energy = frame_energy(frame)
+            if energy < self.threshold:
+                self.noise_floor += NOISE_ADAPT * (energy - self.noise_floor)
+
+            with self._condition:
+                if len(self._frames) == self._frames.maxlen:
+                    self.stats["dropped"] += 1
+                self._frames.append((self._next_index, frame, energy))
+                self._times.append(time.monotonic())
+                self._next_index += 1
+                self.stats["frames"] += 1
+                self._condition.notify_all()
+
+    def _frames_from(self, index: int) -> list:
+        """Frames at or after index that are still in the buffer. Call with the condition held."""
+        return [item for item in self._frames if item[0] >= index]
+
+    def _wait_for(self, index: int, deadline: float) -> list:
+        with self._condition:
+            while self._running and self._next_index <= index:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+            return self._frames_from(index)
+
+    @property
+    def next_index(self) -> int:
+        """Index the next captured frame will get."""
+        with self._condition:
+            return self._next_index
+
+    def timestamp(self, index: int) -> float:
+        """Monotonic time at which frame index finished arriving, or None once it left the buffer."""
+        with self._condition:
+            if not self._frames or index < self._frames[0][0] or index >= self._next_index:
+                return None
+            return self._times[index - self._frames[0][0]]
+
+    def flush(self) -> None:
+        """Skips everything captured so far, e.g. the assistant's own prompt."""
+        with self._condition:
+            self._cursor = self._next_index
+
+    def seek(self, index: int) -> None:
+        """Moves the read cursor, e.g. to the first frame after a wake word."""
+        with self._condition:
+            self._cursor = index
+
+    def frames(self, timeout: float = None):
+        """
+        Yields (index, frame, energy) from the read cursor onwards as they are captured,
+        advancing the cursor. Stops when no frame arrives within timeout seconds.
+        """
+        while True:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            items = self._wait_for(self._cursor, deadline)
+            if not items:
+                return
+            for item in items:
+                self._cursor = item[0] + 1
+                yield item
+
+    def follow(self, index: int, timeout: float = None):
+        """Like frames(), but from index onwards and without moving the shared read cursor."""
+        while True:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            items = self._wait_for(index, deadline)
+            if not items:
+                return
+            for item in items:
+                index = item[0] + 1
+                yield item
+
+    def before(self, index: int, count: int) -> list:
+        """The frames captured just before index that are still in the buffer."""
+        with self._condition:
+            return [frame for i, frame, _ in self._frames_from(index - count) if i < index]
+
+
+_service = {"capture": None}
+
+
+def get(source=None) -> CaptureService:
+    """Returns the process-wide capture service, starting it on first use."""
+    if _service["capture"] is None:
+        _service["capture"] = CaptureService(source or MicrophoneSource()).start()
+    return _service["capture"]
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import extensions.essentials.ears as ears
+    from extensions.fakes.fake_audio import WavSource, write_wav, synthetic_utterance
+
+    path = sys.argv[1] if len(sys.argv) > 1 else write_wav(
+        os.path.join(tempfile.gettempdir(), "capture_demo.wav"), synthetic_utterance())
+    service = CaptureService(WavSource(path)).start()
+    start = time.perf_counter()
+    audio = ears.endpoint(service, timeout=5)
+    elapsed = time.perf_counter() - start
+    seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width) if audio else 0
+    print(f"noise floor {service.noise_floor:.0f}, phrase of {seconds:.2f} s after {elapsed:.2f} s, {service.stats}")
+    service.stop()
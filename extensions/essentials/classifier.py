@@ -0,0 +1,324 @@
+import os
+import re
+import json
+import time
+import zlib
+import threading
+from collections import Counter, defaultdict
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+BASE_DIR   = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LOG_FILE   = os.path.join(BASE_DIR, "brain_log.jsonl")
+MODEL_FILE = os.path.join(BASE_DIR, "intent_model.npz")
+
+THRESHOLD = settings.local_intent_threshold
+
+DIMENSIONS = 2 ** 14
+MAX_CATEGORIES = 12     # args with more distinct values are extracted as spans
+MIN_COVERAGE = 0.8      # share of examples a slot rule must explain to be trusted
+
+_WORD = re.compile(r"[a-z0-9']+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+_state = {"model": {}}  # loaded model, see load(); replaced whole, never edited in place
+_log_lock = threading.Lock()
+stats = {"load_ms": 0.0, "inferences": 0, "inference_ms": 0.0, "local": 0, "deferred": 0}
+
+
+# ── Logging sink ──────────────────────────────────────────────────────────────
+
+def log(user_input: str, decision: dict) -> None:
+    """Appends an utterance -> decision pair produced by the brain to the training log."""
+    if decision.get("function_name") in (None, "error"):
+        return
+    record = {"text": user_input, "function_name": decision["function_name"], "args": decision.get("args") or {}}
+    with _log_lock:
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_log(log_file: str = None) -> list:
+    log_file = log_file or LOG_FILE
+    if not os.path.exists(log_file):
+        return []
+    with open(log_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ── Features ──────────────────────────────────────────────────────────────────
+
+def _words(text: str) -> list:
+    return _WORD.findall(text.lower())
+
+
+def features(text: str):
+    """Hashed word unigram, bigram and character trigram counts, L2-normalised."""
+    import numpy as np
+
+    words = _words(text)
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {' '.join(words)} "
+    grams += [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    x = np.zeros(DIMENSIONS, dtype=np.float32)
+    for gram in grams:
+        x[zlib.crc32(gram.encode("utf-8")) % DIMENSIONS] += 1.0
+    norm = np.linalg.norm(x)
+    return x / norm if norm else x
+
+
+def _fit(X, y, classes: int, epochs: int = 300, lr: float = 0.5, l2: float = 1e-4):
+    """Multinomial logistic regression by full-batch gradient descent."""
+    import numpy as np
+
+    W = np.zeros((X.shape[1], classes), dtype=np.float32)
+    b = np.zeros(classes, dtype=np.float32)
+    Y = np.eye(classes, dtype=np.float32)[y]
+    for _ in range(epochs):
+        P = _softmax(X @ W + b)
+        G = (P - Y) / len(X)
+        W -= lr * (X.T @ G + l2 * W)
+        b -= lr * G.sum(axis=0)
+    return W, b
+
+
+def _softmax(Z):
+    import numpy as np
+
+    Z = Z - Z.max(axis=-1, keepdims=True)
+    E = np.exp(Z)
+    return E / E.sum(axis=-1, keepdims=True)
+
+
+# ── Slots ─────────────────────────────────────────────────────────────────────
+
+def _learn_slot(examples: list, name: str) -> dict:
+    """
+    Learns how to fill one argument from the utterances of one function.
+
+    - "number":   numeric values, found as the number followed by a learned unit word
+    - "span":     text copied from the utterance between learned context words
+    - "category": few distinct values, predicted by their own small classifier
+    Returns None when no rule explains enough of the examples.
+    """
+    pairs = [(ex["text"], ex["args"].get(name)) for ex in examples if ex["args"].get(name) not in (None, "")]
+    if not pairs:
+        return None
+
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for _, v in pairs):
+        units = Counter()
+        for text, value in pairs:
+            words = _words(text)
+            for i, word in enumerate(words[:-1]):
+                if _NUMBER.fullmatch(word) and float(word) == value:
+                    units[words[i + 1]] += 1
+        covered = sum(units.values())
+        if covered >= MIN_COVERAGE * len(pairs):
+            return {"kind": "number", "units": sorted(units)}
+        return None
+
+    # Text copied from the utterance generalises to unseen values, so try spans first
+    prefixes, suffixes, covered = Counter(), Counter(), 0
+    for text, value in pairs:
+        words, span = _words(text), _words(str(value))
+        for i in range(1, len(words) - len(span) + 1):
+            if span and words[i:i + len(span)] == span:
+                covered += 1
+                prefixes[" ".join(words[max(0, i - 2):i])] += 1
+                prefixes[words[i - 1]] += 1
+                if i + len(span) < len(words):
+                    suffixes[words[i + len(span)]] += 1
+                break
+    if covered >= MIN_COVERAGE * len(pairs):
+        return {"kind": "span", "prefixes": [p for p, _ in prefixes.most_common()], "suffixes": sorted(suffixes)}
+
+    values = Counter(str(v) for _, v in pairs)
+    if len(values) <= MAX_CATEGORIES and min(values.values()) >= 2:
+        return {"kind": "category", "values": sorted(values)}
+    return None
+
+
+def _extract_span(words: list, rule: dict) -> str:
+    for prefix in rule["prefixes"]:
+        prefix_words = prefix.split()
+        for i in range(len(words) - len(prefix_words) + 1):
+            if words[i:i + len(prefix_words)] == prefix_words:
+                start = i + len(prefix_words)
+                end = next((j for j in range(start + 1, len(words)) if words[j] in rule["suffixes"]), len(words))
+                if start < end:
+                    return " ".join(words[start:end])
+    return None
+
+
+def _extract_number(words: list, rule: dict):
+    for i, word in enumerate(words[:-1]):
+        if _NUMBER.fullmatch(word) and words[i + 1] in rule["units"]:
+            value = float(word)
+            return int(value) if value.is_integer() else value
+    return None
+
+
+# ── Training ──────────────────────────────────────────────────────────────────
+
+def train(records: list, tool_manifest: dict = None, holdout: float = 0.2) -> dict:
+    """
+    Fits the intent classifier and slot rules on logged brain decisions and saves them.
+    Returns the holdout accuracy of the function_name prediction.
+    """
+    import numpy as np
+
+    if not records:
+        raise ValueError("No logged decisions to train on.")
+
+    names = sorted({r["function_name"] for r in records})
+    index = {name: i for i, name in enumerate(names)}
+    X = np.stack([features(r["text"]) for r in records])
+    y = np.array([index[r["function_name"]] for r in records])
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(records))
+    cut = int(len(records) * (1 - holdout)) if len(records) >= 10 else len(records)
+    train_idx, test_idx = order[:cut], order[cut:]
+
+    W, b = _fit(X[train_idx], y[train_idx], len(names))
+    accuracy = float((np.argmax(X[test_idx] @ W + b, axis=1) == y[test_idx]).mean()) if len(test_idx) else None
+
+    # Refit on everything for the shipped model
+    W, b = _fit(X, y, len(names))
+
+    by_function = defaultdict(list)
+    for r in records:
+        by_function[r["function_name"]].append(r)
+
+    slots, slot_models, answerable, required_slots = {}, {}, [], {}
+    for name, examples in by_function.items():
+        arg_names = Counter(arg for ex in examples for arg in ex["args"])
+        required = {p["name"] for p in (tool_manifest or {}).get(name, {}).get("params", []) if p["required"]}
+        rules, ok = {}, True
+        for arg, count in arg_names.items():
+            rule = _learn_slot(examples, arg)
+            if rule is None:
+                # An argument that is always given but cannot be extracted makes the function unanswerable
+                if arg in required or count >= MIN_COVERAGE * len(examples):
+                    ok = False
+                continue
+            if rule["kind"] == "category":
+                texts = [ex for ex in examples if ex["args"].get(arg) not in (None, "")]
+                labels = np.array([rule["values"].index(str(ex["args"][arg])) for ex in texts])
+                sW, sb = _fit(np.stack([features(ex["text"]) for ex in texts]), labels, len(rule["values"]))
+                slot_models[f"{name}.{arg}.W"], slot_models[f"{name}.{arg}.b"] = sW, sb
+            rules[arg] = rule
+        if ok and required <= set(rules):
+            answerable.append(name)
+        slots[name] = rules
+        # Args that are always given must be found in the utterance before answering locally
+        always = {arg for arg, count in arg_names.items() if count == len(examples)}
+        required_slots[name] = sorted((required | always) & set(rules))
+
+    meta = {"names": names, "slots": slots, "required": required_slots, "answerable": answerable,
+            "trained_on": len(records), "accuracy": accuracy}
+    np.savez_compressed(MODEL_FILE, W=W, b=b, meta=np.array(json.dumps(meta)), **slot_models)
+    load()
+    return {"accuracy": accuracy, "examples": len(records), "answerable": answerable}
+
+
+# ── Runtime ───────────────────────────────────────────────────────────────────
+
+def load(model_file: str = None) -> bool:
+    """Loads the trained model if there is one. Returns True when a model is ready."""
+    import numpy as np
+
+    model_file = model_file or MODEL_FILE
+    start = time.perf_counter()
+    if not os.path.exists(model_file):
+        _state["model"] = {}
+        return False
+    data = np.load(model_file)
+    model = {key: data[key] for key in data.files if key != "meta"}
+    model["meta"] = json.loads(str(data["meta"]))
+    # One assignment, so predict() on another thread sees either the old model or the new one
+    _state["model"] = model
+    stats["load_ms"] = (time.perf_counter() - start) * 1000
+    if DEBUG: print(f"[classifier] Loaded model in {stats['load_ms']:.1f} ms")
+    return True
+
+
+def _predict(model: dict, user_input: str, threshold: float) -> dict:
+    import numpy as np
+
+    meta = model["meta"]
+    x = features(user_input)
+    probs = _softmax(x @ model["W"] + model["b"])
+    best = int(np.argmax(probs))
+    name = meta["names"][best]
+
+    decision = None
+    if probs[best] >= threshold and name in meta["answerable"]:
+        words = _words(user_input)
+        args = {}
+        for arg, rule in meta["slots"][name].items():
+            if rule["kind"] == "category":
+                slot_probs = _softmax(x @ model[f"{name}.{arg}.W"] + model[f"{name}.{arg}.b"])
+                value = rule["values"][int(np.argmax(slot_probs))]
+            elif rule["kind"] == "number":
+                value = _extract_number(words, rule)
+            else:
+                value = _extract_span(words, rule)
+            if value is not None:
+                args[arg] = value
+        # Models trained before "required" was recorded treat every slot as required
+        required = meta.get("required", {}).get(name, list(meta["slots"][name]))
+        if all(arg in args for arg in required):
+            decision = {"function_name": name, "args": args}
+    return decision
+
+
+def predict(user_input: str, threshold: float = THRESHOLD, alternatives: list = ()) -> dict:
+    """
+    Answers the command locally when the classifier is confident enough and every
+    slot could be filled. When it is not, the alternatives (less likely transcriptions
+    of the same utterance) are tried in order. Counts one inference per turn.
+
+    Returns:
+        dict: A dictionary containing 'function_name' and 'args', or None to defer to the LLM.
+    """
+    model = _state["model"]
+    if not model:
+        return None
+
+    start = time.perf_counter()
+    decision = None
+    for text in [user_input, *alternatives]:
+        decision = _predict(model, text, threshold)
+        if decision:
+            break
+
+    stats["inferences"] += 1
+    stats["inference_ms"] += (time.perf_counter() - start) * 1000
+    stats["local" if decision else "deferred"] += 1
+    return decision
+
+
+def report() -> dict:
+    inferences = stats["inferences"] or 1
+    return {
+        "load_ms": round(stats["load_ms"], 2),
+        "avg_inference_ms": round(stats["inference_ms"] / inferences, 3),
+        "local_share": stats["local"] / inferences,
+        "turns": stats["inferences"],
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import extensions.essentials.manifest as manifest
+
+    if len(sys.argv) > 1 and sys.argv[1] == "train":
+        print(train(read_log(), manifest.build()))
+    else:
+        load()
+        for text in sys.argv[1:] or ["open youtube", "remind me to stretch in 10 minutes"]:
+            print(f"{text!r} -> {predict(text)}")
+        print(report())
@@ -0,0 +1,254 @@
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+from extensions.essentials.health import percentile_ms
+
+HOST = "127.0.0.1"          # local clients only: the API runs actions on this machine
+PORT = settings.daemon_port
+MAX_BODY = 64 * 1024
+
+# API
+#   POST /command  {"text": "check battery", "alternatives": [], "speak": false, "client": "cli"}
+#                  -> {"text", "source", "calls", "results", "message", "ms"}
+#                  "cancel that" only cancels the jobs started by the same client
+#   GET  /health   -> {"status": "ok", "uptime_s", "requests", "in_flight"}
+#   GET  /metrics  -> request latency percentiles plus whatever the assistant reports
+
+
+class BadRequest(ValueError):
+    """A request body the API cannot accept. Answered with 400, unlike errors of the handler."""
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128    # the default backlog of 5 drops connections under a burst of clients
+
+
+class Daemon:
+    """
+    Local HTTP API that hands text commands to the running assistant. Every request is
+    served on its own thread, so clients do not wait for each other; the actions they
+    trigger share the assistant's executor and caches.
+
+    Args:
+        handler (callable): handler(text, alternatives=None, speak=False, client="default") -> dict.
+        port (int): 0 picks a free port.
+        metrics (callable): Returns extra fields for GET /metrics.
+    """
+
+    def __init__(self, handler, port: int = PORT, host: str = HOST, metrics=None):
+        self.handler = handler
+        self.metrics = metrics
+        self.started = time.monotonic()
+        self.latencies = deque(maxlen=2000)
+        self.stats = {"requests": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._http_handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "Daemon":
+        threading.Thread(target=self._server.serve_forever, name="daemon", daemon=True).start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def health(self) -> dict:
+        return {"status": "ok", "uptime_s": round(time.monotonic() - self.started, 1),
+                "requests": self.stats["requests"], "in_flight": self.stats["in_flight"]}
+
+    def report(self) -> dict:
+        with self._lock:
+            samples = list(self.latencies)
+        report = {**self.stats, "p50_ms": percentile_ms(samples, 50, 2), "p95_ms": percentile_ms(samples, 95, 2),
+                  "p99_ms": percentile_ms(samples, 99, 2)}
+        if self.metrics is not None:
+            report.update(self.metrics())
+        return report
+
+    def command(self, body: dict) -> dict:
+        text = body.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise BadRequest('"text" must be a non-empty string')
+        alternatives = [a for a in body.get("alternatives") or [] if isinstance(a, str)]
+        client = body.get("client") or "default"
+        if not isinstance(client, str):
+            raise BadRequest('"client" must be a string')
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        start = time.perf_counter()
+        try:
+            return self.handler(text.strip(), alternatives=alternatives, speak=bool(body.get("speak")), client=client)
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats["in_flight"] -= 1
+                self.latencies.append(time.perf_counter() - start)
+
+    def _http_handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, so a client can reuse its connection
+
+            def log_message(self, *args):
+                if DEBUG: super().log_message(*args)
+
+            def _send(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload, default=str).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send(200, daemon.health())
+                elif self.path == "/metrics":
+                    self._send(200, daemon.report())
+                else:
+                    self._send(404, {"error": f"No such endpoint: {self.path}"})
+
+            def do_POST(self):
+                if self.path != "/command":
+                    self._send(404, {"error": f"No such endpoint: {self.path}"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY:
+                    self._send(413, {"error": "Request body too large"})
+                    self.close_connection = True
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    if not isinstance(body, dict):
+                        raise ValueError("The body must be a JSON object")
+                except ValueError as e:
+                    self._send(400, {"error": f"Bad request: {e}"})
+                    return
+                try:
+                    self._send(200, daemon.command(body))
+                except BadRequest as e:
+                    self._send(400, {"error": str(e)})
+                except Exception as e:
+                    # Including a ValueError from the handler: the request itself was fine
+                    print(f"Error: {e}")
+                    self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        return Handler
+
+
+# ── Measurements ──────────────────────────────────────────────────────────────
+
+# A realistic mix: fast-path actions, a CPU-bound one, and phrasings only the LLM understands
+COMMANDS = [
+    "how much memory is used",
+    "check battery",
+    "what is 12 times 7",
+    "cpu usage",
+    "is my laptop plugged in",
+    "how is the ram doing right now",
+]
+LLM_REPLY = json.dumps({"function_name": "system_info", "args": {"query": "battery"}})
+
+
+def benchmark(handler, clients: tuple = (1, 8, 32), requests_per_client: int = 25) -> dict:
+    """
+    Drives a daemon with many parallel clients and reports throughput and latency per
+    client count, next to what one command costs as a fresh process.
+    """
+    import os
+    import sys
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+    import extensions.essentials.daemon_client as daemon_client
+
+    server = Daemon(handler, port=0).start()
+    report = {}
+    try:
+        for command in COMMANDS:
+            daemon_client.send(command, url=server.url)     # warm the caches once, as a running daemon would
+
+        for count in clients:
+            def client(i):
+                latencies, errors = [], 0
+                for j in range(requests_per_client):
+                    start = time.perf_counter()
+                    try:
+                        reply = daemon_client.send(COMMANDS[(i + j) % len(COMMANDS)], url=server.url)
+                        errors += not all(result["ok"] for result in reply["results"])
+                    except OSError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - start)
+                return latencies, errors
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                outcomes = list(pool.map(client, range(count)))
+            wall = time.perf_counter() - start
+            latencies = sorted(latency for latencies, _ in outcomes for latency in latencies)
+            report[f"{count}_clients"] = {
+                "requests": len(latencies),
+                "errors": sum(errors for _, errors in outcomes),
+                "per_second": round(len(latencies) / wall, 1),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2),
+            }
+        report["daemon"] = {key: value for key, value in server.report().items()
+                            if key in ("requests", "errors", "max_in_flight")}
+    finally:
+        server.stop()
+
+    # The same command paying full process startup, as every script had to before
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import main; main.handle_command({COMMANDS[0]!r}); main.executor.shutdown()"],
+                   cwd=root, capture_output=True, env={**os.environ, "HOT_RELOAD": "False"}, timeout=120)
+    report["fresh_process_ms"] = round((time.perf_counter() - start) * 1000)
+    return report
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import extensions.essentials.backends as backends
+    import extensions.essentials.classifier as classifier
+    import extensions.essentials.decision_cache as decision_cache
+    from extensions.fakes.fake_llm_server import FakeLLMServer
+    import main     # the assistant's wiring; run from the repository root
+
+    # An offline stand-in for the LLM, and scratch files for what it would teach the caches
+    llm = FakeLLMServer(reply=LLM_REPLY, first_delay=0.3).start()
+    backends.configure([backends.OpenAICompatibleBackend(llm.url, name="fake")])
+    scratch = tempfile.mkdtemp(prefix="daemon_bench_")
+    decision_cache.CACHE_FILE = os.path.join(scratch, "decision_cache.json")
+    classifier.LOG_FILE = os.path.join(scratch, "brain_log.jsonl")
+    try:
+        print(json.dumps(benchmark(main.handle_command), indent=2))
+    finally:
+        llm.stop()
+        main.executor.shutdown()
+        decision_cache.flush()
+        for name in os.listdir(scratch):
+            os.remove(os.path.join(scratch, name))
+        os.rmdir(scratch)
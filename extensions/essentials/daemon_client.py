@@ -0,0 +1,77 @@
+import sys
+import json
+import argparse
+import urllib.error
+import urllib.request
+
+from extensions.essentials.settings import settings
+
+# Thin on purpose: only the standard library and the settings, so a script or hotkey
+# pays a bare interpreter start and not the assistant's
+URL = f"http://127.0.0.1:{settings.daemon_port}"
+CLIENT = "cli"      # the daemon's "cancel that" only reaches jobs started under the same name
+
+
+def _request(method: str, path: str, body: dict = None, url: str = URL, timeout: float = 120.0) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        # The daemon explains its errors in a JSON body
+        try:
+            message = json.loads(e.read()).get("error", str(e))
+        except ValueError:
+            message = str(e)
+        raise RuntimeError(f"The daemon answered {e.code}: {message}") from None
+
+
+def send(text: str, alternatives: list = None, speak: bool = False, url: str = URL, timeout: float = 120.0,
+         client: str = CLIENT) -> dict:
+    """
+    Runs a text command on the daemon and waits for its results.
+
+    Returns:
+        dict: {"text", "source", "calls", "results": [{"ok", "value" or "error"}], "message", "ms"}
+    """
+    return _request("POST", "/command", {"text": text, "alternatives": alternatives or [], "speak": speak,
+                                         "client": client}, url, timeout)
+
+
+def health(url: str = URL) -> dict:
+    return _request("GET", "/health", url=url, timeout=5.0)
+
+
+def metrics(url: str = URL) -> dict:
+    return _request("GET", "/metrics", url=url, timeout=5.0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a text command to the running assistant daemon (main.py --daemon)")
+    parser.add_argument("text", nargs="*", help="the command, e.g. check battery")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--speak", action="store_true", help="also say the reply out loud")
+    parser.add_argument("--client", default=CLIENT, help="name to run under; cancel that only reaches its jobs")
+    parser.add_argument("--json", action="store_true", help="print the whole structured reply")
+    parser.add_argument("--health", action="store_true")
+    parser.add_argument("--metrics", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        if args.health or args.metrics:
+            print(json.dumps(health(args.url) if args.health else metrics(args.url), indent=2))
+            sys.exit(0)
+        if not args.text:
+            parser.error("a command is required")
+        reply = send(" ".join(args.text), speak=args.speak, url=args.url, client=args.client)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(reply, indent=2, default=str))
+    else:
+        print(reply["message"] or "; ".join(r.get("error", "") for r in reply["results"]) or "(no reply)")
+    sys.exit(0 if all(result["ok"] for result in reply["results"]) else 1)
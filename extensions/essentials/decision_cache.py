@@ -0,0 +1,197 @@
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+
+import extensions.essentials.brain as brain
+import extensions.essentials.plan as plan
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+BASE_DIR   = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_FILE = os.path.join(BASE_DIR, "decision_cache.json")
+
+MAX_ENTRIES = 500
+TTL_SECONDS = 7 * 24 * 3600
+SAVE_DELAY = 2.0    # seconds: the changes of a busy stretch are written to disk together
+
+# Decisions that must always go to the model: "error" is a failed parse and
+# "talk" carries a free-form answer that may depend on the moment it was asked.
+UNCACHEABLE = {"error", "talk"}
+
+# Only words that never change what is asked: "me", "for" or "the" can
+FILLER_WORDS = {
+    "please", "hey", "hi", "um", "uh", "uhh", "hmm", "ok", "okay", "so", "just", "kindly",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+_entries = OrderedDict()  # "<tools hash>:<normalized utterance>" -> {"decision": dict, "created": float}
+_lock = threading.Lock()
+_write_lock = threading.Lock()  # keeps flushes in order; lookups never wait for the disk
+_state = {"loaded": False, "dirty": False, "timer": None}
+stats = {"hits": 0, "misses": 0}
+
+
+def normalize(text: str) -> str:
+    """Lowercases the utterance and strips punctuation and filler words."""
+    words = _PUNCTUATION.sub(" ", text.lower()).split()
+    kept = [w for w in words if w not in FILLER_WORDS]
+    # An utterance made only of filler words is still a valid key
+    return " ".join(kept or words)
+
+
+def tools_hash(tools_definations: str) -> str:
+    return hashlib.sha256(tools_definations.encode("utf-8")).hexdigest()[:16]
+
+
+def _key(user_input: str, tools_definations: str) -> str:
+    # Callers pass the whole manifest's definations: any change to an action changes
+    # the hash, so stale entries stop matching and age out of the LRU
+    return f"{tools_hash(tools_definations)}:{normalize(user_input)}"
+
+
+def _load():
+    _state["loaded"] = True
+    if not os.path.exists(CACHE_FILE):
+        return
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        if DEBUG: print(f"[decision_cache] Ignoring unreadable cache: {e}")
+        return
+    now = time.time()
+    for key, entry in data.items():
+        if now - entry["created"] < TTL_SECONDS:
+            _entries[key] = entry
+
+
+def _save():
+    """Marks the entries as changed and schedules a flush. Called with _lock held."""
+    _state["dirty"] = True
+    if _state["timer"] is None:
+        _state["timer"] = threading.Timer(SAVE_DELAY, flush)
+        _state["timer"].daemon = True
+        _state["timer"].start()
+
+
+def flush() -> None:
+    """Writes pending changes to CACHE_FILE. Runs shortly after a change, and at exit."""
+    with _write_lock:
+        with _lock:
+            if _state["timer"] is not None:
+                _state["timer"].cancel()
+                _state["timer"] = None
+            if not _state["dirty"]:
+                return
+            _state["dirty"] = False
+            data = json.dumps(_entries, indent=2)
+            cache_file = CACHE_FILE
+        tmp_file = cache_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"Warning: Could not save the decision cache: {e}")
+
+
+def get(user_input: str, tools_definations: str) -> dict:
+    """Returns the cached decision for this utterance and the full manifest's definations, or None."""
+    key = _key(user_input, tools_definations)
+
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["created"] >= TTL_SECONDS:
+            del _entries[key]
+            _save()
+            return None
+        _entries.move_to_end(key)
+        return entry["decision"]
+
+
+def put(user_input: str, tools_definations: str, decision: dict, valid: set = None) -> bool:
+    """
+    Caches a decision unless it calls nothing, calls a function without a name or one
+    outside valid (when given), or is UNCACHEABLE.
+
+    Returns:
+        bool: Whether the decision was cached.
+    """
+    names = [call["function_name"] for call in plan.as_calls(decision)]
+    if not names or not all(isinstance(name, str) and name for name in names):
+        return False
+    if any(name in UNCACHEABLE for name in names) or (valid is not None and not set(names) <= valid):
+        return False
+
+    key = _key(user_input, tools_definations)
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+        _entries[key] = {"decision": decision, "created": time.time()}
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+        _save()
+    return True
+
+
+def think(user_input: str, tools_definations: str, valid: set = None, response_schema: dict = None,
+          alternatives: list = None, all_tools_definations: str = None) -> dict:
+    """
+    Cached wrapper around brain.think. Repeated commands are answered from the
+    cache instead of paying the LLM round trip.
+
+    Args:
+        valid (set): Function names offered in tools_definations. Decisions calling
+            any other function are returned but not cached.
+        all_tools_definations (str): The full manifest's definations, which the cache
+            key is hashed from when only a shortlist is sent. Defaults to tools_definations.
+        response_schema (dict): Passed through to brain.think.
+        alternatives (list): Passed through to brain.think.
+    """
+    cache_definations = all_tools_definations or tools_definations
+    decision = get(user_input, cache_definations)
+    if decision is not None:
+        stats["hits"] += 1
+        if DEBUG: print(f"[decision_cache] Hit for '{normalize(user_input)}'")
+        return decision
+
+    stats["misses"] += 1
+    decision = brain.think(user_input, tools_definations, response_schema=response_schema, alternatives=alternatives)
+    put(user_input, cache_definations, decision, valid)
+    return decision
+
+
+def clear() -> None:
+    with _write_lock, _lock:
+        _entries.clear()
+        _state["loaded"] = True
+        _state["dirty"] = False
+        if _state["timer"] is not None:
+            _state["timer"].cancel()
+            _state["timer"] = None
+        if os.path.exists(CACHE_FILE):
+            os.remove(CACHE_FILE)
+
+
+atexit.register(flush)
+
+
+if __name__ == "__main__":
+    tools = "function tell_time() -> None"
+    print(normalize("Hey, could you please open YouTube for me?"))
+    for _ in range(2):
+        start = time.perf_counter()
+        print(think("What's the time?", tools), f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    print(stats)
@@ -1,33 +1,249 @@
 import os
+import time
 import rich
 import speech_recognition as sr
 
+import extensions.essentials.capture as capture
+import extensions.essentials.stt as stt
+
 import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG:bool = os.getenv("DEBUG") == "True"
-
-
-def listen(OUTPUT=DEBUG) -> str:
-    """Function to listen from microphone and recognize speech using Google Speech Recognition."""
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        
-        rich.print("Adjusting for ambient noise, please wait...")
-        r.adjust_for_ambient_noise(source)
-        
-        rich.print("Say something!")
-        audio = r.listen(source)
-    try:
-        recognized_text = r.recognize_google(audio)
-        return recognized_text
-    except sr.UnknownValueError:
-        rich.print("Google Speech Recognition could not understand audio")
-        return None
-    except sr.RequestError as e:
-        rich.print("Could not request results from Google Speech Recognition service; {0}".format(e))
+from extensions.essentials.settings import settings
+DEBUG:bool = settings.debug
+
+# Frame-level voice activity detection
+MIN_NOISE_FLOOR = 30.0
+LOUD_RATIO = 4.0        # energy alone marks speech above noise floor * LOUD_RATIO
+VOICED_RATIO = 2.0      # quieter frames count when their zero-crossing rate is low (voiced)
+VOICED_ZCR = 0.15
+ONSET_WINDOW = 5        # speech starts once ONSET_FRAMES of the last ONSET_WINDOW frames are speech
+ONSET_FRAMES = 3
+
+# Endpointing
+MIN_PAUSE_SECONDS = 0.35    # silence that ends a short command
+MAX_PAUSE_SECONDS = 1.0
+GAP_FACTOR = 1.5            # the end pause grows with the longest pause between words so far
+PAD_SECONDS = 0.1           # audio kept around the speech when trimming
+
+stats = {"turns": 0, "endpoint_ms": 0.0, "bytes_sent": 0, "bytes_trimmed": 0}
+
+
+def frame_features(frame: bytes) -> tuple:
+    """(RMS energy, zero-crossing rate) of a 16-bit PCM frame."""
+    import numpy as np
+
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    if len(samples) < 2:
+        return 0.0, 0.0
+    energy = float(np.sqrt(np.mean(samples * samples)))
+    zcr = float(np.mean(np.signbit(samples[1:]) != np.signbit(samples[:-1])))
+    return energy, zcr
+
+
+class Endpointer:
+    """
+    Finds the start and end of one utterance in a stream of frames.
+
+    Onset needs several speech frames in a short window, so clicks do not open a phrase.
+    The utterance ends after a pause that adapts to the speaker: MIN_PAUSE_SECONDS for a
+    short command, longer once the phrase itself contained pauses between words.
+
+    Args:
+        noise_floor (float): Background RMS energy, e.g. CaptureService.noise_floor.
+        frame_seconds (float): Duration of one frame.
+    """
+
+    def __init__(self, noise_floor: float, frame_seconds: float,
+                 min_pause: float = MIN_PAUSE_SECONDS, max_pause: float = MAX_PAUSE_SECONDS):
+        floor = max(noise_floor or 0.0, MIN_NOISE_FLOOR)
+        self.loud = floor * LOUD_RATIO
+        self.voiced = floor * VOICED_RATIO
+        self.frame_seconds = frame_seconds
+        self.pad = round(PAD_SECONDS / frame_seconds)
+        self.min_pause = round(min_pause / frame_seconds)
+        self.max_pause = round(max_pause / frame_seconds)
+        self.count = 0
+        self.start = None           # index of the first speech frame
+        self.last_speech = None     # index of the latest speech frame
+        self.longest_gap = 0
+        self.ended = False
+        self._pending = []          # (index, frame, is_speech) before the onset
+        self._frames = []           # (index, frame) from start - pad onwards
+
+    def is_speech(self, frame: bytes) -> bool:
+        energy, zcr = frame_features(frame)
+        return energy >= self.loud or (energy >= self.voiced and zcr <= VOICED_ZCR)
+
+    def pause_frames(self) -> int:
+        return min(self.max_pause, max(self.min_pause, round(self.longest_gap * GAP_FACTOR)))
+
+    def push(self, frame: bytes) -> bool:
+        """Adds the next frame. Returns True once the utterance has ended."""
+        index, speech = self.count, self.is_speech(frame)
+        self.count += 1
+
+        if self.start is None:
+            self._pending.append((index, frame, speech))
+            del self._pending[:-(self.pad + ONSET_WINDOW)]
+            window = self._pending[-ONSET_WINDOW:]
+            if sum(s for _, _, s in window) >= ONSET_FRAMES:
+                self.start = next(i for i, _, s in window if s)
+                self.last_speech = index
+                self._frames = [(i, f) for i, f, _ in self._pending if i >= self.start - self.pad]
+                self._pending = []
+            return False
+
+        self._frames.append((index, frame))
+        if speech:
+            self.longest_gap = max(self.longest_gap, index - self.last_speech - 1)
+            self.last_speech = index
+        elif index - self.last_speech >= self.pause_frames():
+            self.ended = True
+        return self.ended
+
+    def audio(self) -> bytes:
+        """The utterance with leading and trailing silence trimmed to PAD_SECONDS."""
+        if self.start is None:
+            return b""
+        return b"".join(f for i, f in self._frames if i <= self.last_speech + self.pad)
+
+    def received(self) -> bytes:
+        """Everything pushed since the onset padding, as an untrimmed endpointer would send it."""
+        return b"".join(f for _, f in self._frames)
+
+
+def endpoint(service, timeout: float = None, phrase_time_limit: float = None):
+    """
+    Reads frames from the capture service until the utterance ends.
+
+    Args:
+        service (CaptureService): The running capture service.
+        timeout (float): Seconds to wait for speech to start. None waits forever.
+        phrase_time_limit (float): Maximum phrase length in seconds.
+
+    Returns:
+        AudioData: The trimmed utterance, or None when nobody spoke before the timeout.
+    """
+    endpointer = Endpointer(service.noise_floor, service.frame_seconds)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    limit = None if phrase_time_limit is None else round(phrase_time_limit / service.frame_seconds)
+
+    for _, frame, _ in service.frames(timeout=timeout):
+        if endpointer.push(frame):
+            break
+        if endpointer.start is None:
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+        elif limit and endpointer.count - endpointer.start >= limit:
+            break
+
+    if endpointer.start is None:
         return None
-    
+
+    pcm = endpointer.audio()
+    stats["turns"] += 1
+    stats["endpoint_ms"] = (endpointer.count - 1 - endpointer.last_speech) * service.frame_seconds * 1000
+    stats["bytes_sent"] += len(pcm)
+    stats["bytes_trimmed"] += len(endpointer.received()) - len(pcm)
+    if DEBUG: print(f"[ears] Utterance ended {stats['endpoint_ms']:.0f} ms after the last speech frame")
+    return sr.AudioData(pcm, service.source.sample_rate, service.source.sample_width)
+
+
+def hear(flush: bool = True, timeout: float = None, n: int = stt.N_BEST) -> list:
+    """
+    Records the next utterance and transcribes it with the configured STT backends.
+
+    Args:
+        flush (bool): Skip what was captured before the call. Pass False to keep audio
+            that follows a wake word.
+        timeout (float): Seconds to wait for speech to start.
+        n (int): Maximum number of hypotheses.
+
+    Returns:
+        list: n-best hypotheses [{"text", "confidence"}], best first. Empty when nothing was understood.
+    """
+    service = capture.get()
+    if flush:
+        # Drop whatever was captured while the assistant was talking
+        service.flush()
+
+    rich.print("Say something!")
+    audio = endpoint(service, timeout=timeout)
+    if audio is None:
+        return []
+    hypotheses = stt.recognize(audio, n)
+    if not hypotheses:
+        rich.print("Speech recognition could not understand audio")
+    return hypotheses
+
+
+def listen(OUTPUT=DEBUG, flush: bool = True, timeout: float = None) -> str:
+    """Function to listen from microphone and return the most likely transcription, or None."""
+    hypotheses = hear(flush=flush, timeout=timeout)
+    return hypotheses[0]["text"] if hypotheses else None
+
+
+def benchmark(directory: str = None) -> dict:
+    """
+    Runs every WAV command in a directory through the endpointer and compares it with a
+    fixed 0.8 s pause (the recognizer's pause_threshold). The directory needs a labels.json
+    mapping each file to its [speech start, speech end] in seconds; without a directory a
+    synthetic corpus is generated.
+
+    Reports the endpoint latency (time from the end of speech to the decision), the
+    clipping rate (utterances that lose speech at either end) and the bytes sent to STT.
+    """
+    import json
+    import tempfile
+    from extensions.fakes.fake_audio import read_wav, write_corpus
+
+    directory = directory or write_corpus(os.path.join(tempfile.gettempdir(), "endpoint_corpus"))
+    with open(os.path.join(directory, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    frame_samples = capture.FRAME_SAMPLES
+    results = {}
+    for name, pause in (("fixed", (0.8, 0.8)), ("adaptive", (MIN_PAUSE_SECONDS, MAX_PAUSE_SECONDS))):
+        latencies, clipped, sent = [], 0, 0
+        for file_name, (speech_start, speech_end) in labels.items():
+            pcm, rate = read_wav(os.path.join(directory, file_name))
+            frame_seconds = frame_samples / rate
+            size = frame_samples * 2
+            frames = [pcm[i:i + size] for i in range(0, len(pcm) - size + 1, size)]
+
+            calibration = frames[:round(capture.CALIBRATION_SECONDS / 2 / frame_seconds)]
+            floor = sum(capture.frame_energy(f) for f in calibration) / len(calibration)
+            endpointer = Endpointer(floor, frame_seconds, *pause)
+            for frame in frames:
+                if endpointer.push(frame):
+                    break
+
+            if endpointer.start is None:
+                clipped += 1
+                continue
+            decided = endpointer.count * frame_seconds
+            kept_start = max(0, endpointer.start - endpointer.pad) * frame_seconds
+            kept_end = (endpointer.last_speech + endpointer.pad + 1) * frame_seconds
+            latencies.append((decided - speech_end) * 1000)
+            if kept_start > speech_start + frame_seconds or kept_end < speech_end - frame_seconds:
+                clipped += 1
+            sent += len(endpointer.audio() if name == "adaptive" else endpointer.received())
+
+        latencies.sort()
+        results[name] = {
+            "files": len(labels),
+            "p50_latency_ms": round(latencies[len(latencies) // 2]) if latencies else None,
+            "p95_latency_ms": round(latencies[int(len(latencies) * 0.95)]) if latencies else None,
+            "clipping_rate": round(clipped / len(labels), 3),
+            "kb_sent": round(sent / 1024),
+        }
+    return results
+
+
 if __name__ == "__main__":
-    response = listen()
-    rich.print("Recognized Text:", response)
\ No newline at end of file
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        print(benchmark(sys.argv[2] if len(sys.argv) > 2 else None))
+    else:
+        response = listen()
+        rich.print("Recognized Text:", response)
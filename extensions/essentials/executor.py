@@ -0,0 +1,344 @@
+import time
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+from extensions.essentials.health import percentile_ms
+
+THREAD_WORKERS = settings.executor_threads        # I/O-bound actions
+PROCESS_WORKERS = settings.executor_processes     # CPU-bound actions
+DEFAULT_DEADLINE = settings.action_deadline       # seconds, unless the action sets DEADLINE
+
+
+class Cancelled(Exception):
+    """Raised inside an action that noticed its job was cancelled, and set on the job's future."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Set on a job's future when the action ran past its deadline."""
+
+
+class Job:
+    """
+    One action call on the executor. `future` resolves with the action's return value,
+    or with Cancelled / DeadlineExceeded / the action's own exception.
+    """
+
+    def __init__(self, name: str, args: dict, kind: str, deadline: float, owner: str = None):
+        self.id = next(_ids)
+        self.name = name
+        self.args = args
+        self.owner = owner      # who asked for it, e.g. a daemon client; None for the voice loop
+        self.kind = kind
+        self.deadline = deadline
+        self.future = Future()
+        self.cancel_event = threading.Event()
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.state = "queued"   # queued, running, done, failed, cancelled, timed_out
+        self._inner = None
+        self._timer = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def __repr__(self) -> str:
+        return f"<Job {self.id} {self.name} {self.state}>"
+
+
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_local = threading.local()
+_pools = {"thread": None, "process": None}
+_kinds = {}         # action name -> "thread" | "process"
+_deadlines = {}     # action name -> seconds
+_jobs = {}          # id -> Job, while queued or running
+_run_times = deque(maxlen=500)
+_wait_times = deque(maxlen=500)
+stats = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0, "timed_out": 0, "max_queue_depth": 0}
+
+
+def configure(tool_manifest: dict) -> None:
+    """Reads each action's EXECUTOR and DEADLINE constants from the tool manifest."""
+    for name, entry in tool_manifest.items():
+        _kinds[name] = entry.get("executor") or "thread"
+        _deadlines[name] = entry.get("deadline") or DEFAULT_DEADLINE
+
+
+def _pool(kind: str):
+    with _lock:
+        if _pools[kind] is None:
+            if kind == "process":
+                _pools[kind] = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+            else:
+                _pools[kind] = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="action")
+        return _pools[kind]
+
+
+def _restart_process_pool() -> None:
+    """
+    Worker processes cannot be interrupted one task at a time, so a cancelled or expired
+    CPU-bound job takes its pool down with it. Other jobs in that pool fail and are reported.
+    """
+    with _lock:
+        pool, _pools["process"] = _pools["process"], None
+    if pool is None:
+        return
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def retire_process_pool() -> None:
+    """
+    Sends new CPU-bound jobs to fresh worker processes, e.g. after an action module was
+    reloaded. Jobs already running on the old pool finish there.
+    """
+    with _lock:
+        pool, _pools["process"] = _pools["process"], None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def cancelled() -> bool:
+    """For actions running on the thread pool: whether the current job was cancelled."""
+    job = getattr(_local, "job", None)
+    return job is not None and job.cancelled
+
+
+def check() -> None:
+    """Raises Cancelled when the current job was cancelled. Call it in long loops."""
+    if cancelled():
+        raise Cancelled()
+
+
+def _run_in_thread(job: Job, func, args: dict):
+    if job.cancelled:
+        raise Cancelled()
+    job.started = time.monotonic()
+    job.state = "running"
+    _local.job = job
+    try:
+        return func(**args)
+    finally:
+        _local.job = None
+
+
+def _run_in_process(func, args: dict) -> tuple:
+    started = time.time()
+    return started, func(**args)
+
+
+def _settle(job: Job, state: str, result=None, error: BaseException = None) -> None:
+    """Resolves the job once; late results of an already cancelled or expired job are dropped."""
+    with _lock:
+        if job.future.done():
+            return
+        job.state = state
+        job.finished = time.monotonic()
+        _jobs.pop(job.id, None)
+        stats[state] += 1
+        if job.started is not None:
+            _run_times.append(job.finished - job.started)
+            _wait_times.append(job.started - job.submitted)
+    if job._timer is not None:
+        job._timer.cancel()
+    if error is not None:
+        job.future.set_exception(error)
+    else:
+        job.future.set_result(result)
+    if DEBUG: print(f"[executor] {job.name} {state} after {(job.finished - job.submitted) * 1000:.0f} ms")
+
+
+def _on_inner_done(job: Job, inner: Future) -> None:
+    if inner.cancelled():
+        _settle(job, "cancelled", error=Cancelled())
+        return
+    error = inner.exception()
+    if error is not None:
+        if isinstance(error, Cancelled) or job.cancelled:
+            _settle(job, "cancelled", error=Cancelled())
+        else:
+            _settle(job, "failed", error=error)
+        return
+    result = inner.result()
+    if job.kind == "process":
+        # The child reports wall-clock time; convert it to this process's monotonic clock
+        started, result = result
+        job.started = max(job.submitted, time.monotonic() - (time.time() - started))
+    _settle(job, "done", result)
+
+
+def _stop(job: Job) -> None:
+    """Stops a settled job: it never starts, notices at its next check(), or loses its worker process."""
+    job.cancel_event.set()
+    if job._inner is None or job._inner.cancel():
+        return
+    if job.kind == "process" and not job._inner.done():
+        _restart_process_pool()
+
+
+def _expire(job: Job) -> None:
+    if job.future.done():
+        return
+    # Settle before stopping, so the broken worker is not mistaken for a cancellation
+    _settle(job, "timed_out", error=DeadlineExceeded(f"{job.name} ran past its {job.deadline:.0f} s deadline"))
+    _stop(job)
+
+
+def submit(name: str, func, args: dict, on_done=None, owner: str = None) -> Job:
+    """
+    Queues an action on the pool its EXECUTOR constant asks for and returns right away.
+
+    Args:
+        name (str): Action name, used to look up its pool and deadline.
+        func (callable): The action function. Process-pool actions must be importable by name.
+        args (dict): Validated keyword arguments.
+        on_done (callable): Called with the Job once it finished, failed, timed out or was cancelled.
+        owner (str): Tags the job, so cancel(owner=...) only reaches the jobs of one client.
+
+    Returns:
+        Job: The queued job.
+    """
+    kind = _kinds.get(name, "thread")
+    job = Job(name, args, kind, _deadlines.get(name, DEFAULT_DEADLINE), owner)
+    if on_done is not None:
+        job.future.add_done_callback(lambda _: on_done(job))
+    with _lock:
+        _jobs[job.id] = job
+        stats["submitted"] += 1
+        stats["max_queue_depth"] = max(stats["max_queue_depth"], sum(j.state == "queued" for j in _jobs.values()))
+
+    if kind == "process":
+        job._inner = _pool("process").submit(_run_in_process, func, args)
+        # The child cannot report when it picked the job up, so it counts as running once handed over
+        job.state = "running"
+    else:
+        job._inner = _pool("thread").submit(_run_in_thread, job, func, args)
+    job._timer = threading.Timer(job.deadline, _expire, args=(job,))
+    job._timer.daemon = True
+    job._timer.start()
+    job._inner.add_done_callback(lambda inner: _on_inner_done(job, inner))
+    return job
+
+
+def call(name: str, func, args: dict, owner: str = None):
+    """Runs an action through the executor and waits for it, honouring its deadline and cancellation."""
+    return submit(name, func, args, owner=owner).future.result()
+
+
+def cancel(job: Job = None, owner: str = None) -> list:
+    """
+    Cancels a job, or every queued and running job when none is given ("cancel that").
+    With an owner, only that owner's jobs are cancelled.
+    Queued jobs never start. Running thread-pool jobs stop at their next check();
+    running process-pool jobs are terminated.
+
+    Returns:
+        list: The jobs that were cancelled.
+    """
+    with _lock:
+        jobs = [job] if job is not None else sorted((j for j in _jobs.values() if owner is None or j.owner == owner),
+                                                    key=lambda j: j.id)
+    cancelled_jobs = []
+    for job in jobs:
+        if job.future.done():
+            continue
+        _settle(job, "cancelled", error=Cancelled())
+        _stop(job)
+        cancelled_jobs.append(job)
+    return cancelled_jobs
+
+
+def active() -> list:
+    """Queued and running jobs, oldest first."""
+    with _lock:
+        return sorted(_jobs.values(), key=lambda j: j.id)
+
+
+def metrics() -> dict:
+    """Queue depth per pool, and run and queue-wait times of finished jobs in milliseconds."""
+    jobs = active()
+    return {
+        **stats,
+        "queued": {kind: sum(j.state == "queued" and j.kind == kind for j in jobs) for kind in _pools},
+        "running": {kind: sum(j.state == "running" and j.kind == kind for j in jobs) for kind in _pools},
+        "run_p50_ms": percentile_ms(_run_times, 50),
+        "run_p95_ms": percentile_ms(_run_times, 95),
+        "wait_p50_ms": percentile_ms(_wait_times, 50),
+        "wait_p95_ms": percentile_ms(_wait_times, 95),
+    }
+
+
+def shutdown() -> None:
+    cancel()
+    with _lock:
+        pools = [pool for pool in _pools.values() if pool is not None]
+        _pools.update(thread=None, process=None)
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def benchmark() -> dict:
+    """
+    Runs fake actions through the executor: four one-second system_info-style waits
+    side by side, a CPU-bound job next to them, a runaway calculation stopped by its
+    deadline, and a long scan stopped by "cancel that".
+    """
+    from extensions.fakes import fake_actions
+
+    configure({
+        "wait": {"executor": "thread", "deadline": 5.0},
+        "crunch": {"executor": "process", "deadline": 10.0},
+        "runaway": {"executor": "process", "deadline": 1.0},
+        "scan": {"executor": "thread", "deadline": 30.0},
+    })
+    report = {}
+
+    start = time.perf_counter()
+    for _ in range(4):
+        fake_actions.wait(seconds=1.0)
+    report["inline_4_waits_ms"] = round((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    jobs = [submit("wait", fake_actions.wait, {"seconds": 1.0}) for _ in range(4)]
+    crunch = submit("crunch", fake_actions.crunch, {"n": 3_000_000})
+    submit_ms = (time.perf_counter() - start) * 1000
+    for job in jobs + [crunch]:
+        job.future.result()
+    report["pooled_4_waits_plus_crunch_ms"] = round((time.perf_counter() - start) * 1000)
+    report["submit_ms"] = round(submit_ms, 2)
+
+    runaway = submit("runaway", fake_actions.crunch, {"n": 10 ** 12})
+    start = time.perf_counter()
+    try:
+        runaway.future.result()
+    except DeadlineExceeded:
+        pass
+    report["runaway_stopped_after_ms"] = round((time.perf_counter() - start) * 1000)
+    report["runaway_state"] = runaway.state
+
+    scan = submit("scan", fake_actions.scan, {"steps": 10 ** 6})
+    time.sleep(0.2)
+    start = time.perf_counter()
+    cancel()
+    while fake_actions.progress["scan"] and fake_actions.progress["running"]:
+        time.sleep(0.001)
+    report["cancel_to_stop_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    report["scan_state"] = scan.state
+    report["metrics"] = metrics()
+    shutdown()
+    return report
+
+
+if __name__ == "__main__":
+    # Run the imported module, the one the fake actions call check() on
+    import extensions.essentials.executor as executor
+
+    print(executor.benchmark())
@@ -0,0 +1,80 @@
+import time
+import threading
+from collections import deque
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+SAMPLES = 200               # latency samples kept per backend
+
+
+def percentile(samples, p: float) -> float:
+    """The p-th percentile (nearest rank) of the samples, or None without any."""
+    samples = sorted(samples)
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def percentile_ms(samples, p: float, digits: int = None):
+    """percentile() of samples in seconds, in milliseconds rounded to digits."""
+    value = percentile(samples, p)
+    return round(value * 1000, digits) if value is not None else None
+
+
+class Monitored:
+    """
+    Latency samples and circuit-breaker state of one backend (LLM, TTS or STT provider).
+    After `threshold` consecutive failures the backend is unavailable for `cooldown`
+    seconds; without a threshold it is always available.
+    """
+
+    def __init__(self, name: str, threshold: int = None, cooldown: float = 30.0):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.latencies = deque(maxlen=SAMPLES)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(seconds)
+            self.consecutive_failures = 0
+
+    def record_failure(self, error: Exception, seconds: float = None) -> None:
+        """Counts a failure; seconds, when given, also goes into the latency samples."""
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            if seconds is not None:
+                self.latencies.append(seconds)
+            self.consecutive_failures += 1
+            if self.threshold is not None and self.consecutive_failures >= self.threshold:
+                self.open_until = time.monotonic() + self.cooldown
+                if DEBUG: print(f"[health] Circuit open for '{self.name}' after: {error!r}")
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            samples = list(self.latencies)
+        return percentile(samples, p)
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = list(self.latencies)
+        summary = {
+            "calls": self.calls,
+            "failures": self.failures,
+            "p50_ms": percentile_ms(samples, 50),
+            "p95_ms": percentile_ms(samples, 95),
+        }
+        if self.threshold is not None:
+            summary["open"] = not self.available()
+        return summary
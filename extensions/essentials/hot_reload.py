@@ -0,0 +1,240 @@
+import os
+import time
+import threading
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+ENABLED: bool = settings.hot_reload
+INTERVAL = settings.hot_reload_interval     # seconds between polls
+
+import extensions.essentials.manifest as manifest
+import extensions.essentials.result_cache as result_cache
+import extensions.essentials.executor as executor
+import extensions.actions.register as rg
+
+# Polling the directory's mtimes works the same on every platform and costs a
+# scandir per interval. A change is applied once the file's stat held still for
+# one poll, so a half-written file from an editor is not imported.
+
+_state = {"running": False, "thread": None, "stop": threading.Event(), "snapshot": {}, "pending": {}, "actions_dir": manifest.ACTIONS_DIR}
+_lock = threading.Lock()
+stats = {"polls": 0, "added": 0, "changed": 0, "removed": 0, "failed": 0, "last_apply_ms": 0.0}
+
+
+def _snapshot(actions_dir: str) -> dict:
+    """{action name: (mtime, size)} of every action file."""
+    snapshot = {}
+    with os.scandir(actions_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(".py") or name.startswith("__") or name in manifest.SKIP_FILES:
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            snapshot[name[:-3]] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def _apply(names: set, tool_manifest: dict, functions: dict, actions_dir: str) -> dict:
+    """Re-reads, re-imports or forgets the given actions and patches the manifest and register in place."""
+    start = time.perf_counter()
+    result = {"added": [], "changed": [], "removed": [], "failed": []}
+    fresh = {}
+    for name in sorted(names):
+        filepath = os.path.join(actions_dir, f"{name}.py")
+        if not os.path.exists(filepath):
+            continue
+        try:
+            fresh[name] = manifest.read_entry(filepath)
+        except (SyntaxError, UnicodeDecodeError) as e:
+            print(f"Warning: Keeping the last good version of '{name}': {e}")
+            result["failed"].append(name)
+
+    # The result cache must know the new CACHE declarations before the functions are wrapped
+    result_cache.configure({**tool_manifest, **fresh})
+    process_actions = False
+    for name in sorted(names):
+        if name in fresh:
+            if not fresh[name]["function"] or not rg.reload(name, functions, fresh[name]["file"]):
+                result["failed"].append(name)
+                continue
+            result["changed" if name in tool_manifest else "added"].append(name)
+            process_actions |= tool_manifest.get(name, {}).get("executor") == "process"
+            tool_manifest[name] = fresh[name]
+            process_actions |= fresh[name]["executor"] == "process"
+        elif name not in result["failed"] and name in tool_manifest:
+            process_actions |= tool_manifest[name].get("executor") == "process"
+            del tool_manifest[name]
+            rg.forget(name, functions)
+            result["removed"].append(name)
+    if result["failed"]:
+        result_cache.configure(tool_manifest)
+    if process_actions:
+        # Worker processes hold their own copy of the old module
+        executor.retire_process_pool()
+
+    for kind, applied in result.items():
+        stats[kind] += len(applied)
+    stats["last_apply_ms"] = (time.perf_counter() - start) * 1000
+    if DEBUG: print(f"[hot_reload] {result} in {stats['last_apply_ms']:.1f} ms")
+    return result
+
+
+def poll(tool_manifest: dict, functions: dict, on_change=None) -> dict:
+    """
+    Compares the actions directory with the previous poll and applies the changes that
+    have settled. on_change(result) is called after anything was added, changed or removed,
+    so the caller can rebuild what it derives from the manifest.
+
+    Returns:
+        dict: {"added": [...], "changed": [...], "removed": [...], "failed": [...]}, or None
+            when nothing was applied.
+    """
+    with _lock:
+        actions_dir = _state["actions_dir"]
+        current = _snapshot(actions_dir)
+        previous, pending = _state["snapshot"], _state["pending"]
+        moved = {name for name in current.keys() | previous.keys() if current.get(name) != previous.get(name)}
+        settled = {name for name, stat in pending.items() if name not in moved and current.get(name) == stat}
+        for name in settled:
+            del pending[name]
+        for name in moved:
+            pending[name] = current.get(name)
+        _state["snapshot"] = current
+        stats["polls"] += 1
+        if not settled:
+            return None
+        result = _apply(settled, tool_manifest, functions, actions_dir)
+
+    if on_change is not None and (result["added"] or result["changed"] or result["removed"]):
+        try:
+            on_change(result)
+        except Exception as e:
+            print(f"Error after reloading actions: {e}")
+    return result
+
+
+def _run(tool_manifest: dict, functions: dict, on_change, interval: float) -> None:
+    while not _state["stop"].wait(interval):
+        try:
+            poll(tool_manifest, functions, on_change)
+        except Exception as e:
+            if DEBUG: print(f"[hot_reload] Poll failed: {e}")
+
+
+def start(tool_manifest: dict, functions: dict, on_change=None, interval: float = INTERVAL,
+          actions_dir: str = manifest.ACTIONS_DIR) -> None:
+    """
+    Watches the actions directory on a background thread and keeps the tool manifest and
+    function register in step with it. Files present now are taken as already loaded.
+    """
+    if _state["running"]:
+        return
+    _state["stop"].clear()
+    _state.update(running=True, snapshot=_snapshot(actions_dir), pending={}, actions_dir=actions_dir)
+    _state["thread"] = threading.Thread(target=_run, args=(tool_manifest, functions, on_change, interval),
+                                        name="hot_reload", daemon=True)
+    _state["thread"].start()
+
+
+def stop() -> None:
+    _state["running"] = False
+    _state["stop"].set()
+    if _state["thread"] is not None:
+        _state["thread"].join(timeout=2)
+        _state["thread"] = None
+
+
+ACTION_V1 = '''
+defination = """
+function ping() -> str:
+arguments: None
+description: Answers pong.
+"""
+
+def ping() -> str:
+    return "pong v1"
+'''
+
+COUNTER = '''
+defination = """
+function counter() -> str:
+arguments: None
+description: Counts its calls.
+"""
+
+_state = {"count": 0}
+
+def counter() -> str:
+    _state["count"] += 1
+    return str(_state["count"])
+'''
+
+
+def benchmark(interval: float = 0.1) -> dict:
+    """
+    Works on a scratch actions directory: adds an action, edits it, breaks it and removes
+    it while a stateful neighbour keeps running. Reports how long each change took to
+    become callable and whether the neighbour's state survived.
+    """
+    import tempfile
+
+    actions_dir = tempfile.mkdtemp(prefix="actions_")
+    tool_manifest, functions = {}, {}
+    report = {}
+
+    def write(name: str, source: str) -> float:
+        with open(os.path.join(actions_dir, f"{name}.py"), "w", encoding="utf-8") as f:
+            f.write(source)
+        return time.perf_counter()
+
+    def wait_for(check) -> bool:
+        end = time.monotonic() + 5
+        while time.monotonic() < end:
+            if check():
+                return True
+            time.sleep(0.005)
+        return False
+
+    write("counter", COUNTER)
+    tool_manifest["counter"] = manifest.read_entry(os.path.join(actions_dir, "counter.py"))
+    rg.reload("counter", functions, tool_manifest["counter"]["file"])
+    start(tool_manifest, functions, interval=interval, actions_dir=actions_dir)
+    try:
+        began = write("ping", ACTION_V1)
+        wait_for(lambda: "ping" in functions)
+        report["add_ms"] = round((time.perf_counter() - began) * 1000)
+        report["v1"] = functions["ping"]()
+        counts = [functions["counter"]() for _ in range(3)]
+
+        time.sleep(0.01)    # a distinct mtime on coarse filesystems
+        began = write("ping", ACTION_V1.replace("pong v1", "pong v2 (edited)"))
+        wait_for(lambda: functions["ping"]() != "pong v1")
+        report["change_ms"] = round((time.perf_counter() - began) * 1000)
+        report["v2"] = functions["ping"]()
+        report["neighbour_state_kept"] = functions["counter"]() == str(int(counts[-1]) + 1)
+
+        write("ping", ACTION_V1.replace("def ping() -> str:", "def ping( -> str:"))
+        wait_for(lambda: stats["failed"] >= 1)
+        report["after_broken_edit"] = functions["ping"]()
+
+        began = time.perf_counter()
+        os.remove(os.path.join(actions_dir, "ping.py"))
+        wait_for(lambda: "ping" not in functions)
+        report["remove_ms"] = round((time.perf_counter() - began) * 1000)
+        report["manifest"] = sorted(tool_manifest)
+    finally:
+        stop()
+        for name in os.listdir(actions_dir):
+            os.remove(os.path.join(actions_dir, name))
+        os.rmdir(actions_dir)
+        for name in list(tool_manifest):
+            rg.forget(name, functions)
+    report["stats"] = dict(stats)
+    return report
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,216 @@
+import os
+import re
+import ast
+import json
+import time
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+BASE_DIR      = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ACTIONS_DIR   = os.path.join(BASE_DIR, "extensions", "actions")
+MANIFEST_FILE = os.path.join(BASE_DIR, "tool_manifest.json")
+
+SKIP_FILES = {"register.py"}
+
+# Bump when the shape of a manifest entry changes, so stale caches are rebuilt
+VERSION = 4
+
+# Module constants an action may declare to tell the executor how to run it
+EXECUTORS = {"thread", "process"}
+
+_ARGUMENT_LINE = re.compile(r"^\s*-\s*(\w+)\s*:\s*(.*)$", re.MULTILINE)
+_QUOTED = re.compile(r'"([^"]+)"')
+
+
+def _read_choices(defination: str) -> dict:
+    """
+    Reads the allowed values of each argument from the `arguments:` block of a
+    defination. Only closed lists count: `One of: "a", "b"` or a line that starts
+    with quoted values. Example lists ("e.g.", "Examples:") are ignored.
+    """
+    choices = {}
+    for name, text in _ARGUMENT_LINE.findall(defination or ""):
+        if "One of:" in text:
+            values = _QUOTED.findall(text.split("One of:", 1)[1])
+        elif text.startswith('"'):
+            values = _QUOTED.findall(text)
+        else:
+            continue
+        if values:
+            choices[name] = values
+    return choices
+
+
+def _read_params(node: ast.FunctionDef) -> list:
+    """Reads the parameters of the entry function: name, annotation and default."""
+    args = node.args.args
+    defaults = [None] * (len(args) - len(node.args.defaults)) + list(node.args.defaults)
+
+    params = []
+    for arg, default in zip(args, defaults):
+        param = {
+            "name": arg.arg,
+            "type": arg.annotation.id if isinstance(arg.annotation, ast.Name) else None,
+            "required": default is None,
+        }
+        if default is not None:
+            try:
+                param["default"] = ast.literal_eval(default)
+            except ValueError:
+                param["default"] = None
+        params.append(param)
+    return params
+
+
+def _read_module(filepath: str, function_name: str) -> dict:
+    """
+    Statically reads an action module: its `defination` string, the signature of the
+    function named after the file, if any, and the optional EXECUTOR ("thread" or
+    "process"), DEADLINE (seconds) and CACHE (see result_cache) constants.
+    The module is never executed.
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=filepath)
+
+    entry = {"defination": None, "function": False, "params": [], "choices": {},
+             "executor": "thread", "deadline": None, "cache": None}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict):
+            if any(isinstance(t, ast.Name) and t.id == "CACHE" for t in node.targets):
+                try:
+                    entry["cache"] = ast.literal_eval(node.value)
+                except ValueError:
+                    print(f"Warning: CACHE in {filepath} must be a literal dict")
+            continue
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            value = node.value.value
+            for target in node.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                if target.id == "defination" and isinstance(value, str):
+                    entry["defination"] = value
+                    entry["choices"] = _read_choices(value)
+                elif target.id == "EXECUTOR" and value in EXECUTORS:
+                    entry["executor"] = value
+                elif target.id == "DEADLINE" and isinstance(value, (int, float)) and value > 0:
+                    entry["deadline"] = float(value)
+        elif isinstance(node, ast.FunctionDef) and node.name == function_name:
+            entry["function"] = True
+            entry["params"] = _read_params(node)
+    return entry
+
+
+def read_entry(filepath: str) -> dict:
+    """
+    Reads the manifest entry of one action file, without touching the cached manifest.
+    Raises SyntaxError or UnicodeDecodeError for a file that cannot be parsed.
+    """
+    stat = os.stat(filepath)
+    entry = _read_module(filepath, os.path.basename(filepath)[:-3])
+    entry.update({"file": filepath, "mtime": stat.st_mtime_ns, "size": stat.st_size})
+    return entry
+
+
+def _load_cache() -> dict:
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data.get("actions", {}) if data.get("version") == VERSION else {}
+
+
+def _save_cache(manifest: dict):
+    try:
+        with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, "actions": manifest}, f, indent=2)
+    except OSError as e:
+        if DEBUG: print(f"[manifest] Could not write {MANIFEST_FILE}: {e}")
+
+
+def build(actions_dir: str = ACTIONS_DIR) -> dict:
+    """
+    Builds the tool manifest for every action file in the actions directory.
+    Files are only re-parsed when their mtime or size changed since the cached run.
+
+    Returns:
+        dict: {function_name: {"file", "mtime", "size", "defination", "function", "params", "choices",
+            "executor", "deadline", "cache"}}
+    """
+    cache = _load_cache()
+    manifest = {}
+    changed = False
+
+    for filename in sorted(os.listdir(actions_dir)):
+        if not filename.endswith(".py") or filename.startswith("__") or filename in SKIP_FILES:
+            continue
+        function_name = filename[:-3]
+        filepath = os.path.join(actions_dir, filename)
+        stat = os.stat(filepath)
+
+        cached = cache.get(function_name)
+        if cached and cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            manifest[function_name] = cached
+            continue
+
+        try:
+            entry = read_entry(filepath)
+        except (SyntaxError, UnicodeDecodeError) as e:
+            print(f"Warning: Could not read {filename}: {e}")
+            continue
+        manifest[function_name] = entry
+        changed = True
+        if DEBUG: print(f"[manifest] Parsed {filename}")
+
+    if changed or manifest.keys() != cache.keys():
+        _save_cache(manifest)
+
+    return manifest
+
+
+def descriptions(manifest: dict) -> str:
+    """Concatenates the `defination` of every action in the manifest."""
+    return "\n\n".join(
+        entry["defination"].strip() for entry in manifest.values() if entry["defination"]
+    )
+
+
+def benchmark(actions_dir: str = ACTIONS_DIR) -> dict:
+    """
+    Measures the startup time of the legacy exec_module scan against a cold
+    and a warm (cached) manifest build, in milliseconds.
+    """
+    import importlib.util
+
+    start = time.perf_counter()
+    for filename in os.listdir(actions_dir):
+        if filename.endswith(".py") and not filename.startswith("__"):
+            spec = importlib.util.spec_from_file_location(filename[:-3], os.path.join(actions_dir, filename))
+            module = importlib.util.module_from_spec(spec)
+            try:
+                spec.loader.exec_module(module)
+            except Exception:
+                pass
+    exec_ms = (time.perf_counter() - start) * 1000
+
+    if os.path.exists(MANIFEST_FILE):
+        os.remove(MANIFEST_FILE)
+    start = time.perf_counter()
+    build(actions_dir)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    build(actions_dir)
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    return {"exec_module_ms": exec_ms, "manifest_cold_ms": cold_ms, "manifest_warm_ms": warm_ms}
+
+
+if __name__ == "__main__":
+    manifest = build()
+    for name, entry in manifest.items():
+        print(f"{name:16} defination: {bool(entry['defination'])}  function: {entry['function']}")
+    print(benchmark())
@@ -0,0 +1,213 @@
+import re
+import time
+from functools import lru_cache
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+# Unit symbol -> (singular, plural)
+UNITS = {
+    "B": ("byte", "bytes"), "KB": ("kilobyte", "kilobytes"), "MB": ("megabyte", "megabytes"),
+    "GB": ("gigabyte", "gigabytes"), "TB": ("terabyte", "terabytes"),
+    "Hz": ("hertz", "hertz"), "kHz": ("kilohertz", "kilohertz"), "MHz": ("megahertz", "megahertz"),
+    "GHz": ("gigahertz", "gigahertz"),
+    "ms": ("millisecond", "milliseconds"), "s": ("second", "seconds"), "sec": ("second", "seconds"),
+    "m": ("minute", "minutes"), "min": ("minute", "minutes"), "mins": ("minute", "minutes"),
+    "h": ("hour", "hours"), "hr": ("hour", "hours"), "hrs": ("hour", "hours"),
+    "km": ("kilometer", "kilometers"), "kg": ("kilogram", "kilograms"),
+    "°C": ("degree Celsius", "degrees Celsius"), "°F": ("degree Fahrenheit", "degrees Fahrenheit"),
+}
+OPERATORS = {"+": "plus", "-": "minus", "*": "times", "x": "times", "×": "times", "/": "divided by",
+             "^": "to the power of", "**": "to the power of"}
+SYMBOLS = {"=": " equals ", "|": ", ", "&": " and ", "#": "number "}
+
+_NUMBER = r"[-+]?\d[\d,]*(?:\.\d+)?"
+_UNIT = "|".join(sorted((re.escape(u) for u in UNITS), key=len, reverse=True))
+
+# One pass over the text; the first alternative that matches at a position wins
+_TOKEN = re.compile(
+    rf"(?P<date>\b(?P<year>\d{{4}})-(?P<month>\d{{2}})-(?P<day>\d{{2}})\b)(?P<at>[ T](?=\d{{1,2}}:\d{{2}}))?"
+    rf"|(?P<time>\b(?P<hour>\d{{1,2}}):(?P<minute>\d{{2}})(?::\d{{2}})?(?:\s?(?P<period>[AaPp]\.?[Mm]\b))?)"
+    rf"|(?P<ordinal>\b\d+(?:st|nd|rd|th)\b)"
+    rf"|(?P<percent>(?<![\w.]){_NUMBER})\s?%"
+    rf"|(?P<measure>(?<![\w.]){_NUMBER})\s?(?P<unit>{_UNIT})(?![\w°])"
+    rf"|(?P<number>(?:(?<![\w.])|(?<=\dx)){_NUMBER}(?!(?!x)[\w.]\d))"
+    rf"|(?<=\d)\s*(?P<operator>\*\*|[*×^+/]|(?<=\d )[-x]|(?<=\d)x)\s*(?=[-+]?\d)"
+    rf"|\s*(?P<symbol>[=|&])\s*|(?P<hash>#)(?=\d)"
+)
+
+_LINE_BREAK = re.compile(r"(?<![.!?;:,])[ \t]*\n\s*")   # a line of output ends like a sentence
+_SPACES = re.compile(r"\s+")
+_state = {"engine": None}
+stats = {"calls": 0, "ms": 0.0}
+
+
+def _engine():
+    if _state["engine"] is None:
+        import inflect
+        _state["engine"] = inflect.engine()
+    return _state["engine"]
+
+
+def warm() -> None:
+    """Imports inflect ahead of the first reply with a number in it."""
+    _engine()
+
+
+@lru_cache(maxsize=4096)
+def number_to_words(number: str) -> str:
+    """
+    Spells out an integer or decimal written with digits, e.g. "-1,250.75" ->
+    "minus one thousand, two hundred and fifty point seven five".
+    """
+    number = number.replace(",", "")
+    sign = ""
+    if number[0] in "+-":
+        sign, number = ("minus " if number[0] == "-" else ""), number[1:]
+    return sign + _engine().number_to_words(number)
+
+
+@lru_cache(maxsize=512)
+def ordinal_to_words(number: str) -> str:
+    """ "3rd" -> "third"."""
+    return _engine().number_to_words(_engine().ordinal(int(re.sub(r"\D", "", number))))
+
+
+def _year(year: int) -> str:
+    if 2000 <= year < 2010 or year % 100 == 0:
+        return number_to_words(str(year))
+    return f"{number_to_words(str(year // 100))} {number_to_words(str(year % 100))}" if year % 100 >= 10 else \
+        f"{number_to_words(str(year // 100))} oh {number_to_words(str(year % 100))}"
+
+
+def _time(hour: int, minute: int, period: str) -> str:
+    if period:
+        period = "AM" if period[0] in "Aa" else "PM"
+    elif hour == 0 or hour > 12:
+        # 24-hour clock
+        period = "AM" if hour < 12 else "PM"
+        hour = hour % 12 or 12
+    if minute == 0:
+        words = number_to_words(str(hour)) + ("" if period else " o'clock")
+    elif minute < 10:
+        words = f"{number_to_words(str(hour))} oh {number_to_words(str(minute))}"
+    else:
+        words = f"{number_to_words(str(hour))} {number_to_words(str(minute))}"
+    return f"{words} {period}" if period else words
+
+
+def _replace(match: re.Match) -> str:
+    kind = match.lastgroup
+    if match.group("date"):
+        month = int(match.group("month"))
+        if not 1 <= month <= 12:
+            return match.group(0)
+        date = f"{MONTHS[month - 1]} {ordinal_to_words(match.group('day'))}, {_year(int(match.group('year')))}"
+        return date + " at " if match.group("at") else date
+    if match.group("time"):
+        hour, minute = int(match.group("hour")), int(match.group("minute"))
+        if hour > 23 or minute > 59:
+            return " ".join(number_to_words(n) for n in (match.group("hour"), match.group("minute")))
+        return _time(hour, minute, match.group("period"))
+    if kind == "ordinal":
+        return ordinal_to_words(match.group(0))
+    if match.group("percent"):
+        return number_to_words(match.group("percent")) + " percent"
+    if match.group("measure"):
+        singular, plural = UNITS[match.group("unit")]
+        value = match.group("measure")
+        return f"{number_to_words(value)} {singular if value.lstrip('+-') == '1' else plural}"
+    if kind == "number":
+        return number_to_words(match.group(0))
+    if kind == "operator":
+        return f" {OPERATORS[match.group('operator')]} "
+    if kind == "hash":
+        return SYMBOLS["#"]
+    return SYMBOLS[match.group("symbol")]
+
+
+@lru_cache(maxsize=1024)
+def normalize(text: str) -> str:
+    """
+    Rewrites text so the TTS voice reads it naturally: numbers, decimals, percentages,
+    units, times, dates, ordinals and arithmetic become words in a single regex pass.
+    """
+    start = time.perf_counter()
+    spoken = _SPACES.sub(" ", _LINE_BREAK.sub(". ", _TOKEN.sub(_replace, text.strip()))).strip()
+    stats["calls"] += 1
+    stats["ms"] += (time.perf_counter() - start) * 1000
+    return spoken
+
+
+# Realistic outputs of the actions whose replies are read out
+SAMPLES = [
+    "CPU Usage: 12.5% | Cores: 8",
+    "RAM: 7.83GB used / 15.69GB total (49.9%)",
+    "Battery: 87% | Not Charging | Time left: 143 min",
+    "CPU Usage: 3.1% | Cores: 16\nRAM: 11.2GB used / 31.9GB total (35.1%)\nBattery: 100% | Charging",
+    "12 * 6 = 72",
+    "sqrt(144) + 2^3 = 20",
+    "1250 / 4 = 312.5",
+    "Reminder set! Popup in 1h 30m: 'call mom'",
+    "Reminder set! Popup in 45s: 'check the oven'",
+    "Active reminders:\n  #1 — 'stand up' at 2025-03-05 14:30:00\n  #2 — 'meeting' at 2025-03-21 09:05:00",
+    "Cleared 3 reminder(s).",
+    "It is 3rd of May and the time is 7:45 PM.",
+]
+
+
+def _legacy(text: str) -> str:
+    """The previous per-word implementation, kept for comparison."""
+    words = []
+    for word in text.split():
+        clean_word = re.sub(r'[^\d]', '', word)
+        words.append(_engine().number_to_words(clean_word) if clean_word.isdigit() else word)
+    return " ".join(words)
+
+
+def benchmark(rounds: int = 200) -> dict:
+    """
+    Per-call cost over SAMPLES: the old word-by-word pass, the new pass with empty
+    caches, a new text made of numbers already spelled out once, and a repeated text.
+    """
+    _engine()
+
+    def per_call(function) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for sample in SAMPLES:
+                function(sample)
+        return (time.perf_counter() - start) / (rounds * len(SAMPLES)) * 1e6
+
+    legacy_us = per_call(_legacy)
+
+    def cold(sample):
+        normalize.cache_clear()
+        number_to_words.cache_clear()
+        ordinal_to_words.cache_clear()
+        return normalize(sample)
+
+    def new_text(sample):
+        normalize.cache_clear()
+        return normalize(sample)
+
+    cold_us = per_call(cold)
+    new_text_us = per_call(new_text)
+    repeated_us = per_call(normalize)
+    return {
+        "samples": len(SAMPLES),
+        "legacy_us": round(legacy_us, 1),
+        "cold_us": round(cold_us, 1),
+        "new_text_us": round(new_text_us, 1),
+        "repeated_us": round(repeated_us, 2),
+        "number_cache": number_to_words.cache_info()._asdict(),
+    }
+
+
+if __name__ == "__main__":
+    for sample in SAMPLES:
+        print(f"{sample!r}\n  old: {_legacy(sample)}\n  new: {normalize(sample)}")
+    print(benchmark())
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+
+class Skipped(Exception):
+    """The result of a call that was not run because a call it depends on failed."""
+
+
+def as_calls(decision: dict) -> list:
+    """
+    Normalises a brain decision into an ordered list of calls. A decision is either a
+    single {"function_name", "args"} call or {"calls": [...]} for compound requests.
+    """
+    if isinstance(decision.get("calls"), list):
+        calls = decision["calls"]
+    else:
+        calls = [decision]
+    return [
+        {
+            "function_name": call.get("function_name"),
+            "args": call.get("args") or {},
+            "depends_on": [i for i in call.get("depends_on") or [] if isinstance(i, int)],
+        }
+        for call in calls if isinstance(call, dict)
+    ]
+
+
+def compile_plan(calls: list) -> list:
+    """
+    Groups calls into waves: every call in a wave only depends on calls in earlier
+    waves, so the calls of one wave can run concurrently. Dependencies on unknown
+    indices are ignored; calls caught in a cycle run one per wave, in order.
+
+    Returns:
+        list: Waves of call indices, e.g. [[0, 2], [1]].
+    """
+    pending = {
+        i: {d for d in call.get("depends_on", []) if 0 <= d < len(calls) and d != i}
+        for i, call in enumerate(calls)
+    }
+    waves, done = [], set()
+
+    while pending:
+        ready = sorted(i for i, deps in pending.items() if deps <= done)
+        if not ready:
+            ready = [min(pending)]  # break a cycle in request order
+        waves.append(ready)
+        done.update(ready)
+        for i in ready:
+            del pending[i]
+
+    return waves
+
+
+def run_plan(calls: list, waves: list, call_function) -> list:
+    """
+    Runs the calls wave by wave, each wave concurrently, through call_function(name, args).
+    A call whose dependency failed or was skipped is not run.
+
+    Returns:
+        list: One entry per call, in call order: its return value, the exception it
+            raised, or Skipped.
+    """
+    results = [None] * len(calls)
+
+    def run(i):
+        for d in calls[i].get("depends_on", []):
+            if 0 <= d < len(calls) and d != i and isinstance(results[d], Exception):
+                return Skipped(f"{calls[d]['function_name']} did not succeed")
+        try:
+            return call_function(calls[i]["function_name"], calls[i]["args"])
+        except Exception as e:
+            return e
+
+    for wave in waves:
+        if DEBUG: print(f"[plan] Running {[calls[i]['function_name'] for i in wave]}")
+        if len(wave) == 1:
+            results[wave[0]] = run(wave[0])
+            continue
+        with ThreadPoolExecutor(max_workers=len(wave)) as pool:
+            for i, result in zip(wave, pool.map(run, wave)):
+                results[i] = result
+
+    return results
+
+
+def summarize(calls: list, results: list) -> str:
+    """Joins the results of a plan into one sentence to announce."""
+    parts = []
+    for call, result in zip(calls, results):
+        if isinstance(result, Skipped):
+            parts.append(f"{call['function_name']} skipped because {result}")
+        elif isinstance(result, Exception):
+            parts.append(f"{call['function_name']} failed: {result}")
+        elif result:
+            parts.append(str(result).strip().rstrip("."))
+    return ". ".join(parts) + "." if parts else ""
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import inspect
+import functools
+import threading
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+ENABLED: bool = settings.result_cache
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# An action opts in with a module constant, read statically by the manifest:
+#
+# CACHE = {
+#     "ttl": 60,                                  # seconds an answer stays valid
+#     "when": {"action": ["list"]},               # only calls with these argument values are cached
+#     "invalidated_by": {"reminder": {"action": ["set", "clear"]}},  # calls that drop the cached answers
+#     "files": ["reminders.json"],                # answers also expire when these files change
+# }
+
+_specs = {}         # action name -> CACHE spec
+_dependents = {}    # action name -> [(cached action name, argument filter)]
+_entries = {}       # (action name, canonical args) -> (expires_at, file mtimes, result)
+_lock = threading.Lock()
+stats = {}          # action name -> {"hits", "misses", "invalidations"}
+
+
+def configure(tool_manifest: dict) -> None:
+    """Reads the CACHE declarations of every action in the manifest."""
+    _specs.clear()
+    _dependents.clear()
+    for name, entry in tool_manifest.items():
+        spec = entry.get("cache")
+        if not spec or not spec.get("ttl"):
+            continue
+        if entry.get("executor") == "process":
+            # The answer would be stored in the worker process, where nobody reads it
+            print(f"Warning: CACHE is ignored for process-pool action '{name}'")
+            continue
+        _specs[name] = spec
+        stats.setdefault(name, {"hits": 0, "misses": 0, "invalidations": 0})
+        for trigger, when in (spec.get("invalidated_by") or {}).items():
+            _dependents.setdefault(trigger, []).append((name, when or {}))
+
+
+def involved(name: str) -> bool:
+    """Whether calls to the action need to go through the cache: it is cached or it invalidates."""
+    return ENABLED and (name in _specs or name in _dependents)
+
+
+def _matches(args: dict, when: dict) -> bool:
+    """Whether every argument named in `when` has one of the listed values."""
+    for arg, values in when.items():
+        value = args.get(arg)
+        value = value.strip().lower() if isinstance(value, str) else value
+        if value not in values:
+            return False
+    return True
+
+
+def _canonical(func, args: dict) -> tuple:
+    """Arguments with defaults filled in and strings folded, so equivalent calls share one key."""
+    try:
+        bound = inspect.signature(func).bind(**args)
+        bound.apply_defaults()
+        args = bound.arguments
+    except TypeError:
+        pass
+    folded = {k: v.strip().lower() if isinstance(v, str) else v for k, v in args.items()}
+    return folded, json.dumps(folded, sort_keys=True, default=str)
+
+
+def _mtimes(spec: dict) -> tuple:
+    mtimes = []
+    for path in spec.get("files") or []:
+        try:
+            mtimes.append(os.stat(os.path.join(BASE_DIR, path)).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def invalidate(name: str, args: dict = None) -> int:
+    """
+    Drops the cached answers that a call to `name` makes stale, or every answer of
+    `name` when args is None.
+
+    Returns:
+        int: How many entries were dropped.
+    """
+    if args is None:
+        targets = {name}
+    else:
+        targets = {cached for cached, when in _dependents.get(name, []) if _matches(args, when)}
+    with _lock:
+        stale = [key for key in _entries if key[0] in targets]
+        for key in stale:
+            del _entries[key]
+    for target in targets:
+        if target in stats:
+            stats[target]["invalidations"] += 1
+    if DEBUG and stale: print(f"[result_cache] {name} dropped {len(stale)} answer(s) of {sorted(targets)}")
+    return len(stale)
+
+
+def wrap(name: str, func):
+    """Wraps an action so cacheable calls are answered from the cache and invalidating calls clear it."""
+    spec = _specs.get(name)
+
+    @functools.wraps(func)
+    def cached(**args):
+        folded, key = _canonical(func, args)
+        if spec is None or not _matches(folded, spec.get("when") or {}):
+            result = func(**args)
+            invalidate(name, folded)
+            return result
+
+        now = time.monotonic()
+        mtimes = _mtimes(spec)
+        with _lock:
+            entry = _entries.get((name, key))
+        if entry is not None and entry[0] > now and entry[1] == mtimes:
+            stats[name]["hits"] += 1
+            return entry[2]
+
+        stats[name]["misses"] += 1
+        result = func(**args)
+        if isinstance(result, str):
+            with _lock:
+                _entries[(name, key)] = (time.monotonic() + spec["ttl"], mtimes, result)
+        invalidate(name, folded)
+        return result
+
+    return cached
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def report() -> dict:
+    """Hit ratio per cached action."""
+    result = {}
+    for name, counts in stats.items():
+        lookups = counts["hits"] + counts["misses"]
+        result[name] = {**counts, "hit_ratio": round(counts["hits"] / lookups, 3) if lookups else None}
+    return result
+
+
+def benchmark(repeats: int = 5) -> dict:
+    """
+    Calls system_info("cpu"), a file_search over /usr and a slow fake notes
+    list repeatedly, with a notes("add") in the middle that must invalidate the list.
+    """
+    import extensions.actions.register as rg
+    import extensions.essentials.manifest as manifest
+    from extensions.fakes import fake_actions
+
+    tool_manifest = {name: entry for name, entry in manifest.build().items()
+                     if name in ("system_info", "file_search")}
+    tool_manifest["notes"] = {"function": None, "cache": {"ttl": 60, "when": {"action": ["list"]},
+                                                            "invalidated_by": {"notes": {"action": ["add"]}}}}
+    functions = rg.import_all_from_current_directory(tool_manifest, lazy=False)
+    functions["notes"] = wrap("notes", fake_actions.notes)
+    calls = [
+        ("system_info", {"query": "cpu"}),
+        ("file_search", {"query": "python3", "path": "/usr" if os.path.isdir("/usr") else BASE_DIR}),
+        ("notes", {"action": "list"}),
+    ]
+
+    results = {}
+    for name, args in calls:
+        timings = []
+        for i in range(repeats):
+            if name == "notes" and i == repeats // 2:
+                functions["notes"](action="add", content=f"note {i}")
+            start = time.perf_counter()
+            functions[name](**args)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {"first_ms": round(timings[0], 2), "repeat_ms": [round(t, 3) for t in timings[1:]]}
+    results["cache"] = report()
+    return results
+
+
+if __name__ == "__main__":
+    # Run the imported module, the one the register wraps actions with
+    import extensions.essentials.result_cache as result_cache
+
+    print(json.dumps(result_cache.benchmark(), indent=2))
@@ -0,0 +1,114 @@
+import re
+import math
+from collections import Counter
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+TOP_K = settings.tools_top_k
+
+# Always offered to the model so it can answer the user directly
+ALWAYS_INCLUDE = ["talk"]
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+STOP_WORDS = {
+    "a", "an", "the", "to", "of", "and", "or", "in", "on", "for", "is", "it",
+    "me", "my", "i", "you", "your", "this", "that", "be", "with", "as", "by",
+    "please", "can", "could", "would", "str", "none", "int", "function",
+    "arguments", "argument", "example", "usage", "description", "one",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_index = {"docs": {}, "df": Counter(), "avgdl": 0.0}
+stats = {"turns": 0, "full_chars": 0, "sent_chars": 0, "fallbacks": 0}
+
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so "songs"/"song" and "opening"/"open" match."""
+    for suffix in ("ing", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    # Splitting on "_" lets "system_info" match "system" and "info"
+    words = _TOKEN.findall(text.lower().replace("_", " "))
+    return [_stem(w) for w in words if w not in STOP_WORDS]
+
+
+def build(tool_manifest: dict) -> None:
+    """Builds the BM25 index once over the definations in the tool manifest."""
+    docs = {}
+    df = Counter()
+    for function_name, entry in tool_manifest.items():
+        if not entry["defination"]:
+            continue
+        terms = Counter(tokenize(f"{function_name} {entry['defination']}"))
+        docs[function_name] = (terms, sum(terms.values()))
+        df.update(terms.keys())
+
+    _index["docs"] = docs
+    _index["df"] = df
+    _index["avgdl"] = sum(length for _, length in docs.values()) / len(docs) if docs else 0.0
+
+    if DEBUG: print(f"[retrieval] Indexed {len(docs)} tools, {len(df)} terms.")
+
+
+def scores(user_input: str) -> dict:
+    """BM25 score of every indexed tool against the utterance."""
+    docs, df, avgdl = _index["docs"], _index["df"], _index["avgdl"]
+    n = len(docs)
+    query = tokenize(user_input)
+
+    result = {}
+    for function_name, (terms, length) in docs.items():
+        score = 0.0
+        for term in query:
+            tf = terms.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avgdl))
+        result[function_name] = score
+    return result
+
+
+def select(user_input: str, k: int = TOP_K) -> list:
+    """
+    Returns the names of the k tools that best match the utterance, plus the
+    tools in ALWAYS_INCLUDE.
+    """
+    ranked = sorted(scores(user_input).items(), key=lambda item: item[1], reverse=True)
+    names = [name for name, score in ranked[:k] if score > 0]
+    for name in ALWAYS_INCLUDE:
+        if name in _index["docs"] and name not in names:
+            names.append(name)
+    return names
+
+
+def log_turn(sent_chars: int, full_chars: int, latency_ms: float, fallback: bool = False) -> None:
+    """Records the prompt size of one turn so the savings are visible."""
+    stats["turns"] += 1
+    stats["sent_chars"] += sent_chars
+    stats["full_chars"] += full_chars
+    stats["fallbacks"] += fallback
+
+    if DEBUG:
+        saved = 1 - stats["sent_chars"] / stats["full_chars"] if stats["full_chars"] else 0.0
+        print(f"[retrieval] Tools: {sent_chars}/{full_chars} chars | think: {latency_ms:.0f} ms"
+              f"{' | fallback to full set' if fallback else ''} | saved so far: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    import extensions.essentials.manifest as manifest
+
+    build(manifest.build())
+    for sample in ["open youtube for me", "remind me to drink water in 20 minutes",
+                   "take a screenshot", "search google for python tutorials",
+                   "find my resume", "how are you doing today"]:
+        print(f"{sample!r:44} -> {select(sample)}")
@@ -0,0 +1,188 @@
+import re
+import time
+import threading
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+# Spoken forms for the allowed argument values listed in each action's defination.
+# Values that are not listed here are matched literally.
+SYNONYMS = {
+    "play":     ["play", "start"],
+    "resume":   ["resume", "unpause", "continue"],
+    "next":     ["next", "skip"],
+    "prev":     ["prev", "previous", "last"],
+    "cpu":      ["cpu", "processor"],
+    "ram":      ["ram", "memory"],
+    "all":      ["all system", "system"],
+    "minimize": ["minimize", "minimise"],
+    "maximize": ["maximize", "maximise"],
+}
+
+# Pattern templates per action. `{choices}` is replaced with an alternation of the
+# spoken forms of the action's argument values.
+TEMPLATES = {
+    "music": [
+        (r"(?:please )?(?P<action>{choices})(?: the| some| my)?(?: playing)? (?:music|song|track|songs)(?: please)?", "action"),
+        (r"(?:music|song) (?P<action>{choices})", "action"),
+    ],
+    "system_info": [
+        (r"(?:what(?:'s| is) |how(?:'s| is) |how much |check |show(?: me)? |tell me )?(?:the |my )?"
+         r"(?P<query>{choices})(?: usage| level| status| percentage| percent| info| information| stats)?"
+         r"(?: is left| left| now)?(?: please)?", "query"),
+    ],
+    "window_control": [
+        (r"(?:please )?(?P<action>{choices})(?: the| this)?(?: current| active| focused)? (?:window|app|application)", "action"),
+    ],
+    "tell_time": [
+        (r"(?:what(?:'s| is) the (?:current )?time|what time is it|tell me the time|(?:current )?time)(?: right now| now)?(?: please)?", None),
+    ],
+}
+
+# Spoken math operators -> Python operators, for the calculator fast path.
+_OPERATORS = [
+    (re.compile(r"\bto the power of\b"), "**"),
+    (re.compile(r"\b(?:multiplied by|times|x)\b"), "*"),
+    (re.compile(r"\b(?:divided by|over)\b"), "/"),
+    (re.compile(r"\bplus\b"), "+"),
+    (re.compile(r"\bminus\b"), "-"),
+    (re.compile(r"(?:\bsquare root of |sqrt ?\(?)(\d+(?:\.\d+)?)\)?"), r"sqrt(\1)"),
+]
+_NUMBER = r"\d+(?:\.\d+)?"
+_OPERATOR = r"(?:\*\*|[-+*/^x]|plus|minus|times|multiplied by|divided by|over|to the power of)"
+_CALCULATOR = re.compile(
+    rf"(?:calculate |compute |solve |evaluate |what(?:'s| is) )?"
+    rf"(?P<expression>{_NUMBER}(?: ?{_OPERATOR} ?{_NUMBER})+|(?:square root of |sqrt ?\(?){_NUMBER}\)?)"
+)
+
+_CLEAN = re.compile(r"[?!.,]+(?=\s|$)")
+
+# "grammar": [(function_name, compiled_pattern, arg_name, {spoken: value})]
+_state = {"grammar": [], "calculator": False}
+_lock = threading.Lock()  # build() swaps in a new grammar while route() may be matching
+stats = {"hits": 0, "misses": 0}
+
+
+def _normalize(text: str) -> str:
+    text = _CLEAN.sub("", text.lower())
+    return " ".join(text.split())
+
+
+def build(tool_manifest: dict) -> None:
+    """
+    Compiles the fast-path grammar from the argument sets of the actions in the tool manifest.
+    Actions missing from the manifest are skipped. The new grammar replaces the old one
+    in a single step, so a reload never leaves route() with a partial grammar.
+    """
+    grammar = []
+
+    for function_name, templates in TEMPLATES.items():
+        entry = tool_manifest.get(function_name)
+        if entry is None:
+            continue
+
+        for template, arg_name in templates:
+            spoken = {}
+            for value in entry["choices"].get(arg_name, []):
+                for form in SYNONYMS.get(value, [value]):
+                    spoken[form] = value
+            # Longest forms first so "all system" wins over "system"
+            choices = "|".join(re.escape(form) for form in sorted(spoken, key=len, reverse=True))
+            if arg_name and not choices:
+                continue
+            pattern = re.compile(template.format(choices=choices))
+            grammar.append((function_name, pattern, arg_name, spoken))
+
+    with _lock:
+        _state["grammar"] = grammar
+        _state["calculator"] = "calculator" in tool_manifest
+    if DEBUG:
+        print(f"[router] Compiled {len(grammar)} fast-path patterns.")
+
+
+def _match(text: str) -> dict:
+    with _lock:
+        grammar, calculator = _state["grammar"], _state["calculator"]
+
+    for function_name, pattern, arg_name, spoken in grammar:
+        match = pattern.fullmatch(text)
+        if match:
+            args = {arg_name: spoken[match.group(arg_name)]} if arg_name else {}
+            return {"function_name": function_name, "args": args}
+
+    if calculator:
+        match = _CALCULATOR.fullmatch(text)
+        if match:
+            expression = match.group("expression")
+            for operator, symbol in _OPERATORS:
+                expression = operator.sub(symbol, expression)
+            return {"function_name": "calculator", "args": {"expression": expression.replace("^", "**")}}
+
+    return None
+
+
+def route(user_input: str, alternatives: list = ()) -> dict:
+    """
+    Resolves the user command locally. When it misses, the alternatives (less likely
+    transcriptions of the same utterance) are tried in order. Counts one hit or miss per turn.
+
+    Returns:
+        dict: A dictionary containing 'function_name' and 'args', or None on a miss.
+    """
+    thought = None
+    for text in [user_input, *alternatives]:
+        thought = _match(_normalize(text))
+        if thought:
+            break
+
+    if thought:
+        stats["hits"] += 1
+        if DEBUG: print(f"[router] Fast path: {thought}")
+    else:
+        stats["misses"] += 1
+
+    return thought
+
+
+def hit_rate() -> float:
+    total = stats["hits"] + stats["misses"]
+    return stats["hits"] / total if total else 0.0
+
+
+def benchmark(utterances: list, tools_definations: str, rounds: int = 100) -> dict:
+    """
+    Compares the latency of the fast path against a brain.think round trip.
+    Returns the average time per utterance in milliseconds for each path.
+    """
+    import extensions.essentials.brain as brain
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for utterance in utterances:
+            _match(_normalize(utterance))
+    router_ms = (time.perf_counter() - start) * 1000 / (rounds * len(utterances))
+
+    start = time.perf_counter()
+    for utterance in utterances:
+        brain.think(utterance, tools_definations)
+    brain_ms = (time.perf_counter() - start) * 1000 / len(utterances)
+
+    return {"router_ms": router_ms, "brain_ms": brain_ms, "speedup": brain_ms / router_ms if router_ms else 0.0}
+
+
+if __name__ == "__main__":
+    import extensions.essentials.manifest as manifest
+
+    tool_manifest = manifest.build()
+    build(tool_manifest)
+
+    samples = [
+        "What time is it?", "Pause music", "Next song", "previous track",
+        "how much battery is left", "minimize this window", "calculate 12 times 6",
+        "what is 100 / 4", "open youtube for me",
+    ]
+    for sample in samples:
+        print(f"{sample!r:32} -> {route(sample)}")
+    print(f"Hit rate: {hit_rate():.0%}")
+
+    print(benchmark(samples[:4], manifest.descriptions(tool_manifest)))
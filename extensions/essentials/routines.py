@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import threading
+
+import extensions.essentials.plan as plan
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+BASE_DIR      = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROUTINES_FILE = os.path.join(BASE_DIR, "routines.json")
+
+# Actions that act on whatever is focused right now must wait for every step before them
+ORDERED = {"window_control"}
+
+_RECORD = re.compile(r"^(?:start )?record(?:ing)? (?:a )?(?:new )?routine (?:called |named )?(.+)$")
+_STOP = re.compile(r"^(?:stop|save|finish|end) (?:the )?(?:recording|routine)$")
+_CANCEL = re.compile(r"^cancel (?:the )?(?:recording|routine)$")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+_routines = {}   # name -> {"triggers": [...], "calls": [...], "waves": [[...]]}
+_triggers = {}   # normalized trigger phrase -> routine name
+_recordings = {}  # owner (None for the voice loop) -> {"name": str, "calls": [...]}
+_lock = threading.Lock()
+_state = {"loaded": False}
+stats = {"runs": 0}
+
+
+def normalize(text: str) -> str:
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def default_triggers(name: str) -> list:
+    name = normalize(name)
+    return [name, f"start {name}", f"run {name}"]
+
+
+def infer_dependencies(calls: list) -> list:
+    """
+    Fills in depends_on for recorded calls that did not state it: a call waits for
+    earlier calls to the same function, and ORDERED actions wait for everything before them.
+    """
+    resolved = []
+    for i, call in enumerate(calls):
+        call = dict(call)
+        if "depends_on" not in call:
+            if call["function_name"] in ORDERED:
+                call["depends_on"] = list(range(i))
+            else:
+                call["depends_on"] = [j for j in range(i) if calls[j]["function_name"] == call["function_name"]]
+        resolved.append(call)
+    return plan.as_calls({"calls": resolved})
+
+
+def _index(name: str, routine: dict) -> None:
+    for trigger in routine["triggers"]:
+        _triggers[normalize(trigger)] = name
+
+
+def load(routines_file: str = None) -> dict:
+    """
+    Loads the routines and compiles any plan that is missing from the file, so
+    hand-written routines only need a list of calls.
+    """
+    routines_file = routines_file or ROUTINES_FILE
+    _state["loaded"] = True
+    _routines.clear()
+    _triggers.clear()
+    if not os.path.exists(routines_file):
+        return _routines
+    try:
+        with open(routines_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        if DEBUG: print(f"[routines] Could not read {routines_file}: {e}")
+        return _routines
+
+    for name, routine in data.items():
+        calls = infer_dependencies(routine.get("calls", []))
+        _routines[name] = {
+            "triggers": routine.get("triggers") or default_triggers(name),
+            "calls": calls,
+            "waves": routine.get("waves") or plan.compile_plan(calls),
+        }
+        _index(name, _routines[name])
+
+    if DEBUG: print(f"[routines] Loaded {len(_routines)} routine(s).")
+    return _routines
+
+
+def _save() -> None:
+    tmp_file = ROUTINES_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(_routines, f, indent=4)
+    os.replace(tmp_file, ROUTINES_FILE)
+
+
+def define(name: str, calls: list, triggers: list = None) -> dict:
+    """
+    Stores a routine as a precompiled plan.
+
+    Args:
+        name (str): The routine name, e.g. "work mode".
+        calls (list): Resolved calls, each {"function_name", "args"} with optional "depends_on".
+        triggers (list): Phrases that run the routine. Defaults to the name, "start <name>" and "run <name>".
+    """
+    if not _state["loaded"]:
+        load()
+    calls = infer_dependencies(calls)
+    with _lock:
+        _routines[name] = {
+            "triggers": triggers or default_triggers(name),
+            "calls": calls,
+            "waves": plan.compile_plan(calls),
+        }
+        _index(name, _routines[name])
+        _save()
+    return _routines[name]
+
+
+def match(user_input: str) -> dict:
+    """Returns the routine whose trigger phrase is the whole utterance, or None."""
+    if not _state["loaded"]:
+        load()
+    name = _triggers.get(normalize(user_input))
+    return _routines.get(name)
+
+
+def run(routine: dict, call_function) -> list:
+    """Runs the precompiled plan of a routine through call_function(name, args)."""
+    stats["runs"] += 1
+    return plan.run_plan(routine["calls"], routine["waves"], call_function)
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+def is_recording(owner: str = None) -> bool:
+    return owner in _recordings
+
+
+def command(user_input: str, owner: str = None) -> str:
+    """
+    Handles the spoken recording commands: "record routine work mode" starts recording,
+    "save routine" stores the calls made since, "cancel recording" drops them.
+    Each owner (a daemon client, or None for the voice loop) records on its own.
+
+    Returns:
+        str: A message to announce, or None when the utterance is not a recording command.
+    """
+    text = normalize(user_input)
+
+    started = _RECORD.match(text)
+    if started and not is_recording(owner):
+        _recordings[owner] = {"name": started.group(1), "calls": []}
+        return f"Recording routine {started.group(1)}. Say save routine when you are done."
+
+    if not is_recording(owner):
+        return None
+
+    if _STOP.match(text):
+        recording = _recordings.pop(owner)
+        name, calls = recording["name"], recording["calls"]
+        if not calls:
+            return f"Nothing was recorded for {name}."
+        define(name, calls)
+        return f"Saved routine {name} with {len(calls)} steps. Say start {name} to run it."
+
+    if _CANCEL.match(text):
+        _recordings.pop(owner, None)
+        return "Recording cancelled."
+
+    return None
+
+
+def record(calls: list, owner: str = None) -> None:
+    """Adds resolved calls to the routine the owner is recording, if any."""
+    recording = _recordings.get(owner)
+    if recording is not None:
+        recording["calls"].extend(
+            {"function_name": call["function_name"], "args": call["args"]}
+            for call in calls if call["function_name"] not in ("error", "talk")
+        )
+
+
+if __name__ == "__main__":
+    import time
+
+    def fake_call(function_name, args):
+        time.sleep(0.2)
+        return f"{function_name} {args}"
+
+    ROUTINES_FILE = os.path.join(BASE_DIR, "routines.demo.json")
+    routine = define("work mode", [
+        {"function_name": "open_app", "args": {"app_name": "vs code"}},
+        {"function_name": "open_folder", "args": {"name": "projects"}},
+        {"function_name": "music", "args": {"action": "play"}},
+        {"function_name": "window_control", "args": {"action": "minimize"}},
+    ])
+    print(routine["waves"])
+
+    start = time.perf_counter()
+    routine = match("Start work mode!")
+    results = run(routine, fake_call)
+    print(f"{plan.summarize(routine['calls'], results)} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    os.remove(ROUTINES_FILE)
@@ -0,0 +1,174 @@
+import re
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+JSON_TYPES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_TRUE = {"true", "yes", "on", "1"}
+_FALSE = {"false", "no", "off", "0"}
+
+_schemas = {}  # function_name -> compiled args schema
+_compiled_from = {}  # function_name -> manifest (mtime, size) the schema was compiled from
+
+
+def _param_schema(param: dict, choices: list) -> dict:
+    json_type = JSON_TYPES.get(param["type"])
+    schema = {"type": json_type} if json_type else {}
+    if choices:
+        schema["enum"] = choices
+    if not param["required"] and param.get("default") is None and json_type:
+        # `save_path: str = None` style parameters accept null
+        schema["type"] = [json_type, "null"]
+    return schema
+
+
+def tool_schema(entry: dict) -> dict:
+    """Builds the JSON schema of an action's args from its signature in the tool manifest."""
+    properties = {
+        param["name"]: _param_schema(param, entry["choices"].get(param["name"]))
+        for param in entry["params"]
+    }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [param["name"] for param in entry["params"] if param["required"]],
+        "additionalProperties": False,
+    }
+
+
+def build(tool_manifest: dict) -> None:
+    """
+    Compiles the args schema of every callable action. Schemas are only rebuilt
+    for actions whose file changed since they were compiled.
+    """
+    for function_name in list(_schemas):
+        if function_name not in tool_manifest:
+            del _schemas[function_name]
+            del _compiled_from[function_name]
+
+    for function_name, entry in tool_manifest.items():
+        if not entry["function"]:
+            continue
+        version = (entry["mtime"], entry["size"])
+        if _compiled_from.get(function_name) != version:
+            _schemas[function_name] = tool_schema(entry)
+            _compiled_from[function_name] = version
+
+    if DEBUG: print(f"[schema] {len(_schemas)} tool schemas ready.")
+
+
+def response_schema(function_names: list, others: list = None) -> dict:
+    """
+    The structured-output schema for a reply that calls one of the given functions,
+    or several of them as "calls" for compound requests.
+
+    Args:
+        function_names (list): The functions offered with their full args schema.
+        others (list): Further function names the model may still pick when none of the
+            offered ones fits. Only their names are sent; their args are checked by validate().
+    """
+    names = [name for name in function_names if name in _schemas]
+    extra = [name for name in others or [] if name in _schemas and name not in names]
+    args = [_schemas[name] for name in names] + ([{"type": "object"}] if extra else [])
+    call = {
+        "type": "object",
+        "properties": {
+            "function_name": {"type": "string", "enum": names + extra},
+            "args": {"anyOf": args},
+        },
+        "required": ["function_name", "args"],
+    }
+    step = {
+        "type": "object",
+        "properties": {**call["properties"], "depends_on": {"type": "array", "items": {"type": "integer"}}},
+        "required": ["function_name", "args"],
+    }
+    return {
+        "type": "object",
+        "properties": {**call["properties"], "calls": {"type": "array", "items": step, "minItems": 1}},
+        # Either one call or a list of them; an empty object is no decision
+        "anyOf": [{"required": ["function_name", "args"]}, {"required": ["calls"]}],
+    }
+
+
+def _coerce(function_name: str, name: str, value, schema: dict):
+    json_type = schema.get("type")
+    if isinstance(json_type, list):
+        if value is None:
+            return None
+        json_type = json_type[0]
+
+    if json_type == "integer" and not isinstance(value, bool):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif isinstance(value, str):
+            match = _NUMBER.search(value)
+            if match and float(match.group()).is_integer():
+                value = int(float(match.group()))
+    elif json_type == "number" and isinstance(value, str):
+        match = _NUMBER.search(value)
+        if match:
+            value = float(match.group())
+    elif json_type == "boolean" and isinstance(value, str):
+        if value.lower() in _TRUE:
+            value = True
+        elif value.lower() in _FALSE:
+            value = False
+    elif json_type == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+
+    expected = {"integer": int, "number": (int, float), "boolean": bool, "string": str}.get(json_type)
+    if expected and (not isinstance(value, expected) or (json_type != "boolean" and isinstance(value, bool))):
+        raise ValueError(f"Argument '{name}' of '{function_name}' must be {json_type}, got {value!r}.")
+
+    if "enum" in schema:
+        for allowed in schema["enum"]:
+            if str(value).lower().strip() == allowed.lower():
+                return allowed
+        raise ValueError(f"Argument '{name}' of '{function_name}' must be one of {schema['enum']}, got {value!r}.")
+
+    return value
+
+
+def validate(function_name: str, args: dict) -> dict:
+    """
+    Validates and coerces the args of a call locally before dispatch,
+    e.g. "20" -> 20 for reminder's `seconds`. Unknown arguments are dropped.
+
+    Raises:
+        ValueError: If the call cannot be made executable.
+    """
+    schema = _schemas.get(function_name)
+    if schema is None:
+        raise ValueError(f"Function '{function_name}' not found in the register.")
+    if args is None:
+        args = {}
+    if not isinstance(args, dict):
+        raise ValueError(f"Arguments of '{function_name}' must be an object, got {args!r}.")
+
+    properties = schema["properties"]
+    clean = {}
+    for name, value in args.items():
+        if name not in properties:
+            if DEBUG: print(f"[schema] Dropping unknown argument '{name}' for '{function_name}'")
+            continue
+        clean[name] = _coerce(function_name, name, value, properties[name])
+
+    missing = [name for name in schema["required"] if clean.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing argument(s) {missing} for '{function_name}'.")
+
+    return clean
+
+
+if __name__ == "__main__":
+    import json
+    import extensions.essentials.manifest as manifest
+
+    build(manifest.build())
+    print(json.dumps(_schemas["reminder"], indent=2))
+    print(validate("reminder", {"action": "Set", "message": "stretch", "minutes": "20", "days": 1}))
+    print(validate("music", {"action": "PAUSE"}))
+    print(validate("calculator", {"expression": 12}))
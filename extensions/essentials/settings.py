@@ -0,0 +1,107 @@
+import os
+import time
+import typing
+from dataclasses import dataclass, fields
+from dotenv import load_dotenv, find_dotenv
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Every environment knob of the assistant, typed, read once at startup.
+    A field is set by the environment variable of the same name in upper case
+    (debug <- DEBUG, tts_backends <- TTS_BACKENDS); booleans are on when it is "True".
+    """
+
+    debug: bool = False
+
+    # Speech output
+    tts_stream: bool = True
+    tts_backends: str = "edge,offline"          # in order of preference
+    tts_latency_budget: float = 1.5             # seconds to the first audio chunk
+    tts_cache_dir: str = os.path.join(BASE_DIR, "tts_cache")
+    tts_cache_mb: float = 50
+    barge_in: bool = True
+
+    # Speech input
+    stt_backends: str = "google,vosk"
+    vosk_model: str = os.path.join(BASE_DIR, "vosk-model")
+    stt_n_best: int = 5
+    capture_buffer_seconds: float = 30
+    wake_word_dir: str = os.path.join(BASE_DIR, "wakeword")
+    wake_word_threshold: typing.Optional[float] = None
+
+    # Deciding
+    llm_backends: str = "gemini"
+    gemini_api_key: str = ""
+    local_llm_url: str = "http://127.0.0.1:8089/v1"
+    local_llm_model: str = "local"
+    local_llm_api_key: str = ""
+    llm_deadline: float = 15                    # seconds for a whole reply
+    llm_hedge_percentile: float = 90
+    brain_stream: bool = True
+    local_intent_threshold: float = 0.85
+    tools_top_k: int = 4
+
+    # Running actions
+    executor_threads: int = 8                   # I/O-bound actions
+    executor_processes: int = 2                 # CPU-bound actions
+    action_deadline: float = 60                 # seconds, unless the action sets DEADLINE
+    result_cache: bool = True
+    hot_reload: bool = True                     # pick up edited action files without a restart
+    hot_reload_interval: float = 1.0            # seconds between polls of the actions directory
+
+    # Headless mode
+    daemon_port: int = 8765                     # localhost port of the text command API
+
+
+def _cast(kind, raw: str):
+    if typing.get_origin(kind) is typing.Union:
+        kind = next(arg for arg in typing.get_args(kind) if arg is not type(None))
+    if kind is bool:
+        return raw == "True"
+    return kind(raw)
+
+
+def load(env_file: str = None) -> Settings:
+    """
+    Reads the .env file next to the project (or the nearest one from the working
+    directory) into the environment, then builds the settings from it.
+    Unparsable values keep their default with a warning.
+    """
+    start = time.perf_counter()
+    if env_file is None:
+        env_file = os.path.join(BASE_DIR, ".env")
+        if not os.path.exists(env_file):
+            env_file = find_dotenv(usecwd=True)
+    load_dotenv(env_file)
+
+    values = {}
+    for field in fields(Settings):
+        raw = os.getenv(field.name.upper())
+        if raw is None or raw == "":
+            continue
+        try:
+            values[field.name] = _cast(field.type, raw)
+        except ValueError:
+            print(f"Warning: Ignoring {field.name.upper()}={raw!r}, expected {field.type}")
+    loaded = Settings(**values)
+    stats["load_ms"] = (time.perf_counter() - start) * 1000
+    return loaded
+
+
+stats = {"load_ms": 0.0}
+
+# Imported by every module instead of each one calling load_dotenv() and os.getenv()
+settings = load()
+
+
+if __name__ == "__main__":
+    for field in fields(Settings):
+        value = getattr(settings, field.name)
+        if "key" in field.name and value:
+            value = "***"
+        print(f"{field.name.upper():24} {value}")
+    print(stats)
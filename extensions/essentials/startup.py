@@ -0,0 +1,102 @@
+import time
+import threading
+from concurrent.futures import Future
+
+from extensions.essentials.settings import settings, stats as settings_stats
+DEBUG: bool = settings.debug
+
+# Startup runs as a line of sequential phases, closed by mark(), next to prewarm
+# tasks that run in parallel on their own threads
+_origin = time.perf_counter()
+_state = {"last": _origin}
+_lock = threading.Lock()
+phases = []     # {"name", "start_ms", "ms", "parallel"}
+_tasks = {}     # name -> Future
+
+
+def _elapsed_ms(since: float = None) -> float:
+    return (time.perf_counter() - (_origin if since is None else since)) * 1000
+
+
+def mark(name: str) -> float:
+    """
+    Closes the sequential phase that ran since the previous mark (or since this module
+    was imported) under the given name.
+
+    Returns:
+        float: Duration of the phase in milliseconds.
+    """
+    now = time.perf_counter()
+    ms = (now - _state["last"]) * 1000
+    with _lock:
+        phases.append({"name": name, "start_ms": (_state["last"] - _origin) * 1000, "ms": ms, "parallel": False})
+    _state["last"] = now
+    if DEBUG: print(f"[startup] {name}: {ms:.1f} ms")
+    return ms
+
+
+def _run(name: str, task, future: Future) -> None:
+    start = time.perf_counter()
+    try:
+        future.set_result(task())
+    except BaseException as e:
+        future.set_exception(e)
+        if DEBUG: print(f"[startup] {name} failed: {e!r}")
+    finally:
+        with _lock:
+            phases.append({"name": name, "start_ms": (start - _origin) * 1000,
+                           "ms": _elapsed_ms(start), "parallel": True})
+
+
+def prewarm(tasks: dict) -> dict:
+    """
+    Starts every task at once, each on its own daemon thread, so slow device and network
+    setup overlap with each other and with the rest of startup.
+
+    Args:
+        tasks (dict): {name: callable without arguments}
+
+    Returns:
+        dict: {name: Future} resolving with each task's return value or exception.
+    """
+    futures = {}
+    for name, task in tasks.items():
+        future = futures[name] = _tasks[name] = Future()
+        threading.Thread(target=_run, args=(name, task, future), name=f"prewarm-{name}", daemon=True).start()
+    return futures
+
+
+def report() -> str:
+    """Per-phase timings: the sequential phases in order, then the prewarm tasks with their start offsets."""
+    with _lock:
+        rows = list(phases)
+    lines = ["Startup report (ms)", f"  {'settings':<16} {settings_stats['load_ms']:8.1f}   (.env and environment, once)"]
+    for phase in (p for p in rows if not p["parallel"]):
+        lines.append(f"  {phase['name']:<16} {phase['ms']:8.1f}   at {phase['start_ms']:7.1f}")
+    sequential = [p for p in rows if not p["parallel"]]
+    if sequential:
+        lines.append(f"  {'total':<16} {sequential[-1]['start_ms'] + sequential[-1]['ms']:8.1f}")
+    parallel = sorted((p for p in rows if p["parallel"]), key=lambda p: p["start_ms"])
+    if parallel:
+        lines.append("  prewarm, in parallel:")
+    for phase in parallel:
+        failed = _tasks.get(phase["name"]) is not None and _tasks[phase["name"]].exception() is not None
+        lines.append(f"    {phase['name']:<14} {phase['ms']:8.1f}   at {phase['start_ms']:7.1f}"
+                     + ("   failed" if failed else ""))
+    for name, future in _tasks.items():
+        if not future.done():
+            lines.append(f"    {name:<14}  running")
+    return "\n".join(lines)
+
+
+def print_report_when_done(timeout: float = 30.0) -> None:
+    """Prints the report from a background thread once every prewarm task has finished."""
+    def wait():
+        end = time.monotonic() + timeout
+        for future in list(_tasks.values()):
+            try:
+                future.exception(timeout=max(0.0, end - time.monotonic()))
+            except Exception:
+                pass
+        print(report())
+    threading.Thread(target=wait, name="startup-report", daemon=True).start()
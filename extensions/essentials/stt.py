@@ -0,0 +1,217 @@
+import os
+import json
+import time
+from abc import ABC, abstractmethod
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+from extensions.essentials.health import Monitored
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Comma separated, in order of preference: "google", "vosk"
+BACKENDS = settings.stt_backends
+VOSK_MODEL = settings.vosk_model
+N_BEST = settings.stt_n_best
+
+
+class Backend(Monitored, ABC):
+    """
+    A speech recognizer that turns AudioData into n-best hypotheses:
+    [{"text": str, "confidence": float}, ...], best first.
+    """
+
+    @abstractmethod
+    def transcribe(self, audio, n: int) -> list:
+        """n-best hypotheses for the audio, best first."""
+
+
+def _ranked(alternatives: list, n: int) -> list:
+    """Fills in missing confidences so they decrease with rank, and drops duplicates."""
+    hypotheses, seen = [], set()
+    for rank, (text, confidence) in enumerate(alternatives):
+        text = (text or "").strip()
+        if not text or text.lower() in seen:
+            continue
+        seen.add(text.lower())
+        if confidence is None:
+            previous = hypotheses[-1]["confidence"] if hypotheses else 0.9
+            confidence = previous * 0.8 if hypotheses else previous
+        hypotheses.append({"text": text, "confidence": round(float(confidence), 3)})
+    return hypotheses[:n]
+
+
+class GoogleBackend(Backend):
+    """Google Web Speech API through speech_recognition. Only the top alternative carries a confidence."""
+
+    def __init__(self, name: str = "google"):
+        super().__init__(name)
+        import speech_recognition as sr
+        self._recognizer = sr.Recognizer()
+
+    def transcribe(self, audio, n: int) -> list:
+        import speech_recognition as sr
+
+        try:
+            result = self._recognizer.recognize_google(audio, show_all=True)
+        except sr.UnknownValueError:
+            return []
+        if not result:
+            return []
+        return _ranked([(a.get("transcript"), a.get("confidence")) for a in result.get("alternative", [])], n)
+
+
+class VoskBackend(Backend):
+    """Offline recognition on the CPU with a Vosk model (https://alphacephei.com/vosk/models)."""
+
+    def __init__(self, model_path: str = VOSK_MODEL, name: str = "vosk"):
+        super().__init__(name)
+        self.model_path = model_path
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            import vosk
+
+            if not os.path.isdir(self.model_path):
+                raise FileNotFoundError(f"No Vosk model at {self.model_path}, set VOSK_MODEL")
+            vosk.SetLogLevel(-1)
+            self._model = vosk.Model(self.model_path)
+        return self._model
+
+    def transcribe(self, audio, n: int) -> list:
+        import vosk
+
+        recognizer = vosk.KaldiRecognizer(self.model, audio.sample_rate)
+        recognizer.SetMaxAlternatives(n)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_width=2))
+        alternatives = json.loads(recognizer.FinalResult()).get("alternatives", [])
+        if not alternatives:
+            return []
+        # Vosk scores are log-likelihood-like; turn them into shares of the n-best mass
+        top = max(a["confidence"] for a in alternatives)
+        weights = [2.0 ** ((a["confidence"] - top) / 10) for a in alternatives]
+        total = sum(weights)
+        return _ranked([(a["text"], w / total) for a, w in zip(alternatives, weights)], n)
+
+
+_backends = []
+
+
+def configure(backends: list) -> None:
+    """Sets the recognizers used by recognize(), in order of preference."""
+    _backends[:] = backends
+
+
+def configure_from_env() -> None:
+    backends = []
+    for name in (n.strip() for n in BACKENDS.split(",")):
+        if name == "google":
+            backends.append(GoogleBackend())
+        elif name == "vosk":
+            backends.append(VoskBackend())
+        elif name:
+            print(f"Warning: Unknown STT backend '{name}'")
+    configure(backends)
+
+
+def recognize(audio, n: int = N_BEST) -> list:
+    """
+    Transcribes the audio with the first backend that answers. A backend that fails
+    (network error, missing model) hands over to the next one instead of losing the turn.
+
+    Returns:
+        list: Up to n hypotheses [{"text", "confidence"}], best first. Empty when nothing was understood.
+    """
+    if not _backends:
+        configure_from_env()
+
+    for backend in _backends:
+        start = time.perf_counter()
+        try:
+            hypotheses = backend.transcribe(audio, n)
+        except Exception as e:
+            backend.record_failure(e, time.perf_counter() - start)
+            if DEBUG: print(f"[stt] '{backend.name}' failed: {e}")
+            continue
+        backend.record_success(time.perf_counter() - start)
+        if DEBUG: print(f"[stt] '{backend.name}': {hypotheses}")
+        return hypotheses
+    return []
+
+
+def summary() -> dict:
+    """Per-backend latency and failure stats."""
+    return {backend.name: backend.summary() for backend in _backends}
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the number of reference words."""
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[-1] / max(1, len(ref))
+
+
+def benchmark(directory: str, backends: list = None) -> dict:
+    """
+    Transcribes every WAV file listed in directory/transcripts.json ({file: text}) with
+    each backend and reports its latency, the word error rate of the top hypothesis
+    and the oracle word error rate of the best hypothesis in the n-best list.
+    """
+    import speech_recognition as sr
+    from extensions.fakes.fake_audio import read_wav
+
+    with open(os.path.join(directory, "transcripts.json"), "r", encoding="utf-8") as f:
+        transcripts = json.load(f)
+    corpus = []
+    for file_name, text in transcripts.items():
+        pcm, rate = read_wav(os.path.join(directory, file_name))
+        corpus.append((sr.AudioData(pcm, rate, 2), text))
+
+    if backends is None:
+        configure_from_env()
+        backends = list(_backends)
+
+    report = {}
+    for backend in backends:
+        top, oracle, latencies = [], [], []
+        for audio, text in corpus:
+            start = time.perf_counter()
+            try:
+                hypotheses = backend.transcribe(audio, N_BEST)
+            except Exception as e:
+                report[backend.name] = {"error": str(e)}
+                break
+            latencies.append(time.perf_counter() - start)
+            errors = [word_error_rate(text, h["text"]) for h in hypotheses] or [1.0]
+            top.append(errors[0])
+            oracle.append(min(errors))
+        else:
+            latencies.sort()
+            report[backend.name] = {
+                "files": len(corpus),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000),
+                "wer": round(sum(top) / len(top), 3),
+                "oracle_wer": round(sum(oracle) / len(oracle), 3),
+            }
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        print(json.dumps(benchmark(sys.argv[1]), indent=2))
+    else:
+        import tempfile
+        from extensions.fakes.fake_stt import FixtureBackend, write_fixture_corpus
+
+        directory = write_fixture_corpus(os.path.join(tempfile.gettempdir(), "stt_corpus"))
+        print(json.dumps(benchmark(directory, [FixtureBackend.from_directory(directory)]), indent=2))
@@ -0,0 +1,165 @@
+import os
+import time
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+from extensions.essentials.health import Monitored
+
+# Comma separated, in order of preference: "edge", "offline"
+BACKENDS = settings.tts_backends
+LATENCY_BUDGET = settings.tts_latency_budget                     # seconds to the first audio chunk
+BREAKER_THRESHOLD = 2                                            # consecutive failures to skip a backend
+BREAKER_COOLDOWN = 30.0                                          # seconds before it is tried again
+
+VOICE = "en-US-ChristopherNeural"
+RATE = "+0%"
+VOLUME = "+0%"
+
+
+class Backend(Monitored, ABC):
+    """
+    A speech synthesizer that streams encoded audio (anything pygame can decode) for a
+    piece of text. Keeps its own latency samples (time to first chunk) and circuit-breaker state.
+
+    streaming: the chunks are MP3 that may be cut at frame boundaries and played early.
+    cacheable: the audio belongs in the TTS cache under VOICE.
+    """
+
+    streaming = False
+    cacheable = False
+
+    def __init__(self, name: str):
+        super().__init__(name, BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+    @abstractmethod
+    def chunks(self, text: str):
+        """Async iterator of audio bytes."""
+
+
+class EdgeBackend(Backend):
+    """Microsoft Edge's online neural voices through edge-tts. Streams 24 kHz MP3."""
+
+    streaming = True
+    cacheable = True
+
+    def __init__(self, communicate=None, voice: str = VOICE, rate: str = RATE, volume: str = VOLUME,
+                 name: str = "edge"):
+        super().__init__(name)
+        if communicate is None:
+            import edge_tts
+            communicate = edge_tts.Communicate
+        self.communicate = communicate
+        self.voice, self.rate, self.volume = voice, rate, volume
+
+    async def chunks(self, text: str):
+        communicate = self.communicate(text, self.voice, volume=self.volume, rate=self.rate)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+
+class OfflineBackend(Backend):
+    """
+    The operating system's own voices through pyttsx3 (SAPI5, NSSpeechSynthesizer or
+    eSpeak). Less natural, but needs no network. Renders one WAV per call.
+    """
+
+    def __init__(self, name: str = "offline"):
+        super().__init__(name)
+        self._engine = None
+        self._engine_lock = threading.Lock()  # pyttsx3 engines are not thread-safe
+
+    def _render(self, text: str) -> bytes:
+        import tempfile
+        import pyttsx3
+
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = pyttsx3.init()
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+    async def chunks(self, text: str):
+        yield await asyncio.get_running_loop().run_in_executor(None, self._render, text)
+
+
+_backends = []
+
+
+def configure(backends: list) -> None:
+    """Sets the synthesizers used by open_stream(), in order of preference."""
+    _backends[:] = backends
+
+
+def configure_from_env() -> None:
+    backends = []
+    for name in (n.strip() for n in BACKENDS.split(",")):
+        if name == "edge":
+            backends.append(EdgeBackend())
+        elif name == "offline":
+            backends.append(OfflineBackend())
+        elif name:
+            print(f"Warning: Unknown TTS backend '{name}'")
+    configure(backends)
+
+
+def primary() -> Backend:
+    if not _backends:
+        configure_from_env()
+    return _backends[0]
+
+
+async def open_stream(text: str, budget: float = LATENCY_BUDGET) -> tuple:
+    """
+    Starts synthesizing text with the first backend that produces audio in time. A backend
+    gets budget seconds for its first chunk, except the last one, which is waited for.
+    A slow or failing backend hands over to the next one instead of leaving the user in silence.
+
+    Returns:
+        tuple: (backend, async iterator of audio bytes starting with the first chunk)
+    """
+    if not _backends:
+        configure_from_env()
+    candidates = [b for b in _backends if b.available()] or _backends[-1:]
+
+    error = None
+    for i, backend in enumerate(candidates):
+        last = i == len(candidates) - 1
+        start = time.perf_counter()
+        chunks = backend.chunks(text)
+        try:
+            first = await (anext(chunks) if last or budget is None else asyncio.wait_for(anext(chunks), budget))
+        except Exception as e:
+            error = e
+            backend.record_failure(e, time.perf_counter() - start)
+            try:
+                await chunks.aclose()
+            except Exception:
+                pass
+            if DEBUG: print(f"[tts] '{backend.name}' gave no audio ({e!r}), failing over")
+            continue
+        backend.record_success(time.perf_counter() - start)
+
+        async def rest(first=first, chunks=chunks):
+            yield first
+            async for data in chunks:
+                yield data
+
+        return backend, rest()
+    raise RuntimeError(f"No TTS backend produced audio: {error!r}")
+
+
+def summary() -> dict:
+    """Per-backend latency and failure stats."""
+    return {backend.name: backend.summary() for backend in _backends}
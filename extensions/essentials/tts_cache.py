@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+BASE_DIR   = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DIR  = settings.tts_cache_dir
+INDEX_FILE = "index.json"
+
+MAX_BYTES = int(settings.tts_cache_mb * 1024 * 1024)
+
+_WHITESPACE = re.compile(r"\s+")
+
+_index = {}  # key -> {"size": int, "used": float, "text": str}
+_lock = threading.Lock()
+_state = {"loaded": False, "bytes": 0}
+stats = {"hits": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+
+
+def normalize(text: str) -> str:
+    # Case and punctuation change the prosody, so only whitespace is folded
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def key(text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> str:
+    return hashlib.sha256(f"{voice}|{rate}|{volume}|{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+def _path(cache_key: str) -> str:
+    return os.path.join(CACHE_DIR, cache_key + ".mp3")
+
+
+def _load() -> None:
+    _state["loaded"] = True
+    index_path = os.path.join(CACHE_DIR, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        if DEBUG: print(f"[tts_cache] Ignoring unreadable index: {e}")
+        return
+    # Entries whose audio file went missing are dropped
+    _index.update({k: v for k, v in entries.items() if os.path.exists(_path(k))})
+    _state["bytes"] = sum(entry["size"] for entry in _index.values())
+
+
+def _save() -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    index_path = os.path.join(CACHE_DIR, INDEX_FILE)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_index, f)
+    os.replace(tmp_path, index_path)
+
+
+def _evict() -> None:
+    """Removes least recently used clips until the cache fits MAX_BYTES. Call with the lock held."""
+    for cache_key in sorted(_index, key=lambda k: _index[k]["used"]):
+        if _state["bytes"] <= MAX_BYTES:
+            break
+        entry = _index.pop(cache_key)
+        _state["bytes"] -= entry["size"]
+        stats["evictions"] += 1
+        try:
+            os.remove(_path(cache_key))
+        except OSError:
+            pass
+
+
+def get(text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> bytes:
+    """Returns the cached MP3 for the phrase, or None."""
+    cache_key = key(text, voice, rate, volume)
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+        entry = _index.get(cache_key)
+        if entry is None:
+            stats["misses"] += 1
+            return None
+        try:
+            with open(_path(cache_key), "rb") as f:
+                data = f.read()
+        except OSError:
+            _index.pop(cache_key)
+            _state["bytes"] -= entry["size"]
+            stats["misses"] += 1
+            return None
+        entry["used"] = time.time()
+        stats["hits"] += 1
+        stats["bytes_saved"] += len(data)
+        # The recency update is only persisted with the next put(), reads stay cheap
+        return data
+
+
+def put(text: str, voice: str, data: bytes, rate: str = "+0%", volume: str = "+0%") -> None:
+    if not data:
+        return
+    cache_key = key(text, voice, rate, volume)
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = _path(cache_key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, _path(cache_key))
+
+        previous = _index.get(cache_key)
+        _state["bytes"] += len(data) - (previous["size"] if previous else 0)
+        _index[cache_key] = {"size": len(data), "used": time.time(), "text": normalize(text)[:80]}
+        _evict()
+        _save()
+
+
+def contains(text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> bool:
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+        return key(text, voice, rate, volume) in _index
+
+
+def reset(cache_dir: str = None) -> None:
+    """Forgets the loaded index and statistics, optionally switching to another cache directory."""
+    global CACHE_DIR
+    with _lock:
+        CACHE_DIR = cache_dir or settings.tts_cache_dir
+        _index.clear()
+        _state.update(loaded=False, bytes=0)
+        stats.update(hits=0, misses=0, bytes_saved=0, evictions=0)
+
+
+def report() -> dict:
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        "entries": len(_index),
+        "bytes": _state["bytes"],
+        "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else None,
+        "bytes_saved": stats["bytes_saved"],
+        "evictions": stats["evictions"],
+    }
@@ -0,0 +1,315 @@
+import os
+import glob
+import time
+
+import extensions.essentials.ears as ears
+from extensions.essentials.wav import read_wav, write_wav
+
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+
+BASE_DIR     = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEMPLATE_DIR = settings.wake_word_dir
+
+# MFCC front end: 25 ms windows every 10 ms
+WINDOW = 400
+HOP = 160
+FFT_SIZE = 512
+MEL_FILTERS = 26
+CEPSTRA = 12                # c1..c12; c0 (loudness) is dropped
+FEATURE_RATE = 100          # MFCC frames per second at 16 kHz
+
+MAX_STRETCH = 1.6           # the wake word may be spoken up to this much slower or faster
+START_SLACK = 0.25          # seconds of leading audio the alignment may skip
+THRESHOLD_MARGIN = 1.35     # accept below the worst template-to-template cost times this margin
+DEFAULT_THRESHOLD = 9.0     # with a single template there is nothing to compare it with
+
+_templates = []             # MFCC matrices of the enrolled recordings
+_state = {"threshold": None, "filterbank": None, "dct": None}
+stats = {"checks": 0, "check_ms": 0.0, "detections": 0}
+
+
+# ── Features ──────────────────────────────────────────────────────────────────
+
+def _filterbank(sample_rate: int):
+    import numpy as np
+
+    if _state["filterbank"] is None:
+        mel = lambda hz: 2595 * np.log10(1 + hz / 700)
+        hz = lambda m: 700 * (10 ** (m / 2595) - 1)
+        points = hz(np.linspace(mel(60), mel(sample_rate / 2), MEL_FILTERS + 2))
+        bins = np.floor((FFT_SIZE + 1) * points / sample_rate).astype(int)
+        bank = np.zeros((MEL_FILTERS, FFT_SIZE // 2 + 1))
+        for m in range(1, MEL_FILTERS + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / max(1, center - left)
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / max(1, right - center)
+        n = np.arange(MEL_FILTERS)
+        _state["dct"] = np.cos(np.pi / MEL_FILTERS * (n + 0.5)[None, :] * np.arange(1, CEPSTRA + 1)[:, None])
+        _state["filterbank"] = bank
+    return _state["filterbank"], _state["dct"]
+
+
+def mfcc(pcm: bytes, sample_rate: int = 16000):
+    """MFCC frames (frames x CEPSTRA) of 16-bit PCM, with the cepstral mean removed."""
+    import numpy as np
+
+    x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    if len(x) < WINDOW:
+        return np.zeros((0, CEPSTRA), dtype=np.float32)
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])
+    count = 1 + (len(x) - WINDOW) // HOP
+    frames = np.lib.stride_tricks.as_strided(x, (count, WINDOW), (x.strides[0] * HOP, x.strides[0]))
+    power = np.abs(np.fft.rfft(frames * np.hamming(WINDOW), FFT_SIZE)) ** 2 / FFT_SIZE
+
+    bank, dct = _filterbank(sample_rate)
+    features = np.log(power @ bank.T + 1e-6) @ dct.T
+    return (features - features.mean(axis=0)).astype(np.float32)
+
+
+def alignment_cost(template, segment) -> tuple:
+    """
+    Aligns the whole template with the start of the segment by dynamic time warping.
+    The alignment may skip START_SLACK of leading audio and may end anywhere, so
+    "hey jarvis open youtube" matches "hey jarvis".
+
+    Returns:
+        tuple: (average frame distance along the best path, segment frame where it ends)
+    """
+    import numpy as np
+
+    n, m = len(template), len(segment)
+    if n == 0 or m < n / MAX_STRETCH:
+        return float("inf"), 0
+    distance = np.sqrt(((template[:, None, :] - segment[None, :, :]) ** 2).sum(axis=2)).tolist()
+
+    inf = float("inf")
+    slack = int(START_SLACK * FEATURE_RATE)
+    width = min(m, int(n * MAX_STRETCH) + slack)
+    cost = [[inf] * width for _ in range(n)]
+    steps = [[0] * width for _ in range(n)]
+    for j in range(min(slack + 1, width)):
+        cost[0][j], steps[0][j] = distance[0][j], 1
+    for i in range(1, n):
+        row, previous, d = cost[i], cost[i - 1], distance[i]
+        for j in range(width):
+            best, length = previous[j], steps[i - 1][j]
+            if j and previous[j - 1] < best:
+                best, length = previous[j - 1], steps[i - 1][j - 1]
+            if j and row[j - 1] < best:
+                best, length = row[j - 1], steps[i][j - 1]
+            if best < inf:
+                row[j], steps[i][j] = best + d[j], length + 1
+
+    last = [cost[n - 1][j] / steps[n - 1][j] if steps[n - 1][j] else inf for j in range(width)]
+    end = min(range(width), key=last.__getitem__)
+    return last[end], end
+
+
+# ── Templates ─────────────────────────────────────────────────────────────────
+
+def _speech(pcm: bytes, sample_rate: int) -> bytes:
+    """The speech part of a recording, found with the same endpointer used live."""
+    import extensions.essentials.capture as capture
+
+    size = capture.FRAME_SAMPLES * 2
+    frames = [pcm[i:i + size] for i in range(0, len(pcm) - size + 1, size)]
+    calibration = frames[:max(1, len(frames) // 8)]
+    floor = sum(capture.frame_energy(f) for f in calibration) / len(calibration)
+    endpointer = ears.Endpointer(floor, capture.FRAME_SAMPLES / sample_rate)
+    for frame in frames:
+        if endpointer.push(frame):
+            break
+    return endpointer.audio() or pcm
+
+
+def load(template_dir: str = None) -> bool:
+    """
+    Loads the enrolled wake word recordings (*.wav) and derives the detection threshold.
+    Returns True when wake word mode is available.
+    """
+    template_dir = template_dir or TEMPLATE_DIR
+    _templates.clear()
+    for path in sorted(glob.glob(os.path.join(template_dir, "*.wav"))):
+        pcm, rate = read_wav(path)
+        _templates.append(mfcc(_speech(pcm, rate), rate))
+
+    if settings.wake_word_threshold:
+        _state["threshold"] = settings.wake_word_threshold
+    elif len(_templates) > 1:
+        cross = [alignment_cost(a, b)[0] for i, a in enumerate(_templates) for j, b in enumerate(_templates) if i != j]
+        _state["threshold"] = max(cross) * THRESHOLD_MARGIN
+    elif _templates:
+        print(f"Warning: Only one wake word recording, using the default threshold {DEFAULT_THRESHOLD}. "
+              "Enroll a few more for a threshold fitted to your voice.")
+        _state["threshold"] = DEFAULT_THRESHOLD
+    else:
+        _state["threshold"] = None
+
+    if DEBUG: print(f"[wakeword] {len(_templates)} template(s), threshold {_state['threshold']}")
+    return ready()
+
+
+def ready() -> bool:
+    return bool(_templates) and _state["threshold"] is not None
+
+
+def match(pcm: bytes, sample_rate: int = 16000) -> tuple:
+    """
+    Returns (cost, end sample) of the best template alignment at the start of pcm,
+    where end sample is the first sample after the wake word.
+    """
+    start = time.perf_counter()
+    features = mfcc(pcm, sample_rate)
+    best, end = float("inf"), 0
+    for template in _templates:
+        cost, frame = alignment_cost(template, features)
+        if cost < best:
+            best, end = cost, frame
+    stats["checks"] += 1
+    stats["check_ms"] += (time.perf_counter() - start) * 1000
+    return best, (end + 1) * HOP + WINDOW - HOP
+
+
+# ── Detection ─────────────────────────────────────────────────────────────────
+
+class Spotter:
+    """
+    Watches a stream of frames for the wake word. Quiet frames only cost the VAD
+    features; MFCCs are computed once per utterance onset.
+    """
+
+    def __init__(self, noise_floor: float, frame_seconds: float, sample_rate: int = 16000):
+        self.noise_floor = noise_floor
+        self.frame_seconds = frame_seconds
+        self.sample_rate = sample_rate
+        self.window = int(max(len(t) for t in _templates) * MAX_STRETCH / FEATURE_RATE / frame_seconds) + 1
+        self.count = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.endpointer = ears.Endpointer(self.noise_floor, self.frame_seconds)
+        self.offset = self.count
+        self.checked = False
+
+    def push(self, frame: bytes) -> int:
+        """
+        Adds the next frame. Returns the index (counted over all pushed frames) of the
+        first frame after the wake word once it has been heard, otherwise None.
+        """
+        self.count += 1
+        endpointer = self.endpointer
+        ended = endpointer.push(frame)
+        if endpointer.start is None:
+            return None
+
+        if not self.checked and (ended or endpointer.count - endpointer.start >= self.window):
+            self.checked = True
+            first = max(0, endpointer.start - endpointer.pad)
+            # A finished utterance is trimmed like the templates; a longer one may carry the command
+            cost, end_sample = match(endpointer.audio() if ended else endpointer.received(), self.sample_rate)
+            if cost <= _state["threshold"]:
+                frame_samples = len(frame) // 2
+                stats["detections"] += 1
+                if DEBUG: print(f"[wakeword] Heard the wake word (cost {cost:.2f})")
+                command = self.offset + first + -(-end_sample // frame_samples)
+                self._reset()
+                return command
+
+        if ended:
+            self._reset()
+        return None
+
+
+def wait(service, timeout: float = None) -> bool:
+    """
+    Blocks until the wake word is heard on the capture service and moves its read
+    cursor to just after the wake word, so the command can follow in one breath.
+
+    Returns:
+        bool: True when the wake word was heard, False on timeout.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    spotter, base = None, None
+    for index, frame, _ in service.frames(timeout=timeout):
+        if spotter is None:
+            spotter, base = Spotter(service.noise_floor, service.frame_seconds, service.source.sample_rate), index
+        command = spotter.push(frame)
+        if command is not None:
+            service.seek(base + command)
+            return True
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+    return False
+
+
+# ── Measurements ──────────────────────────────────────────────────────────────
+
+def evaluate(directory: str = None) -> dict:
+    """
+    Measures false rejects over directory/wake/*.wav and false accepts over
+    directory/other/*.wav, using directory/templates/*.wav as the enrolled wake word.
+    Without a directory a synthetic fixture set is generated.
+    """
+    import tempfile
+    import extensions.essentials.capture as capture
+    from extensions.fakes.fake_audio import write_wake_fixtures
+
+    directory = directory or write_wake_fixtures(os.path.join(tempfile.gettempdir(), "wake_fixtures"))
+    load(os.path.join(directory, "templates"))
+
+    def heard(path: str) -> bool:
+        pcm, rate = read_wav(path)
+        size = capture.FRAME_SAMPLES * 2
+        frames = [pcm[i:i + size] for i in range(0, len(pcm) - size + 1, size)]
+        calibration = frames[:round(capture.CALIBRATION_SECONDS / 2 * rate / capture.FRAME_SAMPLES)]
+        floor = sum(capture.frame_energy(f) for f in calibration) / len(calibration)
+        spotter = Spotter(floor, capture.FRAME_SAMPLES / rate, rate)
+        return any(spotter.push(frame) is not None for frame in frames)
+
+    positives = sorted(glob.glob(os.path.join(directory, "wake", "*.wav")))
+    negatives = sorted(glob.glob(os.path.join(directory, "other", "*.wav")))
+    stats.update(checks=0, check_ms=0.0)
+    rejected = sum(not heard(path) for path in positives)
+    accepted = sum(heard(path) for path in negatives)
+    return {
+        "templates": len(_templates),
+        "threshold": round(_state["threshold"], 3),
+        "false_reject_rate": round(rejected / len(positives), 3) if positives else None,
+        "false_accept_rate": round(accepted / len(negatives), 3) if negatives else None,
+        "avg_check_ms": round(stats["check_ms"] / max(1, stats["checks"]), 1),
+    }
+
+
+def idle_cpu(seconds: float = 10.0) -> float:
+    """CPU used (percent of one core) while capture and wake word detection wait in a quiet room."""
+    import tempfile
+    import extensions.essentials.capture as capture
+    from extensions.fakes.fake_audio import WavSource, noise
+
+    path = write_wav(os.path.join(tempfile.gettempdir(), "quiet_room.wav"), noise(seconds + 2).astype("int16"))
+    service = capture.CaptureService(WavSource(path)).start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    wait(service, timeout=seconds)
+    usage = (time.process_time() - cpu) / (time.perf_counter() - wall) * 100
+    service.stop()
+    return round(usage, 2)
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "evaluate"
+    if command == "enroll":
+        # Record a few examples of the wake word from the microphone
+        import extensions.essentials.capture as capture
+
+        os.makedirs(TEMPLATE_DIR, exist_ok=True)
+        service = capture.get()
+        for i in range(int(sys.argv[2]) if len(sys.argv) > 2 else 3):
+            print(f"Say the wake word ({i + 1})...")
+            audio = ears.endpoint(service)
+            print("Saved", write_wav(os.path.join(TEMPLATE_DIR, f"wake_{int(time.time())}_{i}.wav"), audio.frame_data))
+    else:
+        print(evaluate(sys.argv[2] if len(sys.argv) > 2 else None))
+        print(f"idle CPU: {idle_cpu()}%")
@@ -0,0 +1,21 @@
+import wave
+
+SAMPLE_RATE = 16000
+
+
+def read_wav(path: str) -> tuple:
+    """Returns (pcm bytes, sample_rate) of a 16-bit mono WAV file."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2 or f.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        return f.readframes(f.getnframes()), f.getframerate()
+
+
+def write_wav(path: str, samples, sample_rate: int = SAMPLE_RATE) -> str:
+    """Writes int16 samples (numpy array or bytes) to a mono WAV file and returns the path."""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples if isinstance(samples, bytes) else samples.astype("<i2").tobytes())
+    return path
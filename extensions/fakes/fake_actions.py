@@ -0,0 +1,44 @@
+import time
+
+import extensions.essentials.executor as executor
+
+progress = {"scan": 0, "running": False}
+
+
+def wait(seconds: float = 1.0) -> str:
+    """Blocks like psutil.cpu_percent(interval=1): idle, but the caller waits."""
+    time.sleep(seconds)
+    return f"Waited {seconds} s"
+
+
+def crunch(n: int = 1_000_000) -> int:
+    """Pure Python arithmetic that holds the GIL the whole time."""
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+
+def scan(steps: int = 1_000_000, step_seconds: float = 0.0001) -> str:
+    """A long directory-walk stand-in that checks for cancellation on every step."""
+    progress.update(scan=0, running=True)
+    try:
+        for i in range(steps):
+            executor.check()
+            progress["scan"] = i
+            time.sleep(step_seconds)
+        return f"Scanned {steps} entries"
+    finally:
+        progress["running"] = False
+
+
+_notes = []
+
+
+def notes(action: str, content: str = "") -> str:
+    """A notes store whose "list" costs a slow read, like a file on a network drive."""
+    if action == "add":
+        _notes.append(content)
+        return f"Note saved: '{content}'"
+    time.sleep(0.2)
+    return f"{len(_notes)} note(s): " + ", ".join(_notes)
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+
+from extensions.essentials.wav import SAMPLE_RATE, read_wav, write_wav
+
+FRAME_SAMPLES = 480
+
+
+def noise(seconds: float, level: float = 60.0, sample_rate: int = SAMPLE_RATE, seed: int = 0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, level, int(seconds * sample_rate))
+
+
+def voiced(seconds: float, pitch: float = 140.0, level: float = 3000.0, sample_rate: int = SAMPLE_RATE, seed: int = 1):
+    """
+    Speech-like audio: a harmonic series on a wobbling pitch with a syllable-rate
+    envelope, plus a little breath noise.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    f0 = pitch * (1 + 0.08 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) ** 2
+    return level * envelope * signal / 2 + rng.normal(0, level * 0.05, len(t))
+
+
+def synthetic_utterance(lead: float = 1.5, speech: float = 1.2, tail: float = 1.0, level: float = 3000.0):
+    """Background noise, one spoken phrase, background noise. Returns int16 samples."""
+    import numpy as np
+
+    samples = np.concatenate([noise(lead, seed=0), voiced(speech, level=level), noise(tail, seed=2)])
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def fricative(seconds: float, level: float = 900.0, sample_rate: int = SAMPLE_RATE, seed: int = 4):
+    """An unvoiced "s"/"f"-like burst: quiet, high-frequency noise."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    white = rng.normal(0, level, int(seconds * sample_rate) + 1)
+    return np.diff(white)  # first difference tilts the spectrum towards high frequencies
+
+
+def synthetic_command(words: int = 3, seed: int = 0, level: float = 3000.0, noise_level: float = 60.0) -> tuple:
+    """
+    A spoken command of a few "words" separated by short pauses, inside background noise.
+    Some words start or end with a fricative.
+
+    Returns:
+        tuple: (int16 samples, (speech start, speech end) in seconds)
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    lead = rng.uniform(0.8, 1.5)
+    parts = [noise(lead, level=noise_level, seed=seed)]
+    for w in range(words):
+        if w:
+            parts.append(noise(rng.uniform(0.1, 0.3), level=noise_level, seed=seed + w))
+        if rng.random() < 0.3:
+            parts.append(fricative(rng.uniform(0.08, 0.15), seed=seed + w))
+        parts.append(voiced(rng.uniform(0.2, 0.45), pitch=rng.uniform(100, 220),
+                            level=level * rng.uniform(0.5, 1.0), seed=seed + w))
+        if rng.random() < 0.3:
+            parts.append(fricative(rng.uniform(0.08, 0.15), seed=seed + w + 100))
+    speech_end = sum(len(p) for p in parts) / SAMPLE_RATE
+    parts.append(noise(2.0, level=noise_level, seed=seed + 99))
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    return samples, (lead, speech_end)
+
+
+def write_corpus(directory: str, count: int = 40, seed: int = 0) -> str:
+    """Writes synthetic commands as WAV files plus labels.json with their speech bounds."""
+    os.makedirs(directory, exist_ok=True)
+    labels = {}
+    for i in range(count):
+        samples, bounds = synthetic_command(words=1 + i % 5, seed=seed + i,
+                                            noise_level=(30.0, 60.0, 150.0)[i % 3])
+        name = f"command_{i:03d}.wav"
+        write_wav(os.path.join(directory, name), samples)
+        labels[name] = list(bounds)
+    with open(os.path.join(directory, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f, indent=2)
+    return directory
+
+
+# Vowel formants (F1, F2) in Hz, used to synthesise distinguishable "words"
+VOWELS = {
+    "a": (730, 1090), "e": (530, 1840), "i": (270, 2290), "o": (570, 840),
+    "u": (300, 870), "ae": (660, 1720), "er": (490, 1350),
+}
+WAKE_WORD = ["e", "i", "a", "er", "i"]   # roughly "hey jarvis"
+
+
+def formant_word(vowels: list, seconds: float = 0.8, pitch: float = 130.0, level: float = 3000.0,
+                 sample_rate: int = SAMPLE_RATE, seed: int = 0):
+    """
+    A voiced "word" gliding through the given vowels: harmonics of the pitch, shaped by
+    the two formants of the current vowel.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    position = np.linspace(0, len(vowels) - 1, len(t))
+    f1 = np.interp(position, range(len(vowels)), [VOWELS[v][0] for v in vowels])
+    f2 = np.interp(position, range(len(vowels)), [VOWELS[v][1] for v in vowels])
+    f0 = pitch * (1 + 0.05 * np.sin(2 * np.pi * 2 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+
+    signal = np.zeros(len(t))
+    for k in range(1, int(4000 / pitch)):
+        frequency = k * f0
+        gain = np.exp(-((frequency - f1) / 120) ** 2) + 0.6 * np.exp(-((frequency - f2) / 180) ** 2) + 0.02
+        signal += gain * np.sin(k * phase)
+    envelope = np.minimum(1, np.minimum(t, t[-1] - t) / 0.04)
+    return level * envelope * signal / 3 + rng.normal(0, level * 0.01, len(t))
+
+
+def wake_fixture(positive: bool, seed: int = 0, noise_level: float = 60.0):
+    """
+    A recording of the wake word (positive) or of another word (negative), spoken with a
+    random pitch, speed and loudness inside background noise. Returns int16 samples.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    if positive:
+        vowels = WAKE_WORD
+    else:
+        vowels = list(rng.choice(list(VOWELS), size=rng.integers(2, 6)))
+        if vowels == WAKE_WORD:
+            vowels = vowels[::-1]
+    word = formant_word(vowels, seconds=0.8 * rng.uniform(0.85, 1.15), pitch=rng.uniform(100, 200),
+                        level=rng.uniform(1500, 4000), seed=seed)
+    samples = np.concatenate([noise(1.0, level=noise_level, seed=seed), word, noise(1.0, level=noise_level, seed=seed + 1)])
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def write_wake_fixtures(directory: str, templates: int = 3, positives: int = 30, negatives: int = 60) -> str:
+    """Writes templates/, wake/ and other/ folders of synthetic wake word fixtures."""
+    for folder, count, positive, offset in (("templates", templates, True, 0), ("wake", positives, True, 1000),
+                                            ("other", negatives, False, 2000)):
+        os.makedirs(os.path.join(directory, folder), exist_ok=True)
+        for i in range(count):
+            samples = wake_fixture(positive, seed=offset + i, noise_level=(30.0, 60.0, 150.0)[i % 3])
+            write_wav(os.path.join(directory, folder, f"{folder}_{i:03d}.wav"), samples)
+    return directory
+
+
+class WavSource:
+    """
+    Audio source that plays WAV files in place of the microphone, one frame per read().
+    Once the files run out it keeps returning low background noise, like a quiet room.
+
+    Args:
+        paths (str | list): One or more 16-bit mono WAV files, played back to back.
+        realtime (bool): Pace reads at the speed of a real microphone.
+        speed (float): Playback speed factor when realtime is on.
+    """
+
+    def __init__(self, paths, frame_samples: int = FRAME_SAMPLES, realtime: bool = True, speed: float = 1.0):
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        chunks, rates = zip(*(read_wav(path) for path in paths))
+        if len(set(rates)) != 1:
+            raise ValueError("All WAV files must share one sample rate")
+        self.sample_rate = rates[0]
+        self.sample_width = 2
+        self.frame_samples = frame_samples
+        self.realtime = realtime
+        self.speed = speed
+        self.reads = 0
+        self._pcm = b"".join(chunks)
+        self._offset = 0
+        self._silence = noise(frame_samples / self.sample_rate, level=20.0, sample_rate=self.sample_rate,
+                              seed=3).astype("<i2").tobytes()
+        self._next_read = None
+
+    @property
+    def exhausted(self) -> bool:
+        return self._offset >= len(self._pcm)
+
+    def read(self) -> bytes:
+        if self.realtime:
+            now = time.monotonic()
+            if self._next_read is None:
+                self._next_read = now
+            if self._next_read > now:
+                time.sleep(self._next_read - now)
+            self._next_read += self.frame_samples / self.sample_rate / self.speed
+
+        self.reads += 1
+        size = self.frame_samples * self.sample_width
+        if self.exhausted:
+            return self._silence
+        frame = self._pcm[self._offset:self._offset + size]
+        self._offset += size
+        return frame.ljust(size, b"\x00")
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,65 @@
+import time
+import json
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Models:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content_stream(self, model: str, contents: str, **kwargs):
+        c = self._client
+        c.requests.append(contents)
+        time.sleep(c.first_delay)
+        for i in range(0, len(c.reply), c.chunk_size):
+            if i:
+                time.sleep(c.delay)
+            c.sent_chunks += 1
+            yield _Chunk(c.reply[i:i + c.chunk_size])
+
+    def generate_content(self, model: str, contents: str, **kwargs):
+        return _Chunk("".join(chunk.text for chunk in self.generate_content_stream(model, contents, **kwargs)))
+
+
+class FakeClient:
+    """
+    Local stand-in for genai.Client that streams a fixed reply in chunks.
+
+    Args:
+        reply (str): The full text the "model" answers with.
+        chunk_size (int): Characters per streamed chunk.
+        first_delay (float): Seconds before the first chunk (time to first token).
+        delay (float): Seconds between chunks.
+    """
+
+    def __init__(self, reply: str, chunk_size: int = 8, first_delay: float = 0.3, delay: float = 0.05):
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.first_delay = first_delay
+        self.delay = delay
+        self.requests = []
+        self.sent_chunks = 0
+        self.models = _Models(self)
+
+
+def reply_for(function_name: str, args: dict, trailing: str = "") -> str:
+    """Builds a model-style reply, optionally followed by trailing tokens."""
+    return "```json\n" + json.dumps({"function_name": function_name, "args": args}, indent=4) + trailing + "\n```"
+
+
+if __name__ == "__main__":
+    import extensions.essentials.brain as brain
+    import extensions.essentials.backends as backends
+
+    reply = reply_for("music", {"action": "next"}, trailing="\n" + " " * 200)
+    for stream in (False, True):
+        client = FakeClient(reply)
+        backends.configure([backends.GeminiBackend(client=client)])
+        start = time.perf_counter()
+        decision = brain.think("next song", "function music(action: str) -> str", stream=stream)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"stream={stream!s:5} {decision} in {elapsed:.0f} ms ({client.sent_chunks} chunks)")
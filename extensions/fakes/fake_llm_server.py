@@ -0,0 +1,130 @@
+import re
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMServer:
+    """
+    Local OpenAI-compatible chat-completions server for testing the LLM router offline.
+    Streams `reply` as server-sent events.
+
+    Args:
+        reply (str): The text the "model" answers with. When None, the server echoes
+            a talk() call with the user request found in the prompt.
+        first_delay (float): Seconds before the first chunk.
+        jitter (float): Extra random seconds added to first_delay.
+        delay (float): Seconds between chunks.
+        fail_rate (float): Share of requests answered with HTTP 500.
+    """
+
+    def __init__(self, reply: str = None, port: int = 0, first_delay: float = 0.2, jitter: float = 0.0,
+                 delay: float = 0.01, chunk_size: int = 8, fail_rate: float = 0.0):
+        self.reply = reply
+        self.first_delay = first_delay
+        self.jitter = jitter
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _reply_for(self, prompt: str) -> str:
+        if self.reply is not None:
+            return self.reply
+        match = re.search(r'### USER REQUEST\s*"([^\n]*)"', prompt)
+        text = match.group(1) if match else prompt[-80:]
+        return json.dumps({"function_name": "talk", "args": {"text": text}})
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                fake.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                time.sleep(fake.first_delay + random.uniform(0, fake.jitter))
+
+                if random.random() < fake.fail_rate:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+
+                reply = fake._reply_for(body["messages"][-1]["content"])
+                try:
+                    for i in range(0, len(reply), fake.chunk_size):
+                        if i:
+                            time.sleep(fake.delay)
+                        event = {"choices": [{"index": 0, "delta": {"content": reply[i:i + fake.chunk_size]}}]}
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the router cancelled this request
+
+        return Handler
+
+
+def load_test(requests: int = 200, concurrency: int = 16) -> dict:
+    """
+    Drives brain.think through the router against a slow, jittery primary and a
+    fast secondary, and reports end-to-end latency plus per-backend stats.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import extensions.essentials.brain as brain
+    import extensions.essentials.backends as backends
+
+    primary = FakeLLMServer(first_delay=0.1, jitter=3.0, fail_rate=0.05).start()
+    secondary = FakeLLMServer(first_delay=0.3).start()
+    backends.configure([
+        backends.OpenAICompatibleBackend(primary.url, name="primary"),
+        backends.OpenAICompatibleBackend(secondary.url, name="secondary"),
+    ])
+
+    def one(i):
+        start = time.perf_counter()
+        decision = brain.think(f"request {i}", "function talk(text: str) -> None")
+        return time.perf_counter() - start, decision["function_name"] != "error"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    primary.stop()
+    secondary.stop()
+    return {
+        "requests": requests,
+        "ok": sum(ok for _, ok in results),
+        "throughput_rps": round(requests / wall, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000),
+        "backends": backends.summary(),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(load_test(), indent=2))
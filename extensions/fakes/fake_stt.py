@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import hashlib
+
+from extensions.essentials.stt import Backend
+from extensions.fakes.fake_audio import read_wav, write_wav, synthetic_command
+
+# (what was said, n-best the "recognizer" hears) - some tops are wrong on purpose
+COMMANDS = [
+    ("open youtube", [("open youtube", 0.92), ("open you tube", 0.6)]),
+    ("next song", [("next song", 0.88), ("next son", 0.5)]),
+    ("what time is it", [("what time is it", 0.95)]),
+    ("pause the music", [("pours the music", 0.55), ("pause the music", 0.52)]),
+    ("take a screenshot", [("take a screen shot", 0.7), ("take a screenshot", 0.65)]),
+    ("open notepad", [("open note pad", 0.61), ("open notepad", 0.6), ("open no pad", 0.3)]),
+    ("remind me to stretch in ten minutes", [("remind me to stretch in ten minutes", 0.9)]),
+    ("search google for weather", [("search google for whether", 0.72), ("search google for weather", 0.7)]),
+]
+
+
+def audio_key(pcm: bytes) -> str:
+    return hashlib.sha1(pcm).hexdigest()
+
+
+class FixtureBackend(Backend):
+    """
+    Deterministic recognizer for tests: returns a prepared n-best list for each known
+    recording, looked up by a hash of its PCM data.
+
+    Args:
+        hypotheses (dict): PCM hash -> [{"text", "confidence"}, ...].
+        latency (float): Seconds to sleep per call, to mimic a real engine.
+    """
+
+    def __init__(self, hypotheses: dict, latency: float = 0.0, name: str = "fixture"):
+        super().__init__(name)
+        self.hypotheses = hypotheses
+        self.latency = latency
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs) -> "FixtureBackend":
+        """Loads directory/nbest.json ({file: [[text, confidence], ...]})."""
+        with open(os.path.join(directory, "nbest.json"), "r", encoding="utf-8") as f:
+            nbest = json.load(f)
+        hypotheses = {}
+        for file_name, alternatives in nbest.items():
+            pcm, _ = read_wav(os.path.join(directory, file_name))
+            hypotheses[audio_key(pcm)] = [{"text": t, "confidence": c} for t, c in alternatives]
+        return cls(hypotheses, **kwargs)
+
+    def transcribe(self, audio, n: int) -> list:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.hypotheses.get(audio_key(audio.get_raw_data()), [])[:n]
+
+
+def write_fixture_corpus(directory: str) -> str:
+    """Writes one WAV per command plus transcripts.json and nbest.json."""
+    os.makedirs(directory, exist_ok=True)
+    transcripts, nbest = {}, {}
+    for i, (text, alternatives) in enumerate(COMMANDS):
+        samples, _ = synthetic_command(words=len(text.split()), seed=100 + i)
+        name = f"utterance_{i:03d}.wav"
+        write_wav(os.path.join(directory, name), samples)
+        transcripts[name] = text
+        nbest[name] = alternatives
+    for file_name, data in (("transcripts.json", transcripts), ("nbest.json", nbest)):
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return directory
@@ -0,0 +1,165 @@
+import io
+import os
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from extensions.essentials.tts import Backend
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_CLIP = os.path.join(BASE_DIR, "test.mp3")    # a real edge-tts clip, 24 kHz mono MP3
+
+SECONDS_PER_CHAR = 0.065    # roughly 15 characters of speech per second
+CLIP_SECONDS = 1.416        # length of SAMPLE_CLIP
+
+
+def make_communicate(first_delay: float = 0.4, chunk_delay: float = 0.02, chunk_bytes: int = 720,
+                     clip: str = SAMPLE_CLIP):
+    """
+    Builds a local stand-in for edge_tts.Communicate. It streams MP3 audio whose length
+    grows with the text, after first_delay seconds of "network" latency. The chunks are
+    cut at arbitrary byte offsets, like the real service.
+
+    Returns:
+        type: A class with the Communicate(text, voice, **kwargs).stream() / save() interface.
+    """
+    with open(clip, "rb") as f:
+        audio = f.read()
+
+    class FakeCommunicate:
+        requests = []
+
+        def __init__(self, text: str, voice: str = None, **kwargs):
+            self.text = text
+            FakeCommunicate.requests.append(text)
+
+        def _audio(self) -> bytes:
+            repeats = max(1, round(len(self.text) * SECONDS_PER_CHAR / CLIP_SECONDS))
+            return audio * repeats
+
+        async def stream(self):
+            await asyncio.sleep(first_delay)
+            data = self._audio()
+            for i in range(0, len(data), chunk_bytes):
+                if i:
+                    await asyncio.sleep(chunk_delay)
+                yield {"type": "audio", "data": data[i:i + chunk_bytes]}
+            yield {"type": "WordBoundary", "offset": 0, "duration": 0, "text": self.text}
+
+        async def save(self, audio_fname: str) -> None:
+            with open(audio_fname, "wb") as f:
+                async for chunk in self.stream():
+                    if chunk["type"] == "audio":
+                        f.write(chunk["data"])
+
+    return FakeCommunicate
+
+
+class FakeTTSServer:
+    """
+    Local HTTP stand-in for the online TTS service, for exercising timeouts and failover
+    over a real socket. GET /synthesize?text=... streams the MP3 after first_delay seconds.
+
+    Args:
+        first_delay (float): Seconds before the first byte, e.g. a congested network.
+        fail (bool): Answer every request with HTTP 503 instead.
+    """
+
+    def __init__(self, port: int = 0, first_delay: float = 3.0, chunk_delay: float = 0.02,
+                 chunk_bytes: int = 720, fail: bool = False, clip: str = SAMPLE_CLIP):
+        with open(clip, "rb") as f:
+            self.audio = f.read()
+        self.first_delay = first_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_bytes = chunk_bytes
+        self.fail = fail
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/synthesize"
+
+    def start(self) -> "FakeTTSServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        from urllib.parse import urlparse, parse_qs
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests += 1
+                text = parse_qs(urlparse(self.path).query).get("text", [""])[0]
+                time.sleep(fake.first_delay)
+                if fake.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.end_headers()
+                repeats = max(1, round(len(text) * SECONDS_PER_CHAR / CLIP_SECONDS))
+                data = fake.audio * repeats
+                try:
+                    for i in range(0, len(data), fake.chunk_bytes):
+                        if i:
+                            time.sleep(fake.chunk_delay)
+                        self.wfile.write(data[i:i + fake.chunk_bytes])
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on this request
+
+        return Handler
+
+
+def server_communicate(url: str):
+    """Builds an edge_tts.Communicate stand-in that streams from a FakeTTSServer."""
+
+    class ServerCommunicate:
+        def __init__(self, text: str, voice: str = None, **kwargs):
+            self.text = text
+
+        async def stream(self):
+            import aiohttp
+
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, params={"text": self.text}) as response:
+                    response.raise_for_status()
+                    async for data in response.content.iter_any():
+                        yield {"type": "audio", "data": data}
+
+    return ServerCommunicate
+
+
+class FakeOfflineBackend(Backend):
+    """
+    Stands in for the local pyttsx3 engine: renders a WAV of speech-like sound as long
+    as the text would take to say, after a short fixed latency.
+    """
+
+    def __init__(self, latency: float = 0.05, name: str = "offline"):
+        super().__init__(name)
+        self.latency = latency
+
+    async def chunks(self, text: str):
+        import numpy as np
+        from extensions.fakes.fake_audio import voiced, write_wav
+
+        await asyncio.sleep(self.latency)
+        samples = voiced(max(0.3, len(text) * SECONDS_PER_CHAR), sample_rate=22050)
+        buffer = io.BytesIO()
+        write_wav(buffer, np.clip(samples, -32768, 32767).astype(np.int16), sample_rate=22050)
+        yield buffer.getvalue()
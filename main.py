@@ -1,73 +1,371 @@
-import os
-from dotenv import load_dotenv
-load_dotenv()
-DEBUG: bool = os.getenv("DEBUG") == "True"
+import re
+import time
+import argparse
+import threading
+from extensions.essentials.settings import settings
+DEBUG: bool = settings.debug
+WAKE_WORD_COMMAND_TIMEOUT = 5.0  # seconds to start the command after the wake word
+CANCEL_COMMAND = re.compile(r"^(?:cancel|stop|abort)(?: (?:that|it|this|the (?:last )?(?:task|action|search)))?$")
 
 
-import importlib
+import extensions.essentials.startup as startup
 import extensions.essentials.ears as ears
+import extensions.essentials.capture as capture
+import extensions.essentials.wakeword as wakeword
 import extensions.essentials.mouth as mouth
+import extensions.essentials.barge_in as barge_in
+import extensions.essentials.router as router
+import extensions.essentials.decision_cache as decision_cache
+import extensions.essentials.manifest as manifest
+import extensions.essentials.retrieval as retrieval
+import extensions.essentials.schema as schema
 import extensions.essentials.brain as brain
+import extensions.essentials.classifier as classifier
+import extensions.essentials.plan as plan
+import extensions.essentials.routines as routines
+import extensions.essentials.executor as executor
+import extensions.essentials.backends as backends
+import extensions.essentials.tts as tts
+import extensions.essentials.hot_reload as hot_reload
+import extensions.essentials.result_cache as result_cache
+import extensions.essentials.daemon as daemon
 
 import extensions.actions.register as rg
-function_register = rg.import_all_from_current_directory()
+startup.mark("imports")
+tool_manifest = manifest.build()
+startup.mark("manifest")
+# Action modules are imported on their first call, not here
+function_register = rg.import_all_from_current_directory(tool_manifest)
+startup.mark("register")
 
-def extract_function_descriptions(actions_dir: str = "extensions/actions") -> str:
+def build_indexes(changes: dict = None) -> None:
+    """Derives the fast path, tool retrieval, arg schemas and executor settings from the manifest."""
+    router.build(tool_manifest)
+    retrieval.build(tool_manifest)
+    schema.build(tool_manifest)
+    executor.configure(tool_manifest)
+    if changes:
+        print(f"Reloaded actions: {changes}")
+
+build_indexes()
+startup.mark("indexes")
+
+# Log every LLM decision so the local classifier can be retrained on them
+brain.add_sink(classifier.log)
+# Import the action a streamed decision names while its arguments are still arriving
+brain.set_warmer(lambda function_name: rg.warm(function_name, function_register))
+
+def extract_function_descriptions(actions_dir: str = manifest.ACTIONS_DIR) -> str:
+    """
+    Reads the `defination` of every action from the tool manifest and returns
+    them concatenated as a single multiline string. Action modules are not executed.
+    """
+    return manifest.descriptions(manifest.build(actions_dir))
+
+def call_function_by_name(function_name: str, args: dict, on_done=None, owner: str = None):
     """
-    Scans all .py files in the actions directory, extracts their `defination`
-    variable, and returns them concatenated as a single multiline string.
+    Runs an action on the executor. Without on_done it waits for the result (plans and
+    routines); with on_done it returns the job right away and on_done gets it when finished.
+    The job is tagged with owner (see executor.cancel).
     """
-    definitions = []
-
-    for filename in os.listdir(actions_dir):
-        if filename.endswith(".py") and not filename.startswith("__"):
-            filepath = os.path.join(actions_dir, filename)
-            spec = importlib.util.spec_from_file_location(filename[:-3], filepath)
-            module = importlib.util.module_from_spec(spec)
-            try:
-                spec.loader.exec_module(module)
-                if hasattr(module, "defination"):
-                    definitions.append(module.defination.strip())
-            except Exception as e:
-                print(f"Warning: Could not load {filename}: {e}")
-
-    return "\n\n".join(definitions)
-
-def call_function_by_name(function_name: str, args: dict):
     func = function_register.get(function_name)
     if func:
-        return func(**args)
+        # Validate and coerce locally so bad args never surface as a TypeError
+        args = schema.validate(function_name, args)
+        if on_done is None:
+            return executor.call(function_name, func, args, owner=owner)
+        return executor.submit(function_name, func, args, on_done=on_done, owner=owner)
     else:
         raise ValueError(f"Function '{function_name}' not found in the register.")
 
-def main():
+def announce(job: executor.Job) -> None:
+    """Speaks the outcome of an action that finished in the background."""
+    name = job.name.replace("_", " ")
+    try:
+        result = job.future.result()
+    except executor.Cancelled:
+        return
+    except executor.DeadlineExceeded:
+        mouth.say(f"The {name} took too long, so I stopped it.")
+        return
+    except Exception as e:
+        print(f"Error: {e}")
+        mouth.say(f"The {name} failed.")
+        return
+    if isinstance(result, str) and result.strip():
+        mouth.say(result)
+
+def announce_plan(calls: list, run) -> None:
+    """Runs a multi-step plan off the voice loop and speaks its summary when it is done."""
+    def work():
+        results = run()
+        if any(isinstance(result, executor.Cancelled) for result in results):
+            return  # "cancel that" already answered
+        summary = plan.summarize(calls, results)
+        if summary:
+            mouth.say(summary)
+    threading.Thread(target=work, name="plan", daemon=True).start()
+
+def first_match(matcher, hypotheses: list):
+    """Runs a local matcher over the n-best transcriptions and returns the first answer."""
+    for text in hypotheses:
+        result = matcher(text)
+        if result is not None:
+            return result
+    return None
+
+def decide(user_input: str, all_tools_description: str, alternatives: list = None) -> dict:
+    """
+    Asks the brain for a decision using only the tools that best match the utterance.
+    The other tools are named but not described, and when the model picks one of them
+    the decision is retried with the full tool set.
+    """
+    candidates = retrieval.select(user_input)
+    tools_description = manifest.descriptions({name: tool_manifest[name] for name in candidates})
+
+    start = time.perf_counter()
+    thoughts = decision_cache.think(user_input, tools_description, valid=set(candidates),
+                                    response_schema=schema.response_schema(candidates, others=list(tool_manifest)),
+                                    alternatives=alternatives, all_tools_definations=all_tools_description)
+    # Answers outside the shortlist are only cached once the full tool set confirmed them
+    names = {call["function_name"] for call in plan.as_calls(thoughts)}
+    fallback = (not names <= set(candidates) and "error" not in names
+                and decision_cache.get(user_input, all_tools_description) is None)
+    if fallback:
+        # Cached under the same key as the shortlist, so the next turn skips the retry
+        thoughts = decision_cache.think(user_input, all_tools_description, valid=set(tool_manifest),
+                                        response_schema=schema.response_schema(list(tool_manifest)),
+                                        alternatives=alternatives)
+
+    retrieval.log_turn(len(tools_description), len(all_tools_description),
+                       (time.perf_counter() - start) * 1000, fallback)
+    return thoughts
+
+def interpret(texts: list, owner: str = None) -> dict:
+    """
+    Turns the n-best transcriptions of one utterance (or a typed command) into a decision.
+    Routines, the fast path and the local classifier are tried before the LLM. A routine
+    being recorded belongs to owner (None for the voice loop).
+
+    Returns:
+        dict: "source" ("routines", "cancel", "routine", "router", "classifier" or "llm"),
+            "calls" to run, and "message" for routine recording commands or "routine".
+    """
+    sound = texts[0]
+    message = routines.command(sound, owner)
+    if message:
+        return {"source": "routines", "message": message, "calls": []}
+    if CANCEL_COMMAND.match(sound.lower().strip()):
+        return {"source": "cancel", "calls": []}
+
+    routine = first_match(routines.match, texts)
+    if routine:
+        return {"source": "routine", "routine": routine, "calls": routine["calls"]}
+
+    # Resolve common commands locally, only fall back to the LLM on a miss.
+    # A misheard top transcription falls through to the alternatives.
+    source, thoughts = "router", router.route(sound, texts[1:])
+    if thoughts is None:
+        source, thoughts = "classifier", classifier.predict(sound, alternatives=texts[1:])
+    if thoughts is None:
+        # Read per turn, so reloaded actions are offered right away
+        all_tools_description = manifest.descriptions(tool_manifest)
+        source, thoughts = "llm", decide(sound, all_tools_description, alternatives=texts[1:])
+    if DEBUG:
+        print(f"Brain thought: {thoughts} | Fast path hit rate: {router.hit_rate():.0%}")
+        print(f"Local classifier: {classifier.report()}")
+    calls = plan.as_calls(thoughts)
+    routines.record(calls, owner)
+    return {"source": source, "calls": calls}
+
+def handle_command(text: str, alternatives: list = None, speak: bool = False, client: str = "default") -> dict:
+    """
+    Runs one text command to completion for the daemon API. It takes the same decision
+    path as the voice loop, but waits for the results and returns them.
+
+    Args:
+        text (str): The command, as the user would say it.
+        alternatives (list): Less likely readings of the same command.
+        speak (bool): Also say the reply out loud.
+        client (str): Who sent it. Its actions are tagged with the client, and "cancel that"
+            only cancels that client's jobs.
+
+    Returns:
+        dict: {"text", "source", "calls", "results": [{"ok", "value" or "error", optional "skipped"}], "message", "ms"}
+    """
+    start = time.perf_counter()
+    owner = f"daemon:{client}"
+
+    def run_call(function_name: str, args: dict):
+        return call_function_by_name(function_name, args, owner=owner)
+
+    decision = interpret([text] + list(alternatives or []), owner)
+    calls = decision["calls"]
+    results = []
+    if decision["source"] == "routines":
+        message = decision["message"]
+    elif decision["source"] == "cancel":
+        jobs = executor.cancel(owner=owner)
+        names = ", ".join(job.name.replace("_", " ") for job in jobs)
+        message = f"Cancelled {names}." if jobs else "Nothing to cancel."
+    elif any(call["function_name"] == "error" for call in calls):
+        message = None
+        results = [{"ok": False, "error": calls[0]["args"].get("message", "Could not understand the command")}]
+    else:
+        if decision["source"] == "routine":
+            values = routines.run(decision["routine"], run_call)
+        else:
+            values = plan.run_plan(calls, plan.compile_plan(calls), run_call)
+        results = [{"ok": False, "skipped": True, "error": f"Skipped because {value}"} if isinstance(value, plan.Skipped)
+                   else {"ok": False, "error": f"{type(value).__name__}: {value}"} if isinstance(value, BaseException)
+                   else {"ok": True, "value": value} for value in values]
+        message = plan.summarize(calls, values)
+    if speak and message:
+        mouth.say(message)
+    return {
+        "text": text,
+        "source": decision["source"],
+        "calls": [{"function_name": c["function_name"], "args": c["args"]} for c in calls],
+        "results": results,
+        "message": message,
+        "ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+def main(startup_report: bool = False):
     print("Voice Assistant is running... (say 'goodbye' to exit)")
-    all_tools_description = extract_function_descriptions()
+    # Everything the first turn needs is set up side by side
+    prewarm = startup.prewarm({
+        "microphone": capture.get,       # open the device and measure the room
+        "speech": mouth.warm,            # audio output, the beep and the fixed prompts
+        "tts": tts.primary,              # the synthesizer client for replies
+        "llm": backends.warm,            # the LLM client and its connection
+        "classifier": classifier.load,
+        "wake_word": wakeword.load,
+    })
+    # The first prompt waits for the microphone only; the rest may finish meanwhile
+    prewarm["microphone"].result()
+    if barge_in.ENABLED:
+        # Stop talking as soon as the user speaks over the assistant
+        barge_in.start(capture.get())
+    # With an enrolled wake word the assistant listens continuously instead of prompting
+    wake_word = prewarm["wake_word"].result()
+    startup.mark("ready")
+    if startup_report:
+        startup.print_report_when_done()
+    if hot_reload.ENABLED:
+        # Edited action files are picked up without a restart
+        hot_reload.start(tool_manifest, function_register, on_change=build_indexes)
 
     while True:
-        mouth.say("Please dictate the next command after beep")
-        print(" \n")
-        print("Listening for user input...")
-        mouth.say("BEEP")
-        sound = ears.listen()
+        # Let the previous reply finish, unless the user talks over it
+        mouth.wait_idle()
+        onset = barge_in.take()
+        if onset is None and not wake_word:
+            # Wait for the prompt and the beep so the microphone does not hear them
+            if mouth.say("Please dictate the next command after beep", wait=True).result():
+                print(" \n")
+                print("Listening for user input...")
+                mouth.beep(wait=True)
+            onset = barge_in.take()
+
+        if onset is not None:
+            # The speech that interrupted the assistant is the next command
+            capture.get().seek(onset)
+            hypotheses = ears.hear(flush=False, timeout=WAKE_WORD_COMMAND_TIMEOUT)
+        elif wake_word:
+            print("Waiting for the wake word...")
+            # Start at the live edge so the previous reply and stale audio are not rescanned
+            service = capture.get()
+            service.flush()
+            wakeword.wait(service)
+            hypotheses = ears.hear(flush=False, timeout=WAKE_WORD_COMMAND_TIMEOUT)
+        else:
+            hypotheses = ears.hear()
         print("processing...")
-        
-        if DEBUG: print(f"User said: {sound}")
-        if not sound:
+
+        # n-best transcriptions, most likely first
+        texts = [hypothesis["text"] for hypothesis in hypotheses]
+        if DEBUG: print(f"User said: {texts}")
+        if not texts:
             continue
+        sound = texts[0]
 
         if "good" in sound.lower() and "bye" in sound.lower():
-            mouth.say("Goodbye! Have a great day.")
+            mouth.say("Goodbye! Have a great day.", wait=True)
             print("Exiting...")
+            hot_reload.stop()
+            executor.shutdown()
             break
 
         try:
-            thoughts = brain.think(sound, all_tools_description)
-            if DEBUG: print(f"Brain thought: {thoughts}")
-            call_function_by_name(thoughts['function_name'], thoughts['args'])
+            decision = interpret(texts)
+            if decision["source"] == "routines":
+                mouth.say(decision["message"])
+                continue
+
+            if decision["source"] == "cancel":
+                jobs = executor.cancel()
+                mouth.interrupt()
+                names = ", ".join(job.name.replace("_", " ") for job in jobs)
+                mouth.say(f"Cancelled {names}." if jobs else "Nothing to cancel.")
+                continue
+
+            calls = decision["calls"]
+            if decision["source"] == "routine":
+                # Routines run their precompiled plan without any model call
+                routine = decision["routine"]
+                announce_plan(calls, lambda: routines.run(routine, call_function_by_name))
+            # Actions run on the executor, so the assistant keeps listening meanwhile
+            elif len(calls) == 1:
+                call_function_by_name(calls[0]['function_name'], calls[0]['args'], on_done=announce)
+            else:
+                # Independent calls run side by side; results are announced together
+                waves = plan.compile_plan(calls)
+                announce_plan(calls, lambda: plan.run_plan(calls, waves, call_function_by_name))
         except ValueError as e:
             print(f"Error: {e}")
         except Exception as e:
             print(f"Unexpected error: {e}")
+
+def serve(port: int = daemon.PORT, startup_report: bool = False) -> None:
+    """
+    Headless mode: keeps the register, LLM client and caches warm and answers text
+    commands over the local HTTP API (see extensions/essentials/daemon.py) until Ctrl+C.
+    """
+    prewarm = startup.prewarm({
+        "llm": backends.warm,
+        "classifier": classifier.load,
+    })
+    server = daemon.Daemon(handle_command, port=port, metrics=lambda: {
+        "executor": executor.metrics(),
+        "result_cache": result_cache.report(),
+        "router_hit_rate": router.hit_rate(),
+        "llm": backends.summary(),
+    })
+    if hot_reload.ENABLED:
+        hot_reload.start(tool_manifest, function_register, on_change=build_indexes)
+    startup.mark("ready")
+    if startup_report:
+        startup.print_report_when_done()
+    print(f"Voice Assistant daemon listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        server.stop()
+        hot_reload.stop()
+        executor.shutdown()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Voice Assistant")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup phase took once the prewarm tasks finished")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run headless and take text commands over a local HTTP API instead of the microphone")
+    parser.add_argument("--port", type=int, default=daemon.PORT, help="port of the daemon API")
+    args = parser.parse_args()
+    if args.daemon:
+        serve(args.port, args.startup_report)
+    else:
+        main(args.startup_report)
\ No newline at end of file
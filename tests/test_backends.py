@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+import extensions.essentials.backends as backends
+from extensions.fakes.fake_llm_server import FakeLLMServer
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**kwargs) -> FakeLLMServer:
+        server = FakeLLMServer(**kwargs).start()
+        started.append(server)
+        return server
+
+    yield start
+    backends.configure([])
+    for server in started:
+        server.stop()
+
+
+def backend(server: FakeLLMServer, name: str, hedge_delay: float = None) -> backends.Backend:
+    result = backends.OpenAICompatibleBackend(server.url, name=name)
+    if hedge_delay is not None:
+        result.hedge_delay = lambda: hedge_delay
+    return result
+
+
+def test_breaker_opens_after_consecutive_failures(servers):
+    failing = backend(servers(reply="x", first_delay=0, fail_rate=1.0), "failing")
+    backends.configure([failing])
+
+    for _ in range(backends.BREAKER_THRESHOLD):
+        with pytest.raises(RuntimeError):
+            "".join(backends.stream("hi", deadline=5))
+
+    assert failing.failures == backends.BREAKER_THRESHOLD
+    assert not failing.available()
+    assert failing.summary()["open"]
+
+
+def test_open_breaker_skips_the_backend(servers):
+    broken = backend(servers(reply="broken", first_delay=0), "broken")
+    healthy = backend(servers(reply="healthy", first_delay=0), "healthy")
+    broken.open_until = time.monotonic() + 60
+    backends.configure([broken, healthy])
+
+    assert "".join(backends.stream("hi", deadline=5)) == "healthy"
+    assert broken.calls == 0
+
+
+def test_hedge_answers_from_the_faster_backend_and_counts_the_loser(servers):
+    slow = backend(servers(reply="slow", first_delay=1.0), "slow", hedge_delay=0.1)
+    fast = backend(servers(reply="fast", first_delay=0.05), "fast")
+    backends.configure([slow, fast])
+
+    start = time.monotonic()
+    assert "".join(backends.stream("hi", deadline=5)) == "fast"
+    assert time.monotonic() - start < 0.8
+    assert (slow.failures, fast.failures) == (1, 0)
+
+    # The loser's late answer must not be counted a second time
+    time.sleep(1.2)
+    assert slow.calls == 1
+
+
+def test_timeout_counts_every_pending_attempt(servers):
+    hanging = backend(servers(reply="late", first_delay=1.0), "hanging")
+    backends.configure([hanging])
+
+    with pytest.raises(TimeoutError):
+        "".join(backends.stream("hi", deadline=0.3))
+
+    assert hanging.failures == 1
+    time.sleep(1.0)
+    assert hanging.calls == 1
+
+
+def test_consumer_stopping_early_is_no_failure(servers):
+    chatty = backend(servers(reply="a long reply in many chunks", first_delay=0, chunk_size=2, delay=0.05), "chatty")
+    backends.configure([chatty])
+
+    reply = backends.stream("hi", deadline=5)
+    next(reply)
+    reply.close()
+
+    time.sleep(0.3)
+    assert chatty.failures == 0
+
+
+class CutOffBackend(backends.Backend):
+    """Sends the first chunk, then drops the connection."""
+
+    def stream(self, prompt: str, response_schema: dict, timeout: float):
+        yield '{"function_name": '
+        raise ConnectionError("stream cut off")
+
+
+def test_stream_failing_after_its_first_chunk_counts_once(servers):
+    cut_off = CutOffBackend("cut_off")
+    backends.configure([cut_off])
+
+    with pytest.raises(ConnectionError):
+        "".join(backends.stream("hi", deadline=5))
+
+    assert (cut_off.calls, cut_off.failures) == (1, 1)
+
+
+def test_consumer_stopping_early_counts_one_success(servers):
+    steady = backend(servers(reply="a fairly long reply", first_delay=0, chunk_size=2), "steady")
+    backends.configure([steady])
+
+    chunks = backends.stream("hi", deadline=5)
+    next(chunks)
+    chunks.close()
+    time.sleep(0.3)
+
+    assert (steady.calls, steady.failures) == (1, 0)
@@ -0,0 +1,61 @@
+import os
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")   # no sound card needed
+
+import numpy as np
+import pytest
+
+import extensions.essentials.barge_in as barge_in
+from extensions.fakes.fake_audio import voiced
+
+REFERENCE = 1000.0      # playback level the gate compares against
+
+
+def frame(rms: float, seed: int = 1) -> bytes:
+    """One 30 ms frame of speech-like sound at the given RMS level."""
+    samples = voiced(0.03, level=3000, seed=seed)
+    samples *= rms / np.sqrt(np.mean(samples * samples))
+    return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    monkeypatch.setattr(barge_in, "expected_echo", lambda start, end: REFERENCE)
+    return barge_in.EchoGate(noise_floor=60.0)
+
+
+def test_echo_only_frames_teach_the_coupling(gate):
+    echo = 0.4 * REFERENCE
+    for i in range(40):
+        assert not gate.is_speech(frame(echo, seed=i), 0.0, 0.03)
+    assert gate.coupling == pytest.approx(0.4, abs=0.05)
+
+
+def test_soft_user_speech_does_not_raise_the_coupling(gate):
+    # Louder than echo at the current estimate but under ECHO_MARGIN: ambiguous, not learned from
+    soft = 1.6 * barge_in.INITIAL_COUPLING * REFERENCE
+    for i in range(40):
+        assert not gate.is_speech(frame(soft, seed=i), 0.0, 0.03)
+    assert gate.coupling == barge_in.INITIAL_COUPLING
+
+
+def test_user_is_heard_once_the_echo_is_learned(gate):
+    for i in range(40):
+        gate.is_speech(frame(0.4 * REFERENCE, seed=i), 0.0, 0.03)
+    assert gate.is_speech(frame(1.6 * REFERENCE, seed=99), 0.0, 0.03)
+
+
+def test_every_reply_starts_from_the_initial_coupling(gate):
+    for i in range(40):
+        gate.is_speech(frame(0.4 * REFERENCE, seed=i), 0.0, 0.03)
+    assert barge_in.EchoGate(noise_floor=60.0).coupling == barge_in.INITIAL_COUPLING
+
+
+def test_talking_over_the_reply_stops_it_quickly_and_echo_alone_does_not():
+    # Plays a fixture reply while the fake microphone hears its echo, with and without the user
+    results = barge_in.benchmark(trials=1)
+
+    gated = results["echo_gate"]
+    assert gated["missed"] == 0
+    assert gated["false_stops"] == 0
+    assert gated["max_stop_ms"] < 300
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+import extensions.essentials.brain as brain
+import extensions.essentials.backends as backends
+import extensions.actions.register as rg
+from extensions.fakes.fake_llm import FakeClient, reply_for
+
+TOOLS = "function music(action: str) -> str"
+
+
+@pytest.fixture
+def client():
+    # A reply followed by a long tail of trailing tokens, as models tend to send
+    client = FakeClient(reply_for("music", {"action": "next"}, trailing="\n" + " " * 200),
+                        chunk_size=8, first_delay=0.05, delay=0.01)
+    backends.configure([backends.GeminiBackend(client=client)])
+    yield client
+    backends.configure([])
+    brain.set_warmer(None)
+
+
+def test_stream_returns_the_decision_before_the_reply_ends(client):
+    total_chunks = -(-len(client.reply) // client.chunk_size)
+
+    decision = brain.think("next song", TOOLS, stream=True)
+
+    assert decision == {"function_name": "music", "args": {"action": "next"}}
+    assert client.sent_chunks < total_chunks / 2
+
+
+def test_stream_and_full_reply_agree(client):
+    assert brain.think("next song", TOOLS, stream=True) == brain.think("next song", TOOLS, stream=False)
+
+
+def test_warmer_gets_the_function_name_while_args_stream(client):
+    warmed = []
+    brain.set_warmer(warmed.append)
+
+    brain.think("next song", TOOLS, stream=True)
+
+    end = time.monotonic() + 1
+    while not warmed and time.monotonic() < end:
+        time.sleep(0.01)
+    assert warmed == ["music"]
+
+
+def test_nothing_is_warmed_without_a_warmer(client, monkeypatch):
+    monkeypatch.setattr(brain, "_warm_action", lambda name: pytest.fail("warmed without a warmer"))
+    brain.think("next song", TOOLS, stream=True)
+
+
+def test_register_warm_ignores_names_outside_the_register():
+    functions = {"calculator": rg.LazyAction("calculator")}
+
+    assert rg.warm("subprocess", functions) is False
+    assert rg.warm("calculator", functions) is True
+    assert functions["calculator"].loaded
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+import extensions.essentials.capture as capture
+import extensions.essentials.ears as ears
+from extensions.fakes.fake_audio import WavSource, noise, synthetic_utterance, write_wav
+
+SPEED = 4.0     # fixture playback runs faster than real time
+
+
+@pytest.fixture
+def utterance(tmp_path):
+    return write_wav(str(tmp_path / "utterance.wav"), synthetic_utterance(lead=1.5, speech=1.2, tail=1.0))
+
+
+def test_noise_floor_is_calibrated_once_from_the_room(utterance):
+    source = WavSource(utterance, speed=SPEED)
+    service = capture.CaptureService(source).start()
+    try:
+        calibration_frames = round(capture.CALIBRATION_SECONDS / service.frame_seconds)
+        # start() returns once the first second is measured; the reader thread only then begins
+        assert calibration_frames <= source.reads <= calibration_frames + 2
+        # The fixture room noise has an RMS of about 60
+        assert 30 < service.noise_floor < 120
+        assert service.threshold == max(capture.MIN_THRESHOLD, service.noise_floor * capture.SPEECH_RATIO)
+    finally:
+        service.stop()
+
+
+def test_endpoint_cuts_the_phrase_from_the_stream(utterance):
+    service = capture.CaptureService(WavSource(utterance, speed=SPEED)).start()
+    try:
+        audio = ears.endpoint(service, timeout=5)
+    finally:
+        service.stop()
+
+    assert audio is not None
+    seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    # 1.2 s of speech plus the endpointer's padding, without the surrounding noise
+    assert 1.0 < seconds < 2.2
+
+
+def test_ring_buffer_keeps_only_the_latest_audio(tmp_path):
+    path = write_wav(str(tmp_path / "room.wav"), noise(3.0).astype("int16"))
+    service = capture.CaptureService(WavSource(path, realtime=False), buffer_seconds=0.3).start()
+    try:
+        end = time.monotonic() + 2
+        while service.next_index < 50 and time.monotonic() < end:
+            time.sleep(0.01)
+        newest = service.next_index
+        kept = service.before(newest, newest)
+    finally:
+        service.stop()
+
+    assert newest >= 50
+    assert len(kept) == round(0.3 / service.frame_seconds)
+    assert service.stats["dropped"] > 0
+    assert service.timestamp(0) is None
+
+
+def test_no_speech_times_out(tmp_path):
+    path = write_wav(str(tmp_path / "room.wav"), noise(2.0).astype("int16"))
+    service = capture.CaptureService(WavSource(path, speed=SPEED)).start()
+    try:
+        assert ears.endpoint(service, timeout=0.3) is None
+    finally:
+        service.stop()
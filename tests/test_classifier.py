@@ -0,0 +1,92 @@
+import pytest
+
+import extensions.essentials.classifier as classifier
+import extensions.essentials.manifest as manifest
+
+APPS = ["chrome", "spotify", "notepad", "vs code", "discord", "steam", "zoom", "slack"]
+REMINDERS = [("drink water", 20), ("stretch", 10), ("call mom", 5), ("check the oven", 15),
+             ("take a break", 30), ("feed the cat", 45)]
+MUSIC = [("next", ["next song", "skip this track", "play the next song"]),
+         ("pause", ["pause the music", "pause song", "stop playing for a sec"])]
+
+
+def records() -> list:
+    result = []
+    for app in APPS:
+        result.append({"text": f"open {app}", "function_name": "open_app", "args": {"app_name": app}})
+        result.append({"text": f"please launch {app}", "function_name": "open_app", "args": {"app_name": app}})
+    for message, minutes in REMINDERS:
+        result.append({"text": f"remind me to {message} in {minutes} minutes", "function_name": "reminder",
+                       "args": {"action": "set", "message": message, "minutes": minutes}})
+    for action, phrases in MUSIC:
+        result += [{"text": phrase, "function_name": "music", "args": {"action": action}} for phrase in phrases]
+    return result
+
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    patch = pytest.MonkeyPatch()
+    patch.setattr(classifier, "MODEL_FILE", str(tmp_path_factory.mktemp("classifier") / "intent_model.npz"))
+    result = classifier.train(records(), manifest.build())
+    yield result
+    classifier._state["model"] = {}
+    patch.undo()
+
+
+def test_training_learns_every_intent(model):
+    assert model["accuracy"] == 1.0
+    assert sorted(model["answerable"]) == ["music", "open_app", "reminder"]
+
+
+@pytest.mark.parametrize("utterance, decision", [
+    ("open firefox", {"function_name": "open_app", "args": {"app_name": "firefox"}}),
+    ("remind me to water the plants in 25 minutes",
+     {"function_name": "reminder", "args": {"action": "set", "message": "water the plants", "minutes": 25}}),
+    ("skip this song", {"function_name": "music", "args": {"action": "next"}}),
+])
+def test_slots_are_filled_for_unseen_values(model, utterance, decision):
+    assert classifier.predict(utterance) == decision
+
+
+def test_missing_required_slot_defers_to_the_llm(model):
+    assert classifier.predict("remind me to water the plants") is None
+
+
+def test_unfamiliar_request_defers_to_the_llm(model):
+    assert classifier.predict("what's the weather like tomorrow") is None
+
+
+def test_alternatives_are_tried_and_counted_once(model):
+    inferences = classifier.stats["inferences"]
+
+    decision = classifier.predict("remind me to water the plants", alternatives=["open firefox"])
+
+    assert decision == {"function_name": "open_app", "args": {"app_name": "firefox"}}
+    assert classifier.stats["inferences"] == inferences + 1
+
+
+def test_models_without_required_slots_treat_every_slot_as_required(model):
+    loaded = classifier._state["model"]
+    meta = {key: value for key, value in loaded["meta"].items() if key != "required"}
+    old = {**loaded, "meta": meta}
+
+    assert classifier._predict(old, "open firefox", classifier.THRESHOLD) is not None
+    assert classifier._predict(old, "remind me to water the plants", classifier.THRESHOLD) is None
+
+
+def test_missing_model_file_leaves_the_classifier_off(tmp_path):
+    saved = classifier._state["model"]
+    try:
+        assert not classifier.load(str(tmp_path / "missing.npz"))
+        assert classifier.predict("open firefox") is None
+    finally:
+        classifier._state["model"] = saved
+
+
+def test_log_round_trip_skips_failed_parses(tmp_path, monkeypatch):
+    monkeypatch.setattr(classifier, "LOG_FILE", str(tmp_path / "brain_log.jsonl"))
+
+    classifier.log("open chrome", {"function_name": "open_app", "args": {"app_name": "chrome"}})
+    classifier.log("gibberish", {"function_name": "error", "args": {}})
+
+    assert classifier.read_log() == [{"text": "open chrome", "function_name": "open_app", "args": {"app_name": "chrome"}}]
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+import extensions.essentials.executor as executor
+import extensions.essentials.daemon_client as daemon_client
+from extensions.essentials.daemon import Daemon
+
+
+def handler(text: str, alternatives: list = None, speak: bool = False, client: str = "default") -> dict:
+    if text == "unknown":
+        raise ValueError("Function 'unknown' not found in the register.")
+    return {"text": text, "client": client, "results": [{"ok": True, "value": text}], "message": text}
+
+
+@pytest.fixture
+def server():
+    server = Daemon(handler, port=0).start()
+    yield server
+    server.stop()
+
+
+def test_command_round_trip(server):
+    reply = daemon_client.send("check battery", url=server.url, client="script")
+
+    assert reply["message"] == "check battery"
+    assert reply["client"] == "script"
+    assert daemon_client.health(server.url)["requests"] == 1
+
+
+def test_bad_body_is_400(server):
+    with pytest.raises(RuntimeError, match="answered 400"):
+        daemon_client.send("   ", url=server.url)
+
+
+def test_handler_value_error_is_500(server):
+    with pytest.raises(RuntimeError, match="answered 500"):
+        daemon_client.send("unknown", url=server.url)
+    assert server.report()["errors"] == 1
+
+
+def test_cancel_only_reaches_the_owners_jobs():
+    def slow():
+        for _ in range(100):
+            time.sleep(0.02)
+            executor.check()
+        return "done"
+
+    mine = executor.submit("slow", slow, {}, owner="daemon:a")
+    theirs = executor.submit("slow", slow, {}, owner="daemon:b")
+    try:
+        assert executor.cancel(owner="daemon:a") == [mine]
+        assert mine.state == "cancelled"
+        assert not theirs.future.done()
+    finally:
+        executor.cancel(theirs)
@@ -0,0 +1,92 @@
+import json
+import time
+
+import pytest
+
+import extensions.essentials.brain as brain
+import extensions.essentials.decision_cache as decision_cache
+
+TOOLS = "function music(action: str) -> None\nfunction tell_time() -> None"
+NEXT = {"function_name": "music", "args": {"action": "next"}}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(decision_cache, "CACHE_FILE", str(tmp_path / "decision_cache.json"))
+    decision_cache.clear()
+    yield decision_cache
+    decision_cache.clear()
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    asked = []
+
+    def think(user_input, tools_definations, response_schema=None, alternatives=None):
+        asked.append((user_input, tools_definations))
+        return NEXT
+
+    monkeypatch.setattr(brain, "think", think)
+    return asked
+
+
+def test_normalize_drops_only_filler_words():
+    assert decision_cache.normalize("Hey, um, please SKIP the song!") == "skip the song"
+    assert decision_cache.normalize("remind me to call you") == "remind me to call you"
+    assert decision_cache.normalize("okay please") == "okay please"
+
+
+def test_repeated_command_is_answered_without_the_llm(cache, llm):
+    assert cache.think("Skip the song", TOOLS) == NEXT
+    assert cache.think("please, skip the song!", TOOLS) == NEXT
+
+    assert len(llm) == 1
+
+
+def test_shortlist_and_full_manifest_share_one_entry(cache, llm):
+    cache.think("skip the song", "function music(action: str) -> None", all_tools_definations=TOOLS)
+
+    assert cache.get("skip the song", TOOLS) == NEXT
+    assert llm == [("skip the song", "function music(action: str) -> None")]
+
+
+def test_any_manifest_change_invalidates_the_entry(cache, llm):
+    cache.think("skip the song", TOOLS)
+    cache.think("skip the song", TOOLS + "\nfunction screenshot() -> None")
+
+    assert len(llm) == 2
+
+
+def test_entries_expire_after_the_ttl(cache, monkeypatch):
+    cache.put("skip the song", TOOLS, NEXT)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + cache.TTL_SECONDS + 1)
+
+    assert cache.get("skip the song", TOOLS) is None
+
+
+def test_least_recently_used_entry_is_evicted(cache, monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 2)
+    cache.put("one", TOOLS, NEXT)
+    cache.put("two", TOOLS, NEXT)
+    cache.get("one", TOOLS)
+    cache.put("three", TOOLS, NEXT)
+
+    assert cache.get("two", TOOLS) is None
+    assert cache.get("one", TOOLS) == NEXT
+
+
+def test_talk_answers_are_not_cached(cache):
+    assert not cache.put("tell me a joke", TOOLS, {"function_name": "talk", "args": {"text": "..."}})
+
+
+def test_flush_persists_and_a_fresh_process_reloads(cache):
+    cache.put("skip the song", TOOLS, NEXT)
+    cache.flush()
+
+    with open(cache.CACHE_FILE, encoding="utf-8") as f:
+        assert [entry["decision"] for entry in json.load(f).values()] == [NEXT]
+
+    cache._entries.clear()
+    cache._state["loaded"] = False
+    assert cache.get("skip the song", TOOLS) == NEXT
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import extensions.essentials.ears as ears
+from extensions.fakes.fake_audio import FRAME_SAMPLES, SAMPLE_RATE, noise, synthetic_command, voiced
+
+FRAME_SECONDS = FRAME_SAMPLES / SAMPLE_RATE
+
+
+def frames(samples) -> list:
+    pcm = np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+    size = FRAME_SAMPLES * 2
+    return [pcm[i:i + size] for i in range(0, len(pcm) - size + 1, size)]
+
+
+def run(samples, noise_floor: float = 60.0) -> ears.Endpointer:
+    endpointer = ears.Endpointer(noise_floor, FRAME_SECONDS)
+    for frame in frames(samples):
+        if endpointer.push(frame):
+            break
+    return endpointer
+
+
+def test_silence_never_opens_a_phrase():
+    endpointer = run(noise(2.0))
+
+    assert endpointer.start is None
+    assert endpointer.audio() == b""
+
+
+def test_a_click_does_not_open_a_phrase():
+    click = np.concatenate([noise(0.5), voiced(FRAME_SECONDS), noise(1.0, seed=3)])
+
+    assert run(click).start is None
+
+
+def test_short_command_ends_after_the_minimum_pause():
+    samples = np.concatenate([noise(0.5), voiced(0.6), noise(2.0, seed=2)])
+
+    endpointer = run(samples)
+
+    assert endpointer.ended
+    speech_end = 1.1
+    decided = endpointer.count * FRAME_SECONDS
+    assert decided - speech_end < ears.MIN_PAUSE_SECONDS + 0.1
+
+
+def test_pauses_between_words_do_not_end_the_phrase():
+    gap = 0.3
+    samples = np.concatenate([noise(0.5), voiced(0.4), noise(gap, seed=2), voiced(0.4, seed=3), noise(2.0, seed=4)])
+
+    endpointer = run(samples)
+
+    assert endpointer.ended
+    # Both words were kept, and the end pause grew with the gap between them
+    assert endpointer.last_speech * FRAME_SECONDS > 1.5
+    assert endpointer.pause_frames() > round(ears.MIN_PAUSE_SECONDS / FRAME_SECONDS)
+
+
+def test_audio_is_trimmed_to_the_padding():
+    samples = np.concatenate([noise(1.0), voiced(0.6), noise(2.0, seed=2)])
+
+    endpointer = run(samples)
+
+    seconds = len(endpointer.audio()) / (SAMPLE_RATE * 2)
+    assert 0.6 <= seconds <= 0.6 + 2 * ears.PAD_SECONDS + 2 * FRAME_SECONDS
+    assert len(endpointer.received()) > len(endpointer.audio())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_speech_is_never_clipped(seed):
+    samples, (speech_start, speech_end) = synthetic_command(words=1 + seed, seed=seed)
+
+    endpointer = run(samples)
+
+    kept_start = max(0, endpointer.start - endpointer.pad) * FRAME_SECONDS
+    kept_end = (endpointer.last_speech + endpointer.pad + 1) * FRAME_SECONDS
+    assert kept_start <= speech_start + FRAME_SECONDS
+    assert kept_end >= speech_end - FRAME_SECONDS
+
+
+def test_adaptive_pause_answers_sooner_than_a_fixed_one(tmp_path):
+    from extensions.fakes.fake_audio import write_corpus
+
+    results = ears.benchmark(write_corpus(str(tmp_path / "corpus"), count=12))
+
+    assert results["adaptive"]["p50_latency_ms"] < results["fixed"]["p50_latency_ms"]
+    assert results["adaptive"]["clipping_rate"] <= results["fixed"]["clipping_rate"]
+    assert results["adaptive"]["kb_sent"] < results["fixed"]["kb_sent"]
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+import extensions.essentials.executor as executor
+from extensions.fakes import fake_actions
+
+
+@pytest.fixture(autouse=True)
+def actions():
+    executor.configure({
+        "wait": {"executor": "thread", "deadline": 5.0},
+        "hang": {"executor": "thread", "deadline": 0.2},
+        "scan": {"executor": "thread", "deadline": 30.0},
+        "runaway": {"executor": "process", "deadline": 0.5},
+    })
+    yield
+    executor.cancel()
+
+
+def test_call_returns_the_action_result():
+    assert executor.call("wait", fake_actions.wait, {"seconds": 0.01}) == "Waited 0.01 s"
+
+
+def test_action_errors_reach_the_caller():
+    def broken():
+        raise ValueError("bad input")
+
+    job = executor.submit("wait", broken, {})
+
+    with pytest.raises(ValueError, match="bad input"):
+        job.future.result()
+    assert job.state == "failed"
+
+
+def test_waits_run_side_by_side():
+    start = time.perf_counter()
+    jobs = [executor.submit("wait", fake_actions.wait, {"seconds": 0.3}) for _ in range(4)]
+    for job in jobs:
+        job.future.result()
+
+    assert time.perf_counter() - start < 0.9
+    assert all(job.state == "done" for job in jobs)
+
+
+def test_deadline_fails_the_job_without_waiting_for_it():
+    job = executor.submit("hang", fake_actions.wait, {"seconds": 1.0})
+
+    start = time.perf_counter()
+    with pytest.raises(executor.DeadlineExceeded):
+        job.future.result()
+
+    assert time.perf_counter() - start < 0.6
+    assert job.state == "timed_out"
+    assert job not in executor.active()
+
+
+def test_process_job_past_its_deadline_is_terminated():
+    job = executor.submit("runaway", fake_actions.crunch, {"n": 10 ** 12})
+
+    with pytest.raises(executor.DeadlineExceeded):
+        job.future.result(timeout=5)
+
+    assert job.state == "timed_out"
+    assert executor._pools["process"] is None
+
+
+def test_cancel_stops_a_running_scan_at_its_next_check():
+    job = executor.submit("scan", fake_actions.scan, {"steps": 10 ** 6})
+    while not fake_actions.progress["scan"]:
+        time.sleep(0.001)
+
+    assert executor.cancel() == [job]
+    with pytest.raises(executor.Cancelled):
+        job.future.result()
+    deadline = time.monotonic() + 1.0
+    while fake_actions.progress["running"] and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert not fake_actions.progress["running"]
+    assert job.state == "cancelled"
+
+
+def test_cancelled_queued_job_never_starts():
+    blockers = [executor.submit("wait", fake_actions.wait, {"seconds": 0.3}) for _ in range(executor.THREAD_WORKERS)]
+    started = []
+    queued = executor.submit("wait", lambda: started.append(1), {})
+    assert queued.state == "queued"
+
+    executor.cancel(queued)
+    for job in blockers:
+        job.future.result()
+    time.sleep(0.05)
+
+    assert queued.state == "cancelled"
+    assert queued.started is None
+    assert not started
+
+
+def test_cancel_skips_jobs_that_already_finished():
+    job = executor.submit("wait", fake_actions.wait, {"seconds": 0.01})
+    job.future.result()
+
+    assert executor.cancel(job) == []
+    assert job.state == "done"
+
+
+def test_on_done_sees_the_settled_job():
+    seen = []
+    job = executor.submit("wait", fake_actions.wait, {"seconds": 0.01}, on_done=lambda j: seen.append(j.state))
+    job.future.result()
+    time.sleep(0.01)
+
+    assert seen == ["done"]
+
+
+def test_metrics_count_finished_jobs():
+    before = executor.metrics()
+    executor.call("wait", fake_actions.wait, {"seconds": 0.01})
+    after = executor.metrics()
+
+    assert after["submitted"] == before["submitted"] + 1
+    assert after["done"] == before["done"] + 1
+    assert after["run_p50_ms"] is not None
+    assert after["queued"]["thread"] == 0
@@ -0,0 +1,44 @@
+import time
+
+from extensions.essentials.health import Monitored, percentile, percentile_ms
+
+
+def test_percentile_is_nearest_rank():
+    samples = [0.5, 0.1, 0.3, 0.2, 0.4]
+
+    assert percentile(samples, 50) == 0.3
+    assert percentile(samples, 95) == 0.5
+    assert percentile([], 50) is None
+    assert percentile_ms(samples, 50) == 300
+    assert percentile_ms([0.0123456], 50, 2) == 12.35
+
+
+def test_breaker_opens_after_threshold_and_closes_after_cooldown():
+    backend = Monitored("flaky", threshold=2, cooldown=0.2)
+    backend.record_failure(RuntimeError("1"))
+    assert backend.available()
+    backend.record_failure(RuntimeError("2"), 0.5)
+
+    assert not backend.available()
+    assert backend.summary() == {"calls": 2, "failures": 2, "p50_ms": 500, "p95_ms": 500, "open": True}
+    time.sleep(0.25)
+    assert backend.available()
+
+
+def test_success_resets_the_failure_streak():
+    backend = Monitored("steady", threshold=2)
+    backend.record_failure(RuntimeError("1"))
+    backend.record_success(0.1)
+    backend.record_failure(RuntimeError("2"))
+
+    assert backend.available()
+    assert backend.consecutive_failures == 1
+
+
+def test_without_threshold_there_is_no_breaker():
+    backend = Monitored("recognizer")
+    for _ in range(10):
+        backend.record_failure(RuntimeError("down"))
+
+    assert backend.available()
+    assert "open" not in backend.summary()
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import extensions.essentials.hot_reload as hot_reload
+import extensions.actions.register as rg
+from extensions.essentials.hot_reload import ACTION_V1, COUNTER
+
+
+@pytest.fixture
+def actions(tmp_path, monkeypatch):
+    """A scratch actions directory polled by hand: a change applies on the poll after it settled."""
+    monkeypatch.setitem(hot_reload._state, "actions_dir", str(tmp_path))
+    monkeypatch.setitem(hot_reload._state, "snapshot", {})
+    monkeypatch.setitem(hot_reload._state, "pending", {})
+    tool_manifest, functions = {}, {}
+
+    def write(name: str, source: str) -> None:
+        (tmp_path / f"{name}.py").write_text(source, encoding="utf-8")
+
+    def poll(on_change=None):
+        hot_reload.poll(tool_manifest, functions, on_change)
+        return hot_reload.poll(tool_manifest, functions, on_change)
+
+    yield write, poll, tool_manifest, functions, tmp_path
+    for name in list(tool_manifest):
+        rg.forget(name, functions)
+
+
+def test_new_action_is_registered(actions):
+    write, poll, tool_manifest, functions, _ = actions
+    changes = []
+    write("ping", ACTION_V1)
+
+    assert poll(changes.append)["added"] == ["ping"]
+    assert functions["ping"]() == "pong v1"
+    assert "ping" in tool_manifest
+    assert changes[0]["added"] == ["ping"]
+
+
+def test_file_still_being_written_is_not_imported(actions):
+    write, _, _, functions, _ = actions
+    write("ping", ACTION_V1)
+
+    assert hot_reload.poll({}, functions) is None
+    assert "ping" not in functions
+
+
+def test_edit_replaces_the_function_and_keeps_the_neighbours_state(actions):
+    write, poll, _, functions, _ = actions
+    write("ping", ACTION_V1)
+    write("counter", COUNTER)
+    poll()
+    proxy = functions["ping"]
+    functions["counter"]()
+
+    write("ping", ACTION_V1.replace("pong v1", "pong v2 (edited)"))
+
+    assert poll()["changed"] == ["ping"]
+    assert functions["ping"] is proxy
+    assert functions["ping"]() == "pong v2 (edited)"
+    assert functions["counter"]() == "2"
+
+
+def test_broken_edit_keeps_the_last_good_version(actions):
+    write, poll, tool_manifest, functions, _ = actions
+    write("ping", ACTION_V1)
+    poll()
+
+    write("ping", ACTION_V1.replace("def ping() -> str:", "def ping( -> str:"))
+
+    assert poll()["failed"] == ["ping"]
+    assert functions["ping"]() == "pong v1"
+    assert "ping" in tool_manifest
+
+
+def test_deleted_action_is_forgotten(actions):
+    write, poll, tool_manifest, functions, tmp_path = actions
+    write("ping", ACTION_V1)
+    poll()
+
+    os.remove(tmp_path / "ping.py")
+
+    assert poll()["removed"] == ["ping"]
+    assert "ping" not in functions
+    assert "ping" not in tool_manifest
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+import extensions.essentials.manifest as manifest
+
+ACTION = '''
+defination = """
+function greet(name: str, times: int = 1) -> str:
+
+arguments:
+- name: Who to greet, e.g. "Ada"
+- mood: One of: "warm", "formal"
+"""
+
+EXECUTOR = "process"
+DEADLINE = 2.5
+CACHE = {"ttl": 60}
+
+raise RuntimeError("action modules must not be executed")
+
+def greet(name: str, mood: str = "warm", times: int = 1):
+    return f"Hello {name}"
+'''
+
+
+@pytest.fixture
+def actions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_FILE", str(tmp_path / "tool_manifest.json"))
+    actions = tmp_path / "actions"
+    actions.mkdir()
+    (actions / "greet.py").write_text(ACTION, encoding="utf-8")
+    (actions / "register.py").write_text("raise RuntimeError", encoding="utf-8")
+    (actions / "helpers.py").write_text('defination = "function helpers() -> None"\n', encoding="utf-8")
+    return actions
+
+
+def test_entry_is_read_without_executing_the_module(actions_dir):
+    entry = manifest.build(str(actions_dir))["greet"]
+
+    assert entry["function"]
+    assert entry["params"] == [
+        {"name": "name", "type": "str", "required": True},
+        {"name": "mood", "type": "str", "required": False, "default": "warm"},
+        {"name": "times", "type": "int", "required": False, "default": 1},
+    ]
+    # Example values are not a closed list of choices
+    assert entry["choices"] == {"mood": ["warm", "formal"]}
+    assert (entry["executor"], entry["deadline"], entry["cache"]) == ("process", 2.5, {"ttl": 60})
+
+
+def test_infrastructure_and_function_less_files(actions_dir):
+    tool_manifest = manifest.build(str(actions_dir))
+
+    assert "register" not in tool_manifest
+    assert not tool_manifest["helpers"]["function"]
+    assert manifest.descriptions(tool_manifest).startswith("function greet(")
+
+
+def test_unchanged_files_come_from_the_cache(actions_dir, monkeypatch):
+    manifest.build(str(actions_dir))
+    parsed = []
+    read_module = manifest._read_module
+    monkeypatch.setattr(manifest, "_read_module", lambda path, name: parsed.append(name) or read_module(path, name))
+
+    manifest.build(str(actions_dir))
+    assert parsed == []
+
+    greet = actions_dir / "greet.py"
+    greet.write_text(ACTION.replace("times: int = 1", "times: int = 2"), encoding="utf-8")
+    os.utime(greet, ns=(greet.stat().st_atime_ns, greet.stat().st_mtime_ns + 10**9))
+    assert manifest.build(str(actions_dir))["greet"]["params"][2]["default"] == 2
+    assert parsed == ["greet"]
+
+
+def test_unparsable_file_is_skipped_with_a_warning(actions_dir, capsys):
+    (actions_dir / "broken.py").write_text("def broken(:\n", encoding="utf-8")
+
+    tool_manifest = manifest.build(str(actions_dir))
+
+    assert "broken" not in tool_manifest
+    assert "Could not read broken.py" in capsys.readouterr().out
+
+
+def test_every_shipped_action_has_a_defination_and_entry_function():
+    for name, entry in manifest.build().items():
+        assert entry["defination"], name
+        assert entry["function"], name
@@ -0,0 +1,82 @@
+import os
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")   # no sound card needed
+
+import time
+import asyncio
+
+import pytest
+
+import extensions.essentials.mouth as mouth
+import extensions.essentials.tts as tts
+import extensions.essentials.tts_cache as tts_cache
+from extensions.fakes.fake_tts import SAMPLE_CLIP, make_communicate
+
+REPLY = ("Here is the weather for today. It will be sunny in the morning with a light breeze. "
+         "Clouds move in after lunch and there is a small chance of rain in the evening. "
+         "Tomorrow looks much the same, with a little more wind.")
+
+
+@pytest.fixture
+def voice(tmp_path):
+    tts_cache.reset(str(tmp_path / "tts_cache"))
+
+    def configure(**kwargs):
+        communicate = make_communicate(**kwargs)
+        tts.configure([tts.EdgeBackend(communicate)])
+        return communicate
+
+    yield configure
+    mouth.interrupt()
+    mouth.wait_idle()
+    tts.configure([])
+    tts_cache.reset()
+
+
+def test_short_sentences_are_merged():
+    assert mouth.split_sentences("Hi. OK. This sentence is long enough to stand alone. Bye.") == [
+        "Hi. OK. This sentence is long enough to stand alone.", "Bye."]
+
+
+def test_segments_are_cut_on_mp3_frame_boundaries():
+    with open(SAMPLE_CLIP, "rb") as f:
+        clip = f.read()
+
+    cut = mouth._complete_frames(clip[:1000])
+
+    assert 0 < cut < 1000
+    assert mouth._complete_frames(clip[:cut]) == cut
+    assert mouth._complete_frames(clip) == len(clip)
+
+
+def test_playback_starts_before_the_reply_is_synthesized(voice):
+    communicate = voice(first_delay=0.1, chunk_delay=0.02)
+    start = time.perf_counter()
+    asyncio.run(communicate(REPLY).save(os.devnull))
+    whole_ms = (time.perf_counter() - start) * 1000
+
+    mouth.stats["segments"] = 0
+    mouth.say(REPLY)
+    end = time.monotonic() + 5
+    while mouth.stats["segments"] == 0 and time.monotonic() < end:
+        time.sleep(0.01)
+
+    assert mouth.stats["segments"] > 0
+    assert mouth.stats["first_audio_ms"] < whole_ms / 2
+
+
+def test_interrupt_stops_synthesizing_the_rest_of_the_reply(voice):
+    communicate = voice(first_delay=0.2, chunk_delay=0.002)
+    reply = " ".join(f"This is sentence number {i} of a very long answer." for i in range(8))
+
+    future = mouth.say(reply)
+    end = time.monotonic() + 5
+    while not communicate.requests and time.monotonic() < end:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert mouth.interrupt()
+    assert future.result(timeout=5) is False
+
+    requested = len(communicate.requests)
+    time.sleep(0.6)
+    assert len(communicate.requests) == requested < len(mouth.split_sentences(reply))
@@ -0,0 +1,54 @@
+import pytest
+
+import extensions.essentials.normalize as normalize
+
+
+@pytest.mark.parametrize("text, spoken", [
+    ("CPU at 45%", "CPU at forty-five percent"),
+    ("Used 3.5 GB of RAM", "Used three point five gigabytes of RAM"),
+    ("Wait 1 min", "Wait one minute"),
+    ("-1,250.75", "minus one thousand, two hundred and fifty point seven five"),
+    ("It is 10:30 PM.", "It is ten thirty PM."),
+    ("7:05 am", "seven oh five AM"),
+    ("Meeting on 2024-03-05 14:00", "Meeting on March fifth, twenty twenty-four at two PM"),
+    ("You are 1st", "You are first"),
+    ("20°C", "twenty degrees Celsius"),
+    ("2 + 3 = 5", "two plus three equals five"),
+    ("12x3", "twelve times three"),
+    ("12 x 3", "twelve times three"),
+    ("2^8", "two to the power of eight"),
+    ("Room #4", "Room number four"),
+    ("Line one\nLine two", "Line one. Line two"),
+])
+def test_text_is_spoken_naturally(text, spoken):
+    assert normalize.normalize(text) == spoken
+
+
+@pytest.mark.parametrize("text", ["Version v2.0", "an mp3 file", "COVID19", "no numbers here"])
+def test_digits_inside_words_are_left_alone(text):
+    assert normalize.normalize(text) == text
+
+
+def test_action_outputs_read_as_sentences():
+    spoken = normalize.normalize(normalize.SAMPLES[3])
+
+    assert spoken == ("CPU Usage: three point one percent, Cores: sixteen. RAM: eleven point two gigabytes "
+                      "used / thirty-one point nine gigabytes total (thirty-five point one percent). "
+                      "Battery: one hundred percent, Charging")
+
+
+def test_every_sample_is_free_of_digits():
+    for sample in normalize.SAMPLES:
+        assert not any(ch.isdigit() for ch in normalize.normalize(sample)), sample
+
+
+def test_repeated_text_and_numbers_are_memoized():
+    normalize.normalize.cache_clear()
+    normalize.number_to_words.cache_clear()
+
+    normalize.normalize("RAM: 7.83GB used")
+    normalize.normalize("RAM: 7.83GB used")
+    normalize.normalize("Disk: 7.83GB free")
+
+    assert normalize.normalize.cache_info().hits == 1
+    assert normalize.number_to_words.cache_info().hits == 1
@@ -0,0 +1,89 @@
+import time
+import threading
+
+import extensions.essentials.plan as plan
+
+
+def test_as_calls_accepts_single_and_compound_decisions():
+    assert plan.as_calls({"function_name": "music", "args": {"action": "next"}}) == [
+        {"function_name": "music", "args": {"action": "next"}, "depends_on": []}]
+
+    calls = plan.as_calls({"calls": [
+        {"function_name": "screenshot"},
+        {"function_name": "open_folder", "args": {"path": "pictures"}, "depends_on": [0, "x"]},
+        "junk",
+    ]})
+    assert [call["function_name"] for call in calls] == ["screenshot", "open_folder"]
+    assert calls[0]["args"] == {}
+    assert calls[1]["depends_on"] == [0]
+
+
+def test_compile_plan_groups_independent_calls_into_waves():
+    calls = [{"depends_on": []}, {"depends_on": [0]}, {"depends_on": []}, {"depends_on": [1, 2]}]
+
+    assert plan.compile_plan(calls) == [[0, 2], [1], [3]]
+
+
+def test_compile_plan_ignores_unknown_indices_and_breaks_cycles():
+    assert plan.compile_plan([{"depends_on": [7, 0]}, {"depends_on": [-1]}]) == [[0, 1]]
+    assert plan.compile_plan([{"depends_on": [1]}, {"depends_on": [0]}]) == [[0], [1]]
+
+
+def test_independent_calls_run_concurrently():
+    calls = plan.as_calls({"calls": [{"function_name": "a"}, {"function_name": "b"}, {"function_name": "c"}]})
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def call_function(name, args):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return name
+
+    assert plan.run_plan(calls, plan.compile_plan(calls), call_function) == ["a", "b", "c"]
+    assert peak[0] == 3
+
+
+def test_dependent_call_waits_for_its_dependency():
+    calls = plan.as_calls({"calls": [
+        {"function_name": "screenshot"},
+        {"function_name": "open_folder", "depends_on": [0]},
+    ]})
+    finished = []
+
+    def call_function(name, args):
+        time.sleep(0.05 if name == "screenshot" else 0)
+        finished.append(name)
+        return name
+
+    plan.run_plan(calls, plan.compile_plan(calls), call_function)
+    assert finished == ["screenshot", "open_folder"]
+
+
+def test_call_after_a_failed_dependency_is_skipped():
+    calls = plan.as_calls({"calls": [
+        {"function_name": "screenshot"},
+        {"function_name": "open_folder", "depends_on": [0]},
+        {"function_name": "talk", "depends_on": [1]},
+        {"function_name": "tell_time"},
+    ]})
+    ran = []
+
+    def call_function(name, args):
+        ran.append(name)
+        if name == "screenshot":
+            raise OSError("no display")
+        return "It is noon"
+
+    results = plan.run_plan(calls, plan.compile_plan(calls), call_function)
+
+    assert sorted(ran) == ["screenshot", "tell_time"]
+    assert isinstance(results[0], OSError)
+    assert isinstance(results[1], plan.Skipped)
+    assert isinstance(results[2], plan.Skipped)
+    assert results[3] == "It is noon"
+    assert plan.summarize(calls, results) == (
+        "screenshot failed: no display. open_folder skipped because screenshot did not succeed. "
+        "talk skipped because open_folder did not succeed. It is noon.")
@@ -0,0 +1,63 @@
+import sys
+import types
+import pickle
+
+import pytest
+
+import extensions.actions.register as rg
+import extensions.essentials.manifest as manifest
+
+
+@pytest.fixture
+def unimported(monkeypatch):
+    """tell_time as if no one had imported it yet."""
+    monkeypatch.delitem(sys.modules, "tell_time", raising=False)
+    return {"tell_time": manifest.build()["tell_time"]}
+
+
+def test_lazy_register_imports_nothing_until_the_first_call(unimported):
+    functions = rg.import_all_from_current_directory(unimported)
+
+    proxy = functions["tell_time"]
+    assert isinstance(proxy, rg.LazyAction)
+    assert not proxy.loaded
+    assert "tell_time" not in sys.modules
+
+    func = proxy.load()
+    assert proxy.loaded
+    assert func is sys.modules["tell_time"].tell_time
+    assert rg.import_ms["tell_time"] > 0
+
+
+def test_eager_register_imports_every_module(unimported):
+    functions = rg.import_all_from_current_directory(unimported, lazy=False)
+
+    assert functions["tell_time"] is sys.modules["tell_time"].tell_time
+
+
+def test_lazy_action_pickles_by_name():
+    proxy = rg.LazyAction("tell_time")
+    proxy.replace(lambda: None)
+
+    copy = pickle.loads(pickle.dumps(proxy))
+
+    assert copy.__name__ == "tell_time"
+    assert not copy.loaded
+
+
+def test_warm_loads_the_action_and_runs_its_hook(monkeypatch):
+    warmed = []
+    module = types.ModuleType("warmable")
+    module.warmable = lambda: "ok"
+    module.warm = lambda: warmed.append(1)
+    monkeypatch.setitem(sys.modules, "warmable", module)
+    proxy = rg.LazyAction("warmable")
+    monkeypatch.setattr(rg, "_load", lambda name: sys.modules[name].warmable)
+
+    assert rg.warm("warmable", {"warmable": proxy})
+    assert proxy.loaded
+    assert warmed == [1]
+
+
+def test_warm_ignores_unregistered_names():
+    assert not rg.warm("missing", {})
@@ -0,0 +1,105 @@
+import os
+import time
+
+import pytest
+
+import extensions.essentials.result_cache as result_cache
+
+calls = []
+
+
+def notes(action: str, content: str = "") -> str:
+    calls.append((action, content))
+    return f"{len(calls)} call(s)"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    notes_file = tmp_path / "notes.json"
+    notes_file.write_text("[]")
+    result_cache.configure({
+        "notes": {"function": None, "cache": {"ttl": 60, "when": {"action": ["list"]},
+                                              "invalidated_by": {"notes": {"action": ["add"]}},
+                                              "files": [str(notes_file)]}},
+        "reminder": {"function": None},
+        "short": {"function": None, "cache": {"ttl": 0.1}},
+    })
+    calls.clear()
+    result_cache.clear()
+    yield notes_file
+    result_cache.clear()
+    result_cache.configure({})
+
+
+def test_only_declared_actions_are_involved(cache):
+    assert result_cache.involved("notes")
+    assert result_cache.involved("short")
+    assert not result_cache.involved("reminder")
+
+
+def test_repeated_call_is_answered_from_the_cache(cache):
+    cached = result_cache.wrap("notes", notes)
+
+    first = cached(action="list")
+    # Defaults and case are folded into the same key
+    assert cached(action=" List ", content="") == first
+    assert len(calls) == 1
+    assert result_cache.report()["notes"]["hit_ratio"] == 0.5
+
+
+def test_calls_outside_when_are_not_cached(cache):
+    cached = result_cache.wrap("notes", notes)
+
+    cached(action="add", content="milk")
+    cached(action="add", content="milk")
+
+    assert len(calls) == 2
+
+
+def test_invalidating_call_drops_the_answer(cache):
+    cached = result_cache.wrap("notes", notes)
+    cached(action="list")
+
+    cached(action="add", content="milk")
+    cached(action="list")
+
+    assert [action for action, _ in calls] == ["list", "add", "list"]
+
+
+def test_answer_expires_after_its_ttl(cache):
+    cached = result_cache.wrap("short", notes)
+    cached(action="list")
+    cached(action="list")
+    assert len(calls) == 1
+
+    time.sleep(0.15)
+    cached(action="list")
+
+    assert len(calls) == 2
+
+
+def test_answer_expires_when_a_watched_file_changes(cache):
+    cached = result_cache.wrap("notes", notes)
+    cached(action="list")
+
+    stat = os.stat(cache)
+    os.utime(cache, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cached(action="list")
+
+    assert len(calls) == 2
+
+
+def test_invalidate_without_args_drops_every_answer(cache):
+    cached = result_cache.wrap("notes", notes)
+    cached(action="list")
+
+    assert result_cache.invalidate("notes") == 1
+    cached(action="list")
+    assert len(calls) == 2
+
+
+def test_process_pool_actions_are_not_cached(capsys):
+    result_cache.configure({"crunch": {"function": None, "executor": "process", "cache": {"ttl": 60}}})
+
+    assert not result_cache.involved("crunch")
+    assert "ignored" in capsys.readouterr().out
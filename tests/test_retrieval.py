@@ -0,0 +1,50 @@
+import pytest
+
+import extensions.essentials.manifest as manifest
+import extensions.essentials.retrieval as retrieval
+
+
+@pytest.fixture(scope="module", autouse=True)
+def index():
+    retrieval.build(manifest.build())
+
+
+def test_tokenize_stems_and_drops_stop_words():
+    assert retrieval.tokenize("Play the songs for me") == ["play", "song"]
+    assert retrieval.tokenize("system_info") == ["system", "info"]
+
+
+@pytest.mark.parametrize("utterance, tool", [
+    ("take a screenshot", "screenshot"),
+    ("remind me to drink water in 20 minutes", "reminder"),
+    ("search google for python tutorials", "google_search"),
+    ("find my resume", "file_search"),
+    ("play some songs", "music"),
+    ("what is 5 plus 5", "calculator"),
+])
+def test_best_matching_tool_comes_first(utterance, tool):
+    assert retrieval.select(utterance)[0] == tool
+
+
+def test_shortlist_is_capped_and_always_offers_talk():
+    names = retrieval.select("open youtube for me", k=2)
+
+    assert names[:2] == ["open_app", "link_open"]
+    assert names[-1] == "talk"
+    assert len(names) == 3
+
+
+def test_tools_that_share_no_term_are_left_out():
+    scores = retrieval.scores("take a screenshot")
+
+    assert retrieval.select("take a screenshot") == ["screenshot", "talk"]
+    assert scores["music"] == 0
+
+
+def test_shortlist_is_much_smaller_than_the_full_manifest():
+    tool_manifest = manifest.build()
+    shortlist = retrieval.select("take a screenshot")
+
+    full = manifest.descriptions(tool_manifest)
+    sent = manifest.descriptions({name: tool_manifest[name] for name in shortlist})
+    assert len(sent) < len(full) / 4
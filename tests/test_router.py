@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+import extensions.essentials.manifest as manifest
+import extensions.essentials.router as router
+
+
+@pytest.fixture(scope="module", autouse=True)
+def grammar():
+    router.build(manifest.build())
+
+
+@pytest.mark.parametrize("utterance, thought", [
+    ("Skip the song.", {"function_name": "music", "args": {"action": "next"}}),
+    ("please play some music", {"function_name": "music", "args": {"action": "play"}}),
+    ("song previous", {"function_name": "music", "args": {"action": "prev"}}),
+    ("How much memory is left?", {"function_name": "system_info", "args": {"query": "ram"}}),
+    ("check all system status", {"function_name": "system_info", "args": {"query": "all"}}),
+    ("minimise this window", {"function_name": "window_control", "args": {"action": "minimize"}}),
+    ("What time is it", {"function_name": "tell_time", "args": {}}),
+    ("what is 12 times 3", {"function_name": "calculator", "args": {"expression": "12 * 3"}}),
+    ("2 to the power of 8", {"function_name": "calculator", "args": {"expression": "2 ** 8"}}),
+    ("square root of 16", {"function_name": "calculator", "args": {"expression": "sqrt(16)"}}),
+])
+def test_common_commands_resolve_locally(utterance, thought):
+    assert router.route(utterance) == thought
+
+
+@pytest.mark.parametrize("utterance", [
+    "play despacito on youtube",
+    "remind me to call mom at 5 pm",
+    "what is the weather like",
+    "shuffle the music",
+])
+def test_anything_else_is_left_to_the_brain(utterance):
+    assert router.route(utterance) is None
+
+
+def test_alternatives_are_tried_when_the_top_transcription_misses():
+    hits, misses = router.stats["hits"], router.stats["misses"]
+
+    assert router.route("skip the thong", ["skip the song"]) == {"function_name": "music", "args": {"action": "next"}}
+    assert router.route("flip the thong", ["flip the song"]) is None
+    # One count per turn, however many alternatives were tried
+    assert (router.stats["hits"], router.stats["misses"]) == (hits + 1, misses + 1)
+
+
+def test_actions_missing_from_the_manifest_are_not_routed():
+    tool_manifest = manifest.build()
+    try:
+        router.build({name: entry for name, entry in tool_manifest.items() if name not in ("music", "calculator")})
+        assert router.route("next song") is None
+        assert router.route("2 plus 2") is None
+        assert router.route("what time is it") == {"function_name": "tell_time", "args": {}}
+    finally:
+        router.build(tool_manifest)
+
+
+def test_rebuilding_never_leaves_a_partial_grammar():
+    tool_manifest = manifest.build()
+    stop, misses = threading.Event(), []
+
+    def rebuild():
+        while not stop.is_set():
+            router.build(tool_manifest)
+
+    thread = threading.Thread(target=rebuild)
+    thread.start()
+    try:
+        for _ in range(2000):
+            if router.route("what time is it") is None:
+                misses.append(1)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert not misses
@@ -0,0 +1,89 @@
+import pytest
+
+import extensions.essentials.routines as routines
+
+WORK_MODE = [
+    {"function_name": "open_app", "args": {"app_name": "vs code"}},
+    {"function_name": "open_folder", "args": {"name": "projects"}},
+    {"function_name": "music", "args": {"action": "play"}},
+    {"function_name": "window_control", "args": {"action": "minimize"}},
+]
+
+
+@pytest.fixture(autouse=True)
+def routines_file(tmp_path, monkeypatch):
+    path = tmp_path / "routines.json"
+    monkeypatch.setattr(routines, "ROUTINES_FILE", str(path))
+    routines.load()
+    yield path
+    routines._recordings.clear()
+
+
+def test_defined_routine_is_compiled_and_saved(routines_file):
+    routine = routines.define("work mode", WORK_MODE)
+
+    # Independent steps share a wave; window_control waits for everything before it
+    assert routine["waves"] == [[0, 1, 2], [3]]
+    assert routine["calls"][3]["depends_on"] == [0, 1, 2]
+
+    routines.load()
+    assert routines.match("Start work mode!")["waves"] == [[0, 1, 2], [3]]
+
+
+def test_hand_written_routine_only_needs_calls(routines_file):
+    routines_file.write_text('{"bedtime": {"triggers": ["good night"], "calls": ['
+                             '{"function_name": "music", "args": {"action": "stop"}},'
+                             '{"function_name": "music", "args": {"action": "play"}}]}}', encoding="utf-8")
+    routines.load()
+
+    routine = routines.match("Good night.")
+    assert routine["waves"] == [[0], [1]]
+    assert routines.match("bedtime") is None
+
+
+def test_only_the_whole_utterance_triggers_a_routine():
+    routines.define("work mode", WORK_MODE)
+
+    assert routines.match("run work mode") is not None
+    assert routines.match("work mode please now") is None
+
+
+def test_run_goes_through_the_plan_without_the_llm():
+    routine = routines.define("work mode", WORK_MODE)
+    called = []
+
+    results = routines.run(routine, lambda name, args: called.append(name) or name)
+
+    assert results == ["open_app", "open_folder", "music", "window_control"]
+    assert called[-1] == "window_control"
+
+
+def test_recording_saves_the_calls_made_in_between():
+    assert routines.command("record routine focus").startswith("Recording routine focus")
+    routines.record([{"function_name": "music", "args": {"action": "pause"}}])
+    routines.record([{"function_name": "talk", "args": {"text": "ok"}}])
+
+    assert routines.command("save routine") == "Saved routine focus with 1 steps. Say start focus to run it."
+    assert not routines.is_recording()
+    assert routines.match("start focus")["calls"][0]["args"] == {"action": "pause"}
+
+
+def test_cancelled_or_empty_recordings_save_nothing():
+    routines.command("record routine focus")
+    assert routines.command("cancel recording") == "Recording cancelled."
+    assert routines.match("focus") is None
+
+    routines.command("record routine focus")
+    assert routines.command("save routine") == "Nothing was recorded for focus."
+
+
+def test_each_owner_records_its_own_routine():
+    routines.command("record routine focus", owner="daemon:a")
+    routines.record([{"function_name": "music", "args": {"action": "pause"}}], owner="daemon:a")
+    routines.record([{"function_name": "screenshot", "args": {}}])
+
+    assert routines.is_recording("daemon:a")
+    assert not routines.is_recording()
+    assert routines.command("save routine") is None
+    routines.command("save routine", owner="daemon:a")
+    assert [call["function_name"] for call in routines.match("focus")["calls"]] == ["music"]
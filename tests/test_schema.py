@@ -0,0 +1,59 @@
+import pytest
+
+import extensions.essentials.manifest as manifest
+import extensions.essentials.schema as schema
+import extensions.essentials.decision_cache as decision_cache
+
+
+@pytest.fixture(scope="module")
+def tool_manifest():
+    tool_manifest = manifest.build()
+    schema.build(tool_manifest)
+    return tool_manifest
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(decision_cache, "CACHE_FILE", str(tmp_path / "decision_cache.json"))
+    decision_cache.clear()
+    yield decision_cache
+    decision_cache.clear()
+
+
+def test_shortlist_schema_still_names_the_other_tools(tool_manifest):
+    shortlist = ["reminder", "music"]
+    response = schema.response_schema(shortlist, others=list(tool_manifest))
+
+    names = response["properties"]["function_name"]["enum"]
+    assert names[:2] == shortlist
+    assert set(names) == {name for name, entry in tool_manifest.items() if entry["function"]}
+    # Only the shortlist sends its full args schema
+    assert len(response["properties"]["args"]["anyOf"]) == len(shortlist) + 1
+
+
+def test_schema_requires_a_call(tool_manifest):
+    response = schema.response_schema(["music"])
+
+    assert {"required": ["function_name", "args"]} in response["anyOf"]
+    assert {"required": ["calls"]} in response["anyOf"]
+    assert response["properties"]["calls"]["minItems"] == 1
+
+
+@pytest.mark.parametrize("decision", [
+    {},
+    {"calls": []},
+    {"args": {"action": "next"}},
+    {"calls": [{"function_name": "music", "args": {}}, {"args": {}}]},
+    {"function_name": "talk", "args": {"text": "hi"}},
+])
+def test_cache_refuses_decisions_without_a_valid_call(cache, decision):
+    assert not cache.put("next song", "tools", decision)
+    assert cache.get("next song", "tools") is None
+
+
+def test_cache_refuses_calls_outside_valid(cache):
+    decision = {"function_name": "music", "args": {"action": "next"}}
+
+    assert not cache.put("next song", "tools", decision, valid={"reminder"})
+    assert cache.put("next song", "tools", decision, valid={"music"})
+    assert cache.get("next song", "tools") == decision
@@ -0,0 +1,36 @@
+import pytest
+
+from extensions.essentials.settings import Settings, load
+
+
+@pytest.fixture
+def unset(monkeypatch):
+    """Clears variables for one test; whatever load_dotenv() sets is undone afterwards."""
+    def clear(*names):
+        for name in names:
+            monkeypatch.setenv(name, "")
+            monkeypatch.delenv(name)
+    return clear
+
+
+def test_values_are_typed_from_the_env_file(tmp_path, unset):
+    unset("DEBUG", "TOOLS_TOP_K", "TTS_LATENCY_BUDGET", "WAKE_WORD_THRESHOLD")
+    env_file = tmp_path / ".env"
+    env_file.write_text("DEBUG=True\nTOOLS_TOP_K=6\nTTS_LATENCY_BUDGET=0.8\nWAKE_WORD_THRESHOLD=0.4\n")
+
+    loaded = load(str(env_file))
+
+    assert loaded.debug is True
+    assert loaded.tools_top_k == 6
+    assert loaded.tts_latency_budget == 0.8
+    assert loaded.wake_word_threshold == 0.4
+
+
+def test_unparsable_value_keeps_its_default(tmp_path, unset, capsys):
+    unset("TOOLS_TOP_K")
+    env_file = tmp_path / ".env"
+    env_file.write_text("TOOLS_TOP_K=many\n")
+
+    assert load(str(env_file)).tools_top_k == Settings.tools_top_k
+    assert "Ignoring TOOLS_TOP_K" in capsys.readouterr().out
+
@@ -0,0 +1,70 @@
+import os
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")   # no sound card needed
+
+import time
+
+import numpy as np
+import pytest
+
+import extensions.essentials.mouth as mouth
+
+
+def tone(seconds: float):
+    import pygame
+
+    mouth._channel()
+    frequency, _, channels = pygame.mixer.get_init()
+    wave = np.zeros((int(seconds * frequency), channels) if channels > 1 else int(seconds * frequency), dtype=np.int16)
+    return pygame.sndarray.make_sound(wave)
+
+
+@pytest.fixture(autouse=True)
+def idle():
+    yield
+    mouth.interrupt()
+    mouth.wait_idle()
+
+
+def test_queueing_never_blocks_the_caller():
+    sounds = [tone(0.2) for _ in range(3)]
+    mouth.wait_idle()   # the service is up
+    start = time.perf_counter()
+    futures = [mouth.play_sound(sound) for sound in sounds]
+    queued_ms = (time.perf_counter() - start) * 1000
+
+    assert queued_ms < 50
+    assert all(future.result(timeout=5) for future in futures)
+
+
+def test_higher_priority_plays_first():
+    finished = []
+    mouth.play_sound(tone(0.3))     # keeps the speaker busy while the rest is queued
+    for name, priority in (("low", mouth.LOW), ("normal", mouth.NORMAL), ("urgent", mouth.URGENT)):
+        mouth.play_sound(tone(0.05), priority=priority).add_done_callback(lambda f, name=name: finished.append(name))
+
+    assert mouth.wait_idle()
+    assert finished == ["urgent", "normal", "low"]
+
+
+def test_wait_idle_returns_once_everything_has_played():
+    sound = tone(0.3)
+    start = time.monotonic()
+    mouth.play_sound(sound)
+
+    assert mouth.wait_idle()
+    assert time.monotonic() - start >= 0.3
+    assert not mouth.is_speaking()
+
+
+def test_interrupt_drops_the_queue_and_resolves_futures_false():
+    futures = [mouth.play_sound(tone(1.0)) for _ in range(3)]
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert mouth.interrupt()
+    assert [future.result(timeout=2) for future in futures] == [False, False, False]
+    assert time.monotonic() - start < 0.5
+    assert not mouth.is_speaking()
+    assert mouth.playback_timeline() == []
+    assert not mouth.interrupt()
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+import extensions.essentials.startup as startup
+
+
+def test_prewarm_tasks_run_in_parallel():
+    start = time.perf_counter()
+    futures = startup.prewarm({"device": lambda: time.sleep(0.2) or "device",
+                               "client": lambda: time.sleep(0.2) or "client"})
+
+    assert futures["device"].result(timeout=1) == "device"
+    assert futures["client"].result(timeout=1) == "client"
+    assert time.perf_counter() - start < 0.35
+
+
+def test_failed_prewarm_task_is_reported():
+    def broken():
+        raise ConnectionError("no network")
+
+    future = startup.prewarm({"broken_link": broken})["broken_link"]
+
+    with pytest.raises(ConnectionError):
+        future.result(timeout=1)
+    time.sleep(0.01)
+    assert "broken_link" in startup.report()
+    assert "failed" in next(line for line in startup.report().splitlines() if "broken_link" in line)
+
+
+def test_mark_closes_a_sequential_phase():
+    startup.mark("before")
+    time.sleep(0.05)
+
+    assert startup.mark("sleeping") >= 50
+    assert any(line.strip().startswith("sleeping") for line in startup.report().splitlines())
@@ -0,0 +1,81 @@
+import pytest
+import speech_recognition as sr
+
+import extensions.essentials.manifest as manifest
+import extensions.essentials.router as router
+import extensions.essentials.stt as stt
+from extensions.fakes.fake_audio import read_wav
+from extensions.fakes.fake_stt import FixtureBackend, write_fixture_corpus
+
+
+class DownBackend(stt.Backend):
+    def transcribe(self, audio, n: int) -> list:
+        raise ConnectionError("recognizer unreachable")
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    return write_fixture_corpus(str(tmp_path_factory.mktemp("stt")))
+
+
+@pytest.fixture
+def audio(corpus):
+    pcm, rate = read_wav(f"{corpus}/utterance_003.wav")
+    yield sr.AudioData(pcm, rate, 2)
+    stt.configure([])
+
+
+def test_ranked_fills_in_confidences_and_drops_duplicates():
+    hypotheses = stt._ranked([("Next song", 0.9), ("next song", None), ("next son", None), ("", 0.1), ("neck song", None)], 3)
+
+    assert hypotheses == [
+        {"text": "Next song", "confidence": 0.9},
+        {"text": "next son", "confidence": 0.72},
+        {"text": "neck song", "confidence": 0.576},
+    ]
+
+
+def test_n_best_is_returned_best_first(corpus, audio):
+    stt.configure([FixtureBackend.from_directory(corpus)])
+
+    assert [h["text"] for h in stt.recognize(audio, n=2)] == ["pours the music", "pause the music"]
+    assert len(stt.recognize(audio, n=1)) == 1
+
+
+def test_failing_backend_hands_over_to_the_next(corpus, audio):
+    down = DownBackend("google")
+    stt.configure([down, FixtureBackend.from_directory(corpus)])
+
+    assert stt.recognize(audio)[0]["text"] == "pours the music"
+    assert stt.summary()["google"]["failures"] == 1
+    assert stt.summary()["fixture"]["failures"] == 0
+
+
+def test_every_backend_failing_loses_only_the_turn(audio):
+    stt.configure([DownBackend("a"), DownBackend("b")])
+
+    assert stt.recognize(audio) == []
+
+
+def test_alternatives_rescue_a_misheard_command(corpus, audio):
+    stt.configure([FixtureBackend.from_directory(corpus)])
+    router.build(manifest.build())
+
+    texts = [h["text"] for h in stt.recognize(audio)]
+
+    assert router.route(texts[0]) is None
+    assert router.route(texts[0], texts[1:]) == {"function_name": "music", "args": {"action": "pause"}}
+
+
+def test_word_error_rate():
+    assert stt.word_error_rate("pause the music", "pause the music") == 0
+    assert stt.word_error_rate("pause the music", "pours the music") == pytest.approx(1 / 3)
+    assert stt.word_error_rate("open notepad", "open note pad") == 1.0
+
+
+def test_n_best_lowers_the_oracle_error_rate(corpus):
+    report = stt.benchmark(corpus, [FixtureBackend.from_directory(corpus)])["fixture"]
+
+    assert report["files"] == 8
+    assert report["oracle_wer"] == 0
+    assert report["wer"] > report["oracle_wer"]
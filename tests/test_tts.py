@@ -0,0 +1,90 @@
+import time
+import asyncio
+
+import pytest
+
+import extensions.essentials.tts as tts
+from extensions.fakes.fake_tts import FakeOfflineBackend, FakeTTSServer, make_communicate, server_communicate
+
+
+class BrokenBackend(tts.Backend):
+    async def chunks(self, text: str):
+        raise ConnectionError("no route to the service")
+        yield b""
+
+
+def first_audio(text: str, budget: float) -> tuple:
+    """(backend name, first chunk, seconds to it) of one open_stream() call."""
+    async def run():
+        start = time.perf_counter()
+        backend, chunks = await tts.open_stream(text, budget)
+        first = await anext(chunks)
+        elapsed = time.perf_counter() - start
+        await chunks.aclose()
+        return backend.name, first, elapsed
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def slow_server():
+    server = FakeTTSServer(first_delay=1.5).start()
+    yield server
+    server.stop()
+    tts.configure([])
+
+
+def test_fast_primary_answers(slow_server):
+    tts.configure([tts.EdgeBackend(make_communicate(first_delay=0.05)), FakeOfflineBackend()])
+
+    name, first, _ = first_audio("Hello there.", budget=0.5)
+
+    assert name == "edge"
+    assert first
+    assert tts.summary()["edge"]["failures"] == 0
+
+
+def test_slow_primary_fails_over_within_the_budget(slow_server):
+    edge = tts.EdgeBackend(server_communicate(slow_server.url))
+    tts.configure([edge, FakeOfflineBackend(latency=0.05)])
+
+    name, first, elapsed = first_audio("The fallback voice answers this one.", budget=0.3)
+
+    assert name == "offline"
+    assert first.startswith(b"RIFF")
+    assert elapsed < 0.8
+    assert edge.failures == 1
+
+
+def test_breaker_skips_a_primary_that_keeps_missing_the_budget(slow_server):
+    edge = tts.EdgeBackend(server_communicate(slow_server.url))
+    tts.configure([edge, FakeOfflineBackend(latency=0.05)])
+    for _ in range(tts.BREAKER_THRESHOLD):
+        first_audio("Too slow again.", budget=0.2)
+    assert not edge.available()
+
+    calls = edge.calls
+    name, _, elapsed = first_audio("Straight to the fallback.", budget=0.2)
+
+    assert name == "offline"
+    assert edge.calls == calls
+    assert elapsed < 0.2
+
+
+def test_last_backend_is_waited_for():
+    tts.configure([tts.EdgeBackend(make_communicate(first_delay=0.4))])
+    try:
+        name, first, elapsed = first_audio("Nobody else can say this.", budget=0.1)
+    finally:
+        tts.configure([])
+
+    assert name == "edge"
+    assert elapsed >= 0.4
+
+
+def test_every_backend_failing_raises():
+    tts.configure([BrokenBackend("a"), BrokenBackend("b")])
+    try:
+        with pytest.raises(RuntimeError):
+            first_audio("Nothing works.", budget=0.5)
+    finally:
+        tts.configure([])
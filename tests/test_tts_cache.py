@@ -0,0 +1,78 @@
+import os
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")   # no sound card needed
+
+import time
+
+import pytest
+
+import extensions.essentials.mouth as mouth
+import extensions.essentials.tts as tts
+import extensions.essentials.tts_cache as tts_cache
+from extensions.fakes.fake_tts import make_communicate
+
+VOICE = "en-US-AriaNeural"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    tts_cache.reset(str(tmp_path / "tts_cache"))
+    yield tts_cache
+    tts_cache.reset()
+
+
+def test_key_folds_whitespace_but_keeps_case_and_voice():
+    assert tts_cache.key("Hello  there ", VOICE) == tts_cache.key("Hello there", VOICE)
+    assert tts_cache.key("hello there", VOICE) != tts_cache.key("Hello there", VOICE)
+    assert tts_cache.key("Hello there", VOICE) != tts_cache.key("Hello there", "en-GB-SoniaNeural")
+    assert tts_cache.key("Hello there", VOICE, rate="+10%") != tts_cache.key("Hello there", VOICE)
+
+
+def test_clips_survive_a_restart(cache):
+    cache.put("Good morning.", VOICE, b"mp3 audio")
+    cache.reset(cache.CACHE_DIR)
+
+    assert cache.get("Good morning.", VOICE) == b"mp3 audio"
+    assert cache.report()["hit_ratio"] == 1.0
+
+
+def test_least_recently_used_clip_is_evicted(cache, monkeypatch):
+    monkeypatch.setattr(cache, "MAX_BYTES", 20)
+    cache.put("one", VOICE, b"x" * 8)
+    time.sleep(0.01)
+    cache.put("two", VOICE, b"x" * 8)
+    time.sleep(0.01)
+    cache.get("one", VOICE)
+    cache.put("three", VOICE, b"x" * 8)
+
+    assert not cache.contains("two", VOICE)
+    assert cache.contains("one", VOICE) and cache.contains("three", VOICE)
+    assert cache.report()["bytes"] == 16
+
+
+def test_clip_deleted_behind_the_cache_is_a_miss(cache):
+    cache.put("Good morning.", VOICE, b"mp3 audio")
+    os.remove(cache._path(cache.key("Good morning.", VOICE)))
+
+    assert cache.get("Good morning.", VOICE) is None
+    assert not cache.contains("Good morning.", VOICE)
+
+
+def test_repeated_phrase_skips_the_tts_service(cache):
+    communicate = make_communicate(first_delay=0.05, chunk_delay=0.001)
+    tts.configure([tts.EdgeBackend(communicate)])
+    try:
+        mouth.warm(["Ready."])
+        requested = len(communicate.requests)
+
+        assert mouth.say("Ready.", wait=True).result()
+        assert len(communicate.requests) == requested == 1
+    finally:
+        tts.configure([])
+
+
+def test_beep_is_generated_locally():
+    beep = mouth._earcon()
+
+    assert beep.get_length() == pytest.approx(mouth.BEEP_SECONDS, abs=0.01)
+    assert mouth._earcon() is beep
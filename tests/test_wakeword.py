@@ -0,0 +1,85 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import extensions.essentials.capture as capture
+import extensions.essentials.ears as ears
+import extensions.essentials.wakeword as wakeword
+from extensions.fakes.fake_audio import WavSource, noise, voiced, wake_fixture, write_wake_fixtures, write_wav
+
+SPEED = 4.0     # fixture playback runs faster than real time
+
+
+@pytest.fixture(scope="module")
+def fixtures(tmp_path_factory):
+    return write_wake_fixtures(str(tmp_path_factory.mktemp("wake")), templates=3, positives=8, negatives=12)
+
+
+@pytest.fixture
+def enrolled(fixtures):
+    assert wakeword.load(os.path.join(fixtures, "templates"))
+    yield fixtures
+    wakeword.load(os.path.join(fixtures, "missing"))
+
+
+def service_for(tmp_path, *parts) -> capture.CaptureService:
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    return capture.CaptureService(WavSource(write_wav(str(tmp_path / "live.wav"), samples), speed=SPEED)).start()
+
+
+def test_wake_word_is_told_apart_from_other_words(fixtures):
+    results = wakeword.evaluate(fixtures)
+
+    assert results["templates"] == 3
+    assert results["false_accept_rate"] == 0
+    assert results["false_reject_rate"] <= 0.25
+
+
+def test_command_after_the_wake_word_is_heard_in_one_breath(enrolled, tmp_path):
+    service = service_for(tmp_path, wake_fixture(True, seed=1000), voiced(0.8, seed=9), noise(2.0, seed=6))
+    try:
+        assert wakeword.wait(service, timeout=3)
+        audio = ears.endpoint(service, timeout=2)
+    finally:
+        service.stop()
+
+    # The cursor was moved past the wake word, so only the command is left
+    assert audio is not None
+    assert 0.8 <= len(audio.frame_data) / (audio.sample_rate * audio.sample_width) < 1.3
+
+
+def test_other_words_do_not_wake_the_assistant(enrolled, tmp_path):
+    service = service_for(tmp_path, wake_fixture(False, seed=2000), noise(1.0, seed=6))
+    try:
+        assert not wakeword.wait(service, timeout=1.0)
+    finally:
+        service.stop()
+
+
+def test_wake_word_said_before_the_flush_is_not_acted_on(enrolled, tmp_path):
+    service = service_for(tmp_path, wake_fixture(True, seed=1001), noise(2.0, seed=6))
+    try:
+        time.sleep(3.0 / SPEED)
+        service.flush()
+        assert not wakeword.wait(service, timeout=0.5)
+    finally:
+        service.stop()
+
+
+def test_single_template_falls_back_to_the_default_threshold(fixtures, tmp_path, capsys):
+    single = tmp_path / "single"
+    single.mkdir()
+    write_wav(str(single / "wake.wav"), wake_fixture(True, seed=0))
+    try:
+        assert wakeword.load(str(single))
+        assert wakeword._state["threshold"] == wakeword.DEFAULT_THRESHOLD
+        assert "Only one wake word recording" in capsys.readouterr().out
+    finally:
+        wakeword.load(str(tmp_path / "missing"))
+
+
+def test_without_templates_wake_word_mode_is_off(tmp_path):
+    assert not wakeword.load(str(tmp_path))
+    assert not wakeword.ready()